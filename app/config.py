@@ -9,7 +9,6 @@ class Config:
     def __new__(cls):
         # Asegura que solo se cree una instancia (Singleton)
         if cls._instance is None:
-            print("Creando instancia de configuración...")  # Para depuración
             cls._instance = super(Config, cls).__new__(cls)
             # Carga las variables de entorno una sola vez al crear la instancia
             cls._instance._load_config()
@@ -27,6 +26,23 @@ class Config:
         self.db_password: str = os.getenv("DB_PASSWORD", "")
         self.db_name: str = os.getenv("DB_NAME", "")
 
+        # Pool de conexiones
+        self.db_pool_size: int = int(os.getenv("DB_POOL_SIZE", 5))
+        self.db_max_overflow: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+        self.db_pool_timeout: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+        # Segundos tras los cuales se recicla una conexión; -1 la desactiva
+        self.db_pool_recycle: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+        self.db_pool_pre_ping: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() in (
+            "1",
+            "true",
+            "yes",
+        )
+        # Ejecuciones de una consulta antes de que psycopg la prepare; vacío la desactiva
+        prepare_threshold = os.getenv("DB_PREPARE_THRESHOLD", "5")
+        self.db_prepare_threshold: int | None = (
+            int(prepare_threshold) if prepare_threshold else None
+        )
+
         self.local_timezone = str(os.getenv("LOCAL_TIMEZONE", "America/Bogota"))
 
         # Construye la URL de la base de datos directamente aquí
@@ -40,6 +56,48 @@ class Config:
         self.secret_key: str = os.getenv("SECRET_KEY", "")
         self.algorithm: str = os.getenv("ALGORITHM", "HS256")
         self.access_token_expire_minutes: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+        # Caché de tokens y usuarios autenticados
+        self.auth_cache_size: int = int(os.getenv("AUTH_CACHE_SIZE", 1024))
+        self.auth_cache_ttl: int = int(os.getenv("AUTH_CACHE_TTL", 60))
+        # Pool de hilos para bcrypt (hash y verificación de contraseñas)
+        self.hash_pool_size: int = int(os.getenv("HASH_POOL_SIZE", 4))
+        self.hash_queue_limit: int = int(os.getenv("HASH_QUEUE_LIMIT", 64))
+
+        # Caché en memoria de las tablas de catálogo (entradas por tabla y segundos)
+        self.catalog_cache_size: int = int(os.getenv("CATALOG_CACHE_SIZE", 256))
+        self.catalog_cache_ttl: int = int(os.getenv("CATALOG_CACHE_TTL", 300))
+        # Segundos que los clientes pueden reutilizar un catálogo sin revalidarlo
+        self.catalog_max_age: int = int(os.getenv("CATALOG_MAX_AGE", 60))
+
+        # Serializa las lecturas de las rutas CRUD con orjson, sin revalidar las filas
+        self.fast_json_responses: bool = os.getenv(
+            "FAST_JSON_RESPONSES", "true"
+        ).lower() in ("1", "true", "yes")
+
+        # Caché de unidades disponibles de los elementos compuestos
+        self.disponibles_cache_size: int = int(os.getenv("DISPONIBLES_CACHE_SIZE", 1024))
+        self.disponibles_cache_ttl: int = int(os.getenv("DISPONIBLES_CACHE_TTL", 60))
+
+        # Caché de listas de precios vigentes (por tipo de precio y fecha)
+        self.precios_cache_size: int = int(os.getenv("PRECIOS_CACHE_SIZE", 64))
+        self.precios_cache_ttl: int = int(os.getenv("PRECIOS_CACHE_TTL", 300))
+
+        # Aplica el esquema al arrancar si la base no está al día, en lugar de
+        # fallar; solo para desarrollo (en producción: python -m app.manage migrar)
+        self.schema_auto_migrate: bool = os.getenv(
+            "SCHEMA_AUTO_MIGRATE", "false"
+        ).lower() in ("1", "true", "yes")
+
+        # Particiones mensuales de movimientos_inventario creadas por adelantado
+        self.particiones_meses_adelante: int = int(
+            os.getenv("PARTICIONES_MESES_ADELANTE", 3)
+        )
+
+        # Horas entre cortes (instantáneas) de saldos programados; 0 los desactiva
+        self.cortes_intervalo_horas: float = float(os.getenv("CORTES_INTERVALO_HORAS", 24))
+
+        # Operaciones masivas
+        self.bulk_max_items: int = int(os.getenv("BULK_MAX_ITEMS", 10000))
 
 
 config = Config()
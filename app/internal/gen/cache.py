@@ -0,0 +1,72 @@
+# app/internal/gen/cache.py
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+# Registro de las cachés creadas en el proceso, por nombre, para exponer sus métricas
+caches: dict[str, "TTLCache"] = {}
+
+
+class TTLCache:
+    """
+    Caché en memoria acotada por número de entradas (LRU) y tiempo de vida (TTL).
+
+    Es local al proceso: cada worker de uvicorn tiene su propia copia, por lo
+    que el TTL acota el tiempo que una entrada puede quedar desactualizada
+    frente a cambios hechos por otro worker.
+    """
+
+    def __init__(self, nombre: str, maxsize: int, ttl: float) -> None:
+        self.nombre = nombre
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._datos: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        caches[nombre] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Obtiene una entrada vigente y la marca como usada recientemente."""
+        entrada = self._datos.get(key)
+        if entrada is None or entrada[0] < time.monotonic():
+            if entrada is not None:
+                del self._datos[key]
+            self.misses += 1
+            return default
+        self._datos.move_to_end(key)
+        self.hits += 1
+        return entrada[1]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Guarda una entrada; `ttl` permite acortar la vida de esta entrada."""
+        vida = self.ttl if ttl is None else min(ttl, self.ttl)
+        if vida <= 0 or self.maxsize <= 0:
+            return
+        self._datos[key] = (time.monotonic() + vida, value)
+        self._datos.move_to_end(key)
+        while len(self._datos) > self.maxsize:
+            self._datos.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Elimina una entrada si existe."""
+        self._datos.pop(key, None)
+
+    def clear(self) -> None:
+        """Elimina todas las entradas."""
+        self._datos.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Devuelve los contadores de uso de la caché."""
+        consultas = self.hits + self.misses
+        return {
+            "nombre": self.nombre,
+            "size": len(self._datos),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / consultas if consultas else 0.0,
+        }
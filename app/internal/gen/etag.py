@@ -0,0 +1,24 @@
+# app/internal/gen/etag.py
+from hashlib import blake2b
+from typing import Any
+
+
+def calcular_etag(*partes: Any) -> str:
+    """ETag fuerte (entre comillas) a partir de las partes que definen la respuesta."""
+    resumen = blake2b(repr(partes).encode(), digest_size=16).hexdigest()
+    return f'"{resumen}"'
+
+
+def coincide_etag(if_none_match: str | None, etag: str) -> bool:
+    """
+    Indica si el encabezado If-None-Match incluye el ETag dado.
+
+    Usa la comparación débil que exige el RFC 9110 para If-None-Match: se
+    ignora el prefijo W/. Acepta listas separadas por comas. `*` no coincide:
+    solo indica que el recurso existe, y la validación se hace antes de leerlo,
+    así que responder 304 podría confirmar un ID inexistente.
+    """
+    if not if_none_match:
+        return False
+    candidatos = (valor.strip() for valor in if_none_match.split(","))
+    return etag in (c[2:] if c.startswith("W/") else c for c in candidatos)
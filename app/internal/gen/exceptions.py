@@ -1,3 +1,81 @@
+from datetime import datetime
+
+
 class MissingParameterError(Exception):
     def __init__(self, parameter: str) -> None:
         super().__init__(f"Missing parameter: {parameter}")
+
+
+class InvalidCursorError(Exception):
+    def __init__(self, cursor: str) -> None:
+        super().__init__(f"Invalid cursor: {cursor}")
+
+
+class PoolSaturatedError(Exception):
+    def __init__(self, pool: str) -> None:
+        super().__init__(f"Pool saturated: {pool}")
+
+
+class InvalidExpandError(Exception):
+    def __init__(self, relationship: str) -> None:
+        super().__init__(f"Invalid expand: {relationship}")
+
+
+class InvalidFilterError(Exception):
+    def __init__(self, parameter: str) -> None:
+        super().__init__(f"Invalid filter: {parameter}")
+
+
+class InvalidSortError(Exception):
+    def __init__(self, field: str) -> None:
+        super().__init__(f"Invalid sort field: {field}")
+
+
+class InvalidFieldError(Exception):
+    def __init__(self, field: str) -> None:
+        super().__init__(f"Invalid field: {field}")
+
+
+class SchemaOutdatedError(Exception):
+    def __init__(self, current: int | None, expected: int) -> None:
+        super().__init__(f"Schema version {current} is older than {expected}")
+        self.current = current
+        self.expected = expected
+
+
+class SchemaMismatchError(Exception):
+    def __init__(self, missing: list[str]) -> None:
+        super().__init__(f"Schema is missing: {', '.join(missing)}")
+        self.missing = missing
+
+
+class MissingExtensionError(Exception):
+    def __init__(self, extension: str) -> None:
+        super().__init__(
+            f"Extension {extension} is not installed and could not be created; "
+            f"a superuser must run CREATE EXTENSION {extension}"
+        )
+        self.extension = extension
+
+
+class ClosedPeriodError(Exception):
+    def __init__(self, closed_until: datetime) -> None:
+        super().__init__(f"Period closed until {closed_until.isoformat()}")
+        self.closed_until = closed_until
+
+
+class SignInUseError(Exception):
+    def __init__(self, movement_type_id: int) -> None:
+        super().__init__(
+            f"Movement type {movement_type_id} has movements; its sign cannot change"
+        )
+        self.movement_type_id = movement_type_id
+
+
+class MovementSignRequiredError(Exception):
+    def __init__(self, movement_type_ids: list[int]) -> None:
+        super().__init__(
+            "Movement types with movements need an explicit sign: "
+            f"{', '.join(map(str, movement_type_ids))}"
+        )
+        self.movement_type_ids = movement_type_ids
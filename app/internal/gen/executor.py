@@ -0,0 +1,76 @@
+# app/internal/gen/executor.py
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.internal.gen.exceptions import PoolSaturatedError
+
+T = TypeVar("T")
+
+# Registro de los ejecutores creados en el proceso, por nombre, para exponer sus métricas
+ejecutores: dict[str, "BoundedExecutor"] = {}
+
+
+class BoundedExecutor:
+    """
+    Ejecuta funciones bloqueantes en un pool de hilos dedicado, fuera del event loop.
+
+    Admite como máximo `max_pending` tareas entre la cola y la ejecución; por
+    encima de ese límite `run` lanza PoolSaturatedError en lugar de encolar,
+    para que el llamador responda de inmediato (p. ej. con 503).
+    """
+
+    def __init__(self, nombre: str, max_workers: int, max_pending: int) -> None:
+        self.nombre = nombre
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=nombre
+        )
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.run_seconds_total = 0.0
+        self.latency_seconds_max = 0.0
+        ejecutores[nombre] = self
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Ejecuta `fn(*args)` en el pool y espera su resultado sin bloquear el loop."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise PoolSaturatedError(self.nombre)
+
+        def tarea() -> tuple[float, T]:
+            return time.perf_counter(), fn(*args)
+
+        self.pending += 1
+        encolado = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            inicio, resultado = await loop.run_in_executor(self._executor, tarea)
+        finally:
+            self.pending -= 1
+        fin = time.perf_counter()
+        self.completed += 1
+        self.wait_seconds_total += inicio - encolado
+        self.run_seconds_total += fin - inicio
+        self.latency_seconds_max = max(self.latency_seconds_max, fin - encolado)
+        return resultado
+
+    def stats(self) -> dict[str, Any]:
+        """Devuelve la profundidad de la cola y las latencias acumuladas."""
+        completadas = self.completed or 1
+        return {
+            "nombre": self.nombre,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "queued": max(0, self.pending - self.max_workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_ms_avg": 1000 * self.wait_seconds_total / completadas,
+            "run_ms_avg": 1000 * self.run_seconds_total / completadas,
+            "latency_ms_max": 1000 * self.latency_seconds_max,
+        }
@@ -0,0 +1,232 @@
+# app/internal/gen/metrics.py
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Límites (le) de los histogramas, al estilo de los clientes de Prometheus
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_CONSULTAS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histograma:
+    """Histograma acumulado con límites fijos."""
+
+    def __init__(self, buckets: Iterable[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.conteos = [0] * (len(self.buckets) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        self.conteos[bisect_left(self.buckets, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+    def acumulados(self) -> list[tuple[str, int]]:
+        """Conteos acumulados por límite, incluido +Inf."""
+        limites = [_numero(b) for b in self.buckets] + ["+Inf"]
+        acumulado = 0
+        resultado = []
+        for limite, conteo in zip(limites, self.conteos):
+            acumulado += conteo
+            resultado.append((limite, acumulado))
+        return resultado
+
+
+@dataclass
+class MedicionPeticion:
+    """Consultas SQL y tiempo de base de datos de la petición en curso."""
+
+    consultas: int = 0
+    segundos_db: float = 0.0
+
+
+# Medición de la petición en curso; la comparten las tareas y hilos que la atienden
+medicion_actual: ContextVar[MedicionPeticion | None] = ContextVar(
+    "medicion_actual", default=None
+)
+
+
+class Metricas:
+    """Contadores de peticiones HTTP y de consultas SQL del proceso."""
+
+    def __init__(self) -> None:
+        self.peticiones: dict[tuple[str, str, str], int] = {}
+        self.latencia: dict[tuple[str, str], Histograma] = {}
+        self.consultas: dict[tuple[str, str], Histograma] = {}
+        self.tiempo_db: dict[tuple[str, str], Histograma] = {}
+        self.consultas_total = 0
+        self.segundos_db_total = 0.0
+
+    def registrar_engine(self, engine: Engine) -> None:
+        """Mide cada sentencia ejecutada por el engine dado."""
+        event.listen(engine, "before_cursor_execute", self._antes_consulta)
+        event.listen(engine, "after_cursor_execute", self._despues_consulta)
+
+    def _antes_consulta(self, conn, cursor, statement, params, context, executemany):
+        context._metricas_inicio = time.perf_counter()
+
+    def _despues_consulta(self, conn, cursor, statement, params, context, executemany):
+        segundos = time.perf_counter() - context._metricas_inicio
+        self.consultas_total += 1
+        self.segundos_db_total += segundos
+        medicion = medicion_actual.get()
+        if medicion is not None:
+            medicion.consultas += 1
+            medicion.segundos_db += segundos
+
+    def registrar_peticion(
+        self,
+        metodo: str,
+        ruta: str,
+        status: int,
+        segundos: float,
+        medicion: MedicionPeticion,
+    ) -> None:
+        """Acumula una petición terminada."""
+        clave = (metodo, ruta)
+        self.peticiones[(metodo, ruta, str(status))] = (
+            self.peticiones.get((metodo, ruta, str(status)), 0) + 1
+        )
+        if clave not in self.latencia:
+            self.latencia[clave] = Histograma(BUCKETS_SEGUNDOS)
+            self.consultas[clave] = Histograma(BUCKETS_CONSULTAS)
+            self.tiempo_db[clave] = Histograma(BUCKETS_SEGUNDOS)
+        self.latencia[clave].observar(segundos)
+        self.consultas[clave].observar(medicion.consultas)
+        self.tiempo_db[clave].observar(medicion.segundos_db)
+
+    def exportar(self, extras: Iterable[str] = ()) -> str:
+        """Exporta las métricas en el formato de texto de Prometheus."""
+        lineas = [
+            "# HELP http_requests_total Peticiones HTTP atendidas.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (metodo, ruta, status), total in sorted(self.peticiones.items()):
+            etiquetas = _etiquetas(method=metodo, route=ruta, status=status)
+            lineas.append(f"http_requests_total{{{etiquetas}}} {total}")
+        for nombre, ayuda, histogramas in (
+            (
+                "http_request_duration_seconds",
+                "Latencia de las peticiones HTTP.",
+                self.latencia,
+            ),
+            (
+                "http_request_db_queries",
+                "Sentencias SQL ejecutadas por petición.",
+                self.consultas,
+            ),
+            (
+                "http_request_db_seconds",
+                "Tiempo en la base de datos por petición.",
+                self.tiempo_db,
+            ),
+        ):
+            lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} histogram"]
+            for (metodo, ruta), histograma in sorted(histogramas.items()):
+                etiquetas = _etiquetas(method=metodo, route=ruta)
+                for limite, acumulado in histograma.acumulados():
+                    lineas.append(
+                        f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}'
+                    )
+                lineas.append(f"{nombre}_sum{{{etiquetas}}} {_numero(histograma.suma)}")
+                lineas.append(f"{nombre}_count{{{etiquetas}}} {histograma.total}")
+        lineas += [
+            "# HELP db_queries_total Sentencias SQL ejecutadas.",
+            "# TYPE db_queries_total counter",
+            f"db_queries_total {self.consultas_total}",
+            "# HELP db_seconds_total Tiempo total en la base de datos.",
+            "# TYPE db_seconds_total counter",
+            f"db_seconds_total {_numero(self.segundos_db_total)}",
+        ]
+        lineas += extras
+        return "\n".join(lineas) + "\n"
+
+
+def _numero(valor: float) -> str:
+    """Formatea un número sin notación innecesaria (1.0 -> 1)."""
+    return repr(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(**etiquetas: str) -> str:
+    return ",".join(f'{clave}="{_escapar(str(v))}"' for clave, v in etiquetas.items())
+
+
+def gauges(
+    nombre: str, ayuda: str, filas: Iterable[tuple[dict[str, str], Any]]
+) -> list[str]:
+    """Líneas de una métrica tipo gauge con una muestra por fila de etiquetas."""
+    lineas = [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} gauge"]
+    for etiquetas, valor in filas:
+        if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+            continue
+        sufijo = f"{{{_etiquetas(**etiquetas)}}}" if etiquetas else ""
+        lineas.append(f"{nombre}{sufijo} {_numero(valor)}")
+    return lineas
+
+
+metricas = Metricas()
+
+
+class MetricasMiddleware:
+    """
+    Middleware ASGI que mide cada petición HTTP.
+
+    Registra la latencia y las consultas SQL por ruta (la plantilla de la ruta,
+    no la URL, para acotar la cardinalidad) y añade a la respuesta los
+    encabezados `X-DB-Queries` y `Server-Timing`.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        medicion = MedicionPeticion()
+        token = medicion_actual.set(medicion)
+        inicio = time.perf_counter()
+        status = 500
+
+        async def enviar(mensaje):
+            nonlocal status
+            if mensaje["type"] == "http.response.start":
+                status = mensaje["status"]
+                total_ms = 1000 * (time.perf_counter() - inicio)
+                db_ms = 1000 * medicion.segundos_db
+                encabezados = list(mensaje.get("headers", []))
+                encabezados += [
+                    (b"x-db-queries", str(medicion.consultas).encode()),
+                    (
+                        b"server-timing",
+                        (
+                            f'db;dur={db_ms:.1f};desc="{medicion.consultas} queries", '
+                            f"app;dur={total_ms:.1f}"
+                        ).encode(),
+                    ),
+                ]
+                mensaje = {**mensaje, "headers": encabezados}
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            medicion_actual.reset(token)
+            ruta = scope.get("route")
+            metricas.registrar_peticion(
+                scope["method"],
+                getattr(ruta, "path", "sin_ruta"),
+                status,
+                time.perf_counter() - inicio,
+                medicion,
+            )
@@ -0,0 +1,92 @@
+# app/internal/gen/pool.py
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolMetrics:
+    """Contadores del pool de conexiones alimentados por eventos de SQLAlchemy."""
+
+    def __init__(self) -> None:
+        self.engine: Engine | None = None
+        self.connections_created = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def registrar(self, engine: Engine) -> None:
+        """Escucha los eventos del pool del engine dado."""
+        self.engine = engine
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+
+    def _on_connect(self, *args: Any) -> None:
+        self.connections_created += 1
+
+    def _on_checkout(self, *args: Any) -> None:
+        self.checkouts += 1
+
+    def _on_checkin(self, *args: Any) -> None:
+        self.checkins += 1
+
+    def _on_invalidate(self, *args: Any) -> None:
+        self.invalidations += 1
+
+    def registrar_espera(self, segundos: float, timeout: bool) -> None:
+        """Acumula el tiempo que tardó una petición de conexión al pool."""
+        self.wait_seconds_total += segundos
+        self.wait_seconds_max = max(self.wait_seconds_max, segundos)
+        if timeout:
+            self.timeouts += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Devuelve el estado actual del pool y los contadores acumulados."""
+        # El engine puede reemplazar su pool (dispose), por eso se consulta cada vez
+        pool = self.engine.pool if self.engine is not None else None
+        estado = {}
+        if isinstance(pool, QueuePool):
+            estado = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+        solicitudes = self.checkouts + self.timeouts
+        return {
+            **estado,
+            "connections_created": self.connections_created,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": 1000 * self.wait_seconds_total / solicitudes
+            if solicitudes
+            else 0.0,
+            "wait_ms_max": 1000 * self.wait_seconds_max,
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeasuredAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Pool asíncrono que mide la espera por conexión y los timeouts de checkout."""
+
+    def connect(self):  # type: ignore[override]
+        inicio = time.perf_counter()
+        timeout = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timeout = True
+            raise
+        finally:
+            pool_metrics.registrar_espera(time.perf_counter() - inicio, timeout)
@@ -0,0 +1,90 @@
+# app/internal/gen/serializacion.py
+from decimal import Decimal
+from functools import cache
+from typing import Any, Iterable, Sequence
+
+import orjson
+from fastapi.responses import Response
+from sqlalchemy import Row
+from sqlmodel import SQLModel
+
+
+# Zonas horarias UTC como "Z", igual que Pydantic
+OPCIONES = orjson.OPT_UTC_Z
+
+
+def _por_defecto(valor: Any) -> Any:
+    """Tipos que orjson no serializa de forma nativa, con el formato de Pydantic."""
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError(f"Type is not JSON serializable: {type(valor).__name__}")
+
+
+def codificar(valor: Any) -> bytes:
+    """Codifica un valor a JSON con orjson y los formatos de Pydantic."""
+    return orjson.dumps(valor, default=_por_defecto, option=OPCIONES)
+
+
+class RespuestaJSON(Response):
+    """Respuesta JSON codificada con orjson; acepta también bytes ya codificados."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return codificar(content)
+
+
+class Serializador:
+    """
+    Serializador precompilado de un modelo de tabla a JSON.
+
+    Equivale a devolver el objeto con `response_model=model` y
+    `response_model_exclude_none=True`, pero sin volver a validar filas que
+    vienen de la base de datos: toma los valores ya cargados del objeto y los
+    codifica con orjson. Solo para objetos recién cargados o copias de caché;
+    los atributos no cargados (expirados o diferidos) se omiten como nulos.
+    """
+
+    def __init__(self, model: type[SQLModel]) -> None:
+        self.model = model
+        self.campos = tuple(model.model_fields)
+
+    def fila(self, obj: SQLModel) -> dict[str, Any]:
+        valores = obj.__dict__
+        return {
+            campo: valor
+            for campo in self.campos
+            if (valor := valores.get(campo)) is not None
+        }
+
+    def uno(self, obj: SQLModel) -> bytes:
+        return codificar(self.fila(obj))
+
+    def lista(self, objs: Iterable[SQLModel]) -> bytes:
+        fila = self.fila
+        return codificar([fila(obj) for obj in objs])
+
+    def filas(self, filas: Sequence[Row]) -> bytes:
+        """
+        Codifica filas de Core (ver `BaseQuery.get_filas`) sin crear objetos.
+
+        Cada fila sale con sus propias columnas, que pueden ser solo parte
+        de los campos del modelo.
+        """
+        if not filas:
+            return b"[]"
+        campos = filas[0]._fields
+        return codificar(
+            [
+                {campo: valor for campo, valor in zip(campos, fila) if valor is not None}
+                for fila in filas
+            ]
+        )
+
+
+@cache
+def serializador_de(model: type[SQLModel]) -> Serializador:
+    """Serializador del modelo, creado una sola vez por proceso."""
+    return Serializador(model)
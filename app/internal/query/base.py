@@ -1,68 +1,562 @@
 # app/internal/query/base.py
+from sqlalchemy import (
+    Column,
+    Row,
+    Select,
+    Table,
+    and_,
+    delete,
+    insert,
+    inspect,
+    or_,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, selectinload
 from sqlmodel import SQLModel, select
-from typing import Generic, TypeVar
+from typing import Any, Generic, Iterable, Sequence, TypeVar
+
+from app.internal.gen.cache import TTLCache
+from app.internal.gen.exceptions import InvalidExpandError, InvalidFieldError
+from app.internal.query.cursor import codificar_cursor, decodificar_cursor
+from app.internal.query.filtros import (
+    OPERADORES,
+    Filtro,
+    Orden,
+    parse_filtros,
+    parse_orden,
+)
+from app.models.versiones import VersionTabla, es_versionada
 
 ModelDB = TypeVar("ModelDB", bound=SQLModel)
 
 
 class BaseQuery(Generic[ModelDB]):
+    # Columnas que definen el orden estable de las listas y la llave del cursor.
+    # Si no se definen se usa la llave primaria del modelo.
+    cursor_fields: tuple[str, ...] | None = None
+    # Caché de lectura opcional, compartida por todas las instancias de la clase
+    cache: TTLCache | None = None
+    # Relaciones que no se pueden expandir: el usuario incluye el hash de la contraseña
+    expand_excluidos: tuple[str, ...] = ("usuario",)
+    # Columnas por las que se puede filtrar y ordenar la lista; deben estar
+    # indexadas. Las de orden además deben ser NOT NULL para el cursor.
+    filter_fields: tuple[str, ...] = ()
+    sort_fields: tuple[str, ...] = ()
+
     def __init__(self, model: type[ModelDB]) -> None:
         self.model = model
+        # Llave primaria del mapeo, que puede ser más corta que la de la tabla
+        # (p. ej. en tablas particionadas, cuya llave incluye la columna de partición)
+        self.pk_columns = [
+            getattr(model, columna.key) for columna in inspect(model).primary_key
+        ]
+        if self.cursor_fields:
+            self.cursor_columns = [getattr(model, c) for c in self.cursor_fields]
+        else:
+            self.cursor_columns = self.pk_columns
+
+    @classmethod
+    def habilitar_cache(cls, maxsize: int, ttl: float) -> None:
+        """
+        Sirve `get` y `get_list` desde memoria para esta clase de consulta.
+
+        Pensado para tablas de catálogo pequeñas y de pocos cambios; la caché se
+        vacía en cada creación, actualización o eliminación hecha en el proceso.
+        """
+        cls.cache = TTLCache(f"query_{cls.__name__}", maxsize, ttl)
+
+    @property
+    def relaciones_expandibles(self) -> list[str]:
+        """Nombres de las relaciones que se pueden pedir con `expand`."""
+        return [
+            nombre
+            for nombre in inspect(self.model).relationships.keys()
+            if nombre not in self.expand_excluidos
+        ]
+
+    def opciones_carga(self, expand: Sequence[str] | None = None) -> list:
+        """
+        Opciones de carga para las relaciones pedidas en `expand`.
+
+        Las colecciones se cargan con selectinload y las referencias con
+        joinedload, de modo que el número de consultas no depende del número
+        de filas. El resto de relaciones usa raiseload: un acceso perezoso
+        accidental falla de inmediato en lugar de emitir consultas ocultas.
+        """
+        relaciones = inspect(self.model).relationships
+        opciones: list = []
+        for nombre in expand or ():
+            if nombre not in self.relaciones_expandibles:
+                raise InvalidExpandError(nombre)
+            atributo = getattr(self.model, nombre)
+            if relaciones[nombre].uselist:
+                opciones.append(selectinload(atributo))
+            else:
+                opciones.append(joinedload(atributo))
+        opciones.append(raiseload("*"))
+        return opciones
+
+    def parse_filtros(self, params: Iterable[tuple[str, str]]) -> list[Filtro]:
+        """Valida y tipa los filtros de la lista contra `filter_fields`."""
+        columnas = {campo: getattr(self.model, campo) for campo in self.filter_fields}
+        return parse_filtros(params, columnas, self.filter_fields)
+
+    def parse_orden(self, order_by: str | None) -> list[Orden]:
+        """Valida el ordenamiento de la lista contra `sort_fields`."""
+        return parse_orden(order_by, self.sort_fields)
+
+    def columnas_orden(self, orden: Sequence[Orden] = ()) -> list[Orden]:
+        """
+        Ordenamiento completo de la lista: el pedido más las columnas del cursor.
+
+        Las columnas del cursor se añaden como desempate (con la dirección del
+        último campo pedido) para que el orden sea estable y el cursor único.
+        """
+        completo = list(orden)
+        descendente = completo[-1].descendente if completo else False
+        pedidos = {o.campo for o in completo}
+        for columna in self.cursor_columns:
+            if columna.key not in pedidos:
+                completo.append(Orden(columna.key, descendente))
+        return completo
+
+    def _filtro_cursor(self, orden: Sequence[Orden], valores: Sequence[Any]):
+        """Condición "después de `valores`" para el ordenamiento dado."""
+        columnas = [getattr(self.model, o.campo) for o in orden]
+        # Cota redundante sobre la primera columna: a diferencia de la comparación
+        # de tuplas permite descartar particiones y acotar el índice
+        if orden[0].descendente:
+            cota = columnas[0] <= valores[0]
+        else:
+            cota = columnas[0] >= valores[0]
+        direcciones = {o.descendente for o in orden}
+        if len(direcciones) == 1:
+            # Misma dirección en todas las columnas: comparación de tuplas, usa el índice
+            if direcciones.pop():
+                return and_(cota, tuple_(*columnas) < tuple_(*valores))
+            return and_(cota, tuple_(*columnas) > tuple_(*valores))
+        condiciones = []
+        for i, (columna, o) in enumerate(zip(columnas, orden)):
+            previas = [c == v for c, v in zip(columnas[:i], valores[:i])]
+            siguiente = columna < valores[i] if o.descendente else columna > valores[i]
+            condiciones.append(and_(*previas, siguiente))
+        return and_(cota, or_(*condiciones))
+
+    @staticmethod
+    def _firma_orden(orden: Sequence[Orden]) -> str:
+        """Representación textual del ordenamiento, guardada en el cursor."""
+        return ",".join(("-" if o.descendente else "") + o.campo for o in orden)
+
+    def _invalidar(self) -> None:
+        """Descarta las lecturas en caché tras una modificación."""
+        if self.cache is not None:
+            self.cache.clear()
 
-    async def get(self, session: AsyncSession, id: int | str):
-        """Obtiene un objeto por su ID"""
-        result = await session.get(self.model, id)
+    def _copia(self, obj: ModelDB) -> ModelDB:
+        """Copia desligada de la sesión, segura para compartir entre peticiones."""
+        return self.model(**obj.model_dump())
+
+    def id_de(self, obj: SQLModel) -> Any:
+        """Devuelve la llave primaria de un objeto (lista si la llave es compuesta)."""
+        valores = [getattr(obj, columna.key) for columna in self.pk_columns]
+        return valores[0] if len(valores) == 1 else valores
+
+    def _llave(self, id: Any) -> Any:
+        """Normaliza un ID para poder usarlo como llave de diccionario."""
+        return tuple(id) if len(self.pk_columns) > 1 else id
+
+    def _llave_fila(self, fila: Sequence[Any]) -> Any:
+        """Normaliza una fila con las columnas de la llave primaria."""
+        return tuple(fila) if len(self.pk_columns) > 1 else fila[0]
+
+    def _filtro_id(self, id: Any):
+        """Construye el filtro `pk = :id` para llaves simples o compuestas."""
+        if len(self.pk_columns) == 1:
+            return self.pk_columns[0] == id
+        return tuple_(*self.pk_columns) == tuple_(*id)
+
+    def _filtro_ids(self, ids: Sequence[Any]):
+        """Construye el filtro `pk IN (...)` para llaves simples o compuestas."""
+        if len(self.pk_columns) == 1:
+            return self.pk_columns[0].in_(ids)
+        return tuple_(*self.pk_columns).in_([tuple(i) for i in ids])
+
+    def tablas_version(self, expand: Sequence[str] | None = None) -> list[Table] | None:
+        """
+        Tablas que lee la consulta con las relaciones de `expand`.
+
+        Devuelve None si alguna no lleva contador de versión (ver `versionar`).
+        """
+        relaciones = inspect(self.model).relationships
+        tablas = [self.model.__table__]  # type: ignore
+        for nombre in expand or ():
+            if nombre not in self.relaciones_expandibles:
+                raise InvalidExpandError(nombre)
+            relacion = relaciones[nombre]
+            tablas.append(relacion.target)
+            if relacion.secondary is not None:
+                tablas.append(relacion.secondary)
+        return tablas if all(es_versionada(tabla) for tabla in tablas) else None
+
+    async def get_version(
+        self, session: AsyncSession, expand: Sequence[str] | None = None
+    ) -> str | None:
+        """
+        Versión de los datos que devuelve la consulta, para construir ETags.
+
+        Cambia con cada escritura en las tablas leídas. Debe leerse antes que
+        los datos: así los datos nunca son más antiguos que su versión. Con
+        caché, la versión también se guarda en ella y, al pasarla a `get` o
+        `get_list`, forma parte de la llave de los datos, de modo que una
+        versión nueva nunca se sirve con datos anteriores.
+        """
+        tablas = self.tablas_version(expand)
+        if tablas is None:
+            return None
+        nombres = tuple(sorted({tabla.name for tabla in tablas}))
+        clave = ("version", nombres)
+        if self.cache is not None:
+            version = self.cache.get(clave)
+            if version is not None:
+                return version
+        result = await session.execute(
+            select(VersionTabla.tabla, VersionTabla.version).where(
+                VersionTabla.tabla.in_(nombres)  # type: ignore
+            )
+        )
+        versiones = dict(result.all())
+        version = ",".join(f"{nombre}:{versiones.get(nombre, 0)}" for nombre in nombres)
+        if self.cache is not None:
+            self.cache.set(clave, version)
+        return version
+
+    async def get(
+        self,
+        session: AsyncSession,
+        id: int | str,
+        expand: Sequence[str] | None = None,
+        version: str | None = None,
+    ):
+        """
+        Obtiene un objeto por su ID, con las relaciones pedidas en `expand`.
+
+        `version` es la devuelta por `get_version`; solo se usa en la llave de caché.
+        """
+        opciones = self.opciones_carga(expand)
+        # La caché guarda copias sin relaciones, por eso no se usa al expandir
+        if self.cache is None or expand:
+            return await session.get(self.model, id, options=opciones)
+        clave = ("get", id, version)
+        result = self.cache.get(clave)
+        if result is None:
+            result = await session.get(self.model, id, options=opciones)
+            if result is not None:
+                result = self._copia(result)
+                self.cache.set(clave, result)
         return result
 
-    async def get_list(self, session: AsyncSession, skip: int = 0, limit: int = 100):
-        """Obtiene una lista de objetos de forma asíncrona."""
-        stmt = select(self.model).offset(skip).limit(limit)
+    async def get_list(
+        self,
+        session: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        after: str | None = None,
+        expand: Sequence[str] | None = None,
+        filtros: Sequence[Filtro] = (),
+        orden: Sequence[Orden] = (),
+        version: str | None = None,
+    ):
+        """
+        Obtiene una lista de objetos de forma asíncrona.
+
+        Si se proporciona `after` (cursor obtenido con `siguiente_cursor`) se usa
+        paginación por llave (keyset) y se ignora `skip`, de modo que cualquier
+        página cuesta lo mismo que la primera. `expand` carga las relaciones
+        indicadas (ver `opciones_carga`); `filtros` y `orden` vienen de
+        `parse_filtros` y `parse_orden`. `version` es la devuelta por
+        `get_version`; solo se usa en la llave de caché.
+        """
+        opciones = self.opciones_carga(expand)
+        cache = None if expand else self.cache
+        orden = self.columnas_orden(orden)
+        clave = ("list", skip, limit, after, tuple(filtros), tuple(orden), version)
+        if cache is not None:
+            items = cache.get(clave)
+            if items is not None:
+                return items
+        stmt = self._consulta_lista(
+            select(self.model).options(*opciones), skip, limit, after, filtros, orden
+        )
         result = await session.execute(stmt)
-        return result.scalars().all()  # type:ignore
+        items = result.scalars().all()
+        if cache is not None:
+            items = [self._copia(item) for item in items]
+            cache.set(clave, items)
+        return items  # type:ignore
+
+    async def get_filas(
+        self,
+        session: AsyncSession,
+        skip: int = 0,
+        limit: int = 100,
+        after: str | None = None,
+        filtros: Sequence[Filtro] = (),
+        orden: Sequence[Orden] = (),
+        version: str | None = None,
+        campos: Sequence[str] | None = None,
+    ) -> Sequence[Row]:
+        """
+        Lectura de solo lectura de la lista, como filas de Core en vez de objetos.
+
+        Mismos parámetros y mismas páginas que `get_list` (sin `expand`), pero
+        selecciona solo las columnas de `campos` (por defecto, todas las del
+        modelo) y no pasa por el ORM: no hay mapa de identidad, ni seguimiento
+        de cambios, ni objetos por fila. Las columnas del orden se agregan
+        siempre porque las necesita `siguiente_cursor`. Pensada para listas
+        grandes y reportes cuyo resultado va directo a `Serializador.filas`.
+        """
+        orden = self.columnas_orden(orden)
+        columnas = self.columnas_lectura(campos, orden)
+        clave = (
+            "filas",
+            skip,
+            limit,
+            after,
+            tuple(filtros),
+            tuple(orden),
+            version,
+            tuple(c.key for c in columnas),
+        )
+        if self.cache is not None:
+            filas = self.cache.get(clave)
+            if filas is not None:
+                return filas
+        stmt = self._consulta_lista(select(*columnas), skip, limit, after, filtros, orden)
+        # Directo sobre la conexión: la sesión no interviene (ni autoflush)
+        conn = await session.connection()
+        filas = (await conn.execute(stmt)).all()
+        if self.cache is not None:
+            # Las filas son inmutables: se comparten sin copiarlas
+            self.cache.set(clave, filas)
+        return filas
+
+    def columnas_lectura(
+        self, campos: Sequence[str] | None, orden: Sequence[Orden] = ()
+    ) -> list[Column]:
+        """
+        Columnas de la tabla para `get_filas`, en el orden del modelo.
+
+        Lanza InvalidFieldError si algún campo no es una columna del modelo.
+        """
+        tabla: Table = self.model.__table__  # type: ignore
+        disponibles = [c for c in self.model.model_fields if c in tabla.c]
+        if campos is None:
+            pedidos = set(disponibles)
+        else:
+            pedidos = set(campos)
+            for campo in campos:
+                if campo not in disponibles:
+                    raise InvalidFieldError(campo)
+        pedidos.update(o.campo for o in orden)
+        return [tabla.c[c] for c in disponibles if c in pedidos]
+
+    def _consulta_lista(
+        self,
+        stmt: Select,
+        skip: int,
+        limit: int,
+        after: str | None,
+        filtros: Sequence[Filtro],
+        orden: Sequence[Orden],
+    ) -> Select:
+        """Aplica filtros, orden y paginación (cursor o `skip`) a una consulta."""
+        for filtro in filtros:
+            columna = getattr(self.model, filtro.campo)
+            stmt = stmt.where(OPERADORES[filtro.operador](columna, filtro.valor))
+        stmt = stmt.order_by(
+            *(
+                getattr(self.model, o.campo).desc()
+                if o.descendente
+                else getattr(self.model, o.campo)
+                for o in orden
+            )
+        )
+        if after is not None:
+            valores = decodificar_cursor(
+                after,
+                [getattr(self.model, o.campo) for o in orden],
+                self._firma_orden(orden),
+            )
+            stmt = stmt.where(self._filtro_cursor(orden, valores))
+        else:
+            stmt = stmt.offset(skip)
+        return stmt.limit(limit)
+
+    def siguiente_cursor(
+        self, items: Sequence[ModelDB | Row], limit: int, orden: Sequence[Orden] = ()
+    ) -> str | None:
+        """
+        Devuelve el cursor de la página siguiente o None si no hay más datos.
+
+        Acepta tanto objetos de `get_list` como filas de `get_filas`.
+        """
+        if not items or len(items) < limit:
+            return None
+        ultimo = items[-1]
+        orden = self.columnas_orden(orden)
+        return codificar_cursor(
+            [getattr(ultimo, o.campo) for o in orden], self._firma_orden(orden)
+        )
 
     async def create(self, session: AsyncSession, obj: SQLModel):
-        """Crea un nuevo objeto de forma asíncrona."""
-        obj_in_data = obj.model_dump()
-        base_obj = self.model(**obj_in_data)
-        session.add(base_obj)
-        await session.commit()
-        await session.refresh(
-            base_obj
-        )  # Refresca para obtener el ID generado por la BD
-        return base_obj
+        """
+        Crea un nuevo objeto de forma asíncrona.
+
+        Usa un único `INSERT ... RETURNING`, por lo que el objeto devuelto trae
+        el ID y los valores por defecto generados sin un SELECT adicional.
+        """
+        creados = await self.create_many(session, [obj])
+        return creados[0]
 
     async def update(self, session: AsyncSession, id: int | str, obj: SQLModel):
-        """Actualiza un objeto existente de forma asíncrona."""
-        db_obj = await self.get(session, id)
-        if not db_obj:
-            raise ValueError(f"{obj.__class__.__name__} con ID {id} no encontrado")
+        """
+        Actualiza un objeto existente de forma asíncrona.
+
+        Emite un único `UPDATE ... WHERE id = :id RETURNING *`; devuelve None si
+        el objeto no existe.
+        """
         # Obtiene los datos a actualizar, excluyendo los no proporcionados (None)
-        update_data = obj.model_dump(exclude_none=True)
+        # y los no enviados, para no sobrescribir columnas con valores por defecto
+        columnas = self.model.__table__.columns.keys()  # type: ignore
+        update_data = {
+            key: value
+            for key, value in obj.model_dump(exclude_unset=True, exclude_none=True).items()
+            if key in columnas
+        }
         if not update_data:  # Si no se proporcionaron datos para actualizar
-            return self.model(**db_obj.model_dump())  # Devuelve el usuario sin cambios
-
-        # Actualiza los campos del objeto SQLAlchemy
-        for key, value in update_data.items():
-            # Verifica si el atributo existe en el objeto
-            if hasattr(db_obj, key) and getattr(db_obj, key) != value:
-                setattr(db_obj, key, value)
+            db_obj = await session.get(self.model, id)
+            return self._copia(db_obj) if db_obj else None  # Devuelve el objeto sin cambios
 
-        session.add(
-            db_obj
-        )  # Añade el objeto modificado a la sesión (necesario para commit)
+        stmt = (
+            update(self.model)
+            .where(self._filtro_id(id))
+            .values(**update_data)
+            .returning(self.model)
+        )
+        db_obj = (await session.scalars(stmt)).one_or_none()
+        if db_obj is None:
+            return None
+        actualizado = self._copia(db_obj)
         await session.commit()
-        await session.refresh(db_obj)
-        return self.model(**db_obj.model_dump())
+        self._invalidar()
+        return actualizado
 
     async def delete(self, session: AsyncSession, id: int | str) -> ModelDB | None:
-        """Elimina un objeto de forma asíncrona."""
-        db_obj = await self.get(session, id)
-        if not db_obj:
-            return None
+        """
+        Elimina un objeto de forma asíncrona.
 
-        await session.delete(db_obj)  # Marca para eliminación
+        Emite un único `DELETE ... RETURNING *`; devuelve el objeto eliminado,
+        útil como confirmación, o None si no existía.
+        """
+        stmt = delete(self.model).where(self._filtro_id(id)).returning(self.model)
+        db_obj = (await session.scalars(stmt)).one_or_none()
+        if db_obj is None:
+            return None
+        eliminado = self._copia(db_obj)
         await session.commit()  # Confirma la eliminación
-        # El objeto db_usuario todavía contiene los datos antes de ser eliminado,
-        # lo cual es útil si quieres devolverlo como confirmación.
-        return self.model(**db_obj.model_dump())
+        self._invalidar()
+        return eliminado
+
+    async def create_many(
+        self, session: AsyncSession, objs: Sequence[SQLModel]
+    ) -> list[ModelDB]:
+        """
+        Crea varios objetos en una sola transacción.
+
+        Se emite un INSERT multi-fila con RETURNING (agrupado en lotes por el
+        driver), por lo que los objetos devueltos traen los IDs generados y
+        conservan el orden de `objs`.
+        """
+        creados = await self._insertar(session, objs)
+        await session.commit()
+        self._invalidar()
+        return creados
+
+    async def _insertar(
+        self, session: AsyncSession, objs: Sequence[SQLModel]
+    ) -> list[ModelDB]:
+        """Inserta los objetos sin confirmar la transacción."""
+        if not objs:
+            return []
+        stmt = insert(self.model).returning(self.model, sort_by_parameter_order=True)
+        # Los campos no enviados se omiten para que apliquen los valores por defecto
+        datos = [obj.model_dump(exclude_unset=True) for obj in objs]
+        result = await session.scalars(stmt, datos)
+        return list(result.all())
+
+    async def update_many(
+        self, session: AsyncSession, objs: Sequence[SQLModel]
+    ) -> list[ModelDB | None]:
+        """
+        Actualiza varios objetos por su llave primaria en una sola transacción.
+
+        Devuelve, en el orden de `objs`, el objeto actualizado o None si no existe.
+        Al igual que `update`, solo se modifican los campos enviados y distintos
+        de None.
+        """
+        actualizados = await self._actualizar(session, objs)
+        await session.commit()
+        self._invalidar()
+        return actualizados
+
+    async def _actualizar(
+        self, session: AsyncSession, objs: Sequence[SQLModel]
+    ) -> list[ModelDB | None]:
+        """Actualiza los objetos por llave primaria sin confirmar la transacción."""
+        ids = [self.id_de(obj) for obj in objs]
+        if not ids:
+            return []
+        stmt = select(*self.pk_columns).where(self._filtro_ids(ids))
+        filas = (await session.execute(stmt)).tuples().all()
+        existentes = {self._llave_fila(fila) for fila in filas}
+        pks = {columna.key for columna in self.pk_columns}
+        datos = [
+            obj.model_dump(exclude_unset=True, exclude_none=True)
+            for obj, id in zip(objs, ids)
+            if self._llave(id) in existentes
+        ]
+        datos = [dato for dato in datos if dato.keys() - pks]
+        if datos:
+            # UPDATE por llave primaria ejecutado como executemany
+            await session.execute(update(self.model), datos)
+        stmt = (
+            select(self.model)
+            .where(self._filtro_ids([id for id in ids if self._llave(id) in existentes]))
+            .execution_options(populate_existing=True)
+        )
+        actualizados = {
+            self._llave(self.id_de(obj)): obj
+            for obj in (await session.scalars(stmt)).all()
+        }
+        return [actualizados.get(self._llave(id)) for id in ids]
+
+    async def delete_many(self, session: AsyncSession, ids: Sequence[Any]) -> list[bool]:
+        """
+        Elimina varios objetos con un solo DELETE ... RETURNING.
+
+        Devuelve, en el orden de `ids`, si cada objeto existía y fue eliminado.
+        """
+        if not ids:
+            return []
+        stmt = (
+            delete(self.model)
+            .where(self._filtro_ids(ids))
+            .returning(*self.pk_columns)
+        )
+        filas = (await session.execute(stmt)).tuples().all()
+        await session.commit()
+        self._invalidar()
+        eliminados = {self._llave_fila(fila) for fila in filas}
+        return [self._llave(id) in eliminados for id in ids]
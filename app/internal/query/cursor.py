@@ -0,0 +1,65 @@
+# app/internal/query/cursor.py
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from typing import Any, Sequence
+
+from sqlalchemy import ColumnElement
+
+from app.internal.gen.exceptions import InvalidCursorError
+
+
+def _a_json(valor: Any):
+    """Serializa los tipos que json no soporta de forma nativa."""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no soportado en cursor: {type(valor).__name__}")
+
+
+def _desde_json(valor: Any, columna: ColumnElement):
+    """Convierte un valor del cursor al tipo de Python de la columna."""
+    if valor is None:
+        return None
+    # Los TypeDecorator (p. ej. fechas de SQLModel) exponen el tipo real en impl
+    tipo = getattr(columna.type, "impl_instance", columna.type)
+    try:
+        python_type = tipo.python_type
+    except NotImplementedError:
+        return valor
+    try:
+        if python_type in (datetime, date):
+            return python_type.fromisoformat(valor)
+        return python_type(valor)
+    except (TypeError, ValueError):
+        raise InvalidCursorError(str(valor))
+
+
+def codificar_cursor(valores: Sequence[Any], orden: str = "") -> str:
+    """
+    Codifica los valores de la llave de ordenamiento en un cursor opaco.
+
+    `orden` identifica el ordenamiento de la lista; un cursor solo es válido
+    para el mismo ordenamiento con el que se generó.
+    """
+    crudo = json.dumps(
+        {"o": orden, "v": list(valores)}, default=_a_json, separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(
+    cursor: str, columnas: Sequence[ColumnElement], orden: str = ""
+) -> list[Any]:
+    """Decodifica un cursor opaco a los valores tipados de las columnas dadas."""
+    relleno = "=" * (-len(cursor) % 4)
+    try:
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+    except (binascii.Error, ValueError):
+        raise InvalidCursorError(cursor)
+    if not isinstance(datos, dict) or datos.get("o") != orden:
+        raise InvalidCursorError(cursor)
+    valores = datos.get("v")
+    if not isinstance(valores, list) or len(valores) != len(columnas):
+        raise InvalidCursorError(cursor)
+    return [_desde_json(valor, columna) for valor, columna in zip(valores, columnas)]
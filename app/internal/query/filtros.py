@@ -0,0 +1,107 @@
+# app/internal/query/filtros.py
+import operator
+from datetime import date, datetime
+from typing import Any, Callable, Iterable, NamedTuple, Sequence
+
+from sqlalchemy import ColumnElement
+
+from app.internal.gen.exceptions import InvalidFilterError, InvalidSortError
+
+# Operadores admitidos como sufijo del parámetro (campo__operador=valor).
+# Sin sufijo se aplica "eq".
+OPERADORES: dict[str, Callable[[ColumnElement, Any], ColumnElement]] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "in": lambda columna, valor: columna.in_(valor),
+    "isnull": lambda columna, valor: columna.is_(None) if valor else columna.is_not(None),
+}
+
+
+class Filtro(NamedTuple):
+    """Condición `campo <operador> valor` ya validada y tipada."""
+
+    campo: str
+    operador: str
+    valor: Any
+
+
+class Orden(NamedTuple):
+    """Campo de ordenamiento y su dirección."""
+
+    campo: str
+    descendente: bool = False
+
+
+def _convertir(valor: str, columna: ColumnElement, parametro: str) -> Any:
+    """Convierte el texto de un parámetro al tipo de Python de la columna."""
+    # Los TypeDecorator (p. ej. fechas de SQLModel) exponen el tipo real en impl
+    tipo = getattr(columna.type, "impl_instance", columna.type)
+    try:
+        python_type = tipo.python_type
+    except NotImplementedError:
+        return valor
+    try:
+        if python_type is bool:
+            return _a_bool(valor, parametro)
+        if python_type in (datetime, date):
+            return python_type.fromisoformat(valor)
+        return python_type(valor)
+    except (TypeError, ValueError):
+        raise InvalidFilterError(parametro)
+
+
+def _a_bool(valor: str, parametro: str) -> bool:
+    """Interpreta los valores booleanos habituales de una query string."""
+    if valor.lower() in ("1", "true", "yes"):
+        return True
+    if valor.lower() in ("0", "false", "no"):
+        return False
+    raise InvalidFilterError(parametro)
+
+
+def parse_filtros(
+    params: Iterable[tuple[str, str]],
+    columnas: dict[str, ColumnElement],
+    permitidos: Sequence[str],
+) -> list[Filtro]:
+    """
+    Interpreta parámetros `campo` o `campo__operador` como filtros tipados.
+
+    Solo se admiten los campos de `permitidos`; `in` recibe valores separados
+    por comas e `isnull` un booleano.
+    """
+    filtros = []
+    for parametro, valor in params:
+        campo, _, operador = parametro.partition("__")
+        operador = operador or "eq"
+        if campo not in permitidos or operador not in OPERADORES:
+            raise InvalidFilterError(parametro)
+        columna = columnas[campo]
+        if operador == "in":
+            tipado: Any = tuple(
+                _convertir(item, columna, parametro) for item in valor.split(",") if item
+            )
+        elif operador == "isnull":
+            tipado = _a_bool(valor, parametro)
+        else:
+            tipado = _convertir(valor, columna, parametro)
+        filtros.append(Filtro(campo, operador, tipado))
+    return filtros
+
+
+def parse_orden(order_by: str | None, permitidos: Sequence[str]) -> list[Orden]:
+    """Interpreta `order_by=campo,-otro` ("-" indica orden descendente)."""
+    orden = []
+    for item in (order_by or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        campo = item.removeprefix("-")
+        if campo not in permitidos:
+            raise InvalidSortError(campo)
+        orden.append(Orden(campo, item.startswith("-")))
+    return orden
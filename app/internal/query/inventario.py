@@ -1,4 +1,33 @@
 # app/internal/query/inventario.py
+from datetime import date, datetime
+from typing import AsyncIterator, Sequence
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import (
+    DATE,
+    DateTime,
+    Integer,
+    Row,
+    SmallInteger,
+    bindparam,
+    cast,
+    column,
+    delete,
+    func,
+    literal,
+    literal_column,
+    text,
+    union_all,
+    update,
+    values,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel, select
+
+from app.config import config
+from app.internal.gen.cache import TTLCache
+from app.models.particiones import asegurar_particiones, inicio_mes
 from app.models.inventario import (
     ElementoInventario,
     ElementoCompuestoInventario,
@@ -11,13 +40,41 @@ from app.models.inventario import (
     MovimientoInventario,
     TipoMovimientoInventario,
     EstadoElementoInventario,
+    SaldoInventario,
+    ResumenMovimientoDia,
+    ResumenMovimientoMes,
+    CorteSaldoInventario,
+    SaldoCorteInventario,
+    CierreInventario,
 )
+from app.internal.gen.exceptions import ClosedPeriodError, SignInUseError
 from app.internal.query.base import BaseQuery
 
+# Unidades armables por elemento compuesto y bodega. Depende de los saldos y de
+# la lista de materiales, por lo que se vacía al registrar movimientos y al
+# modificar los componentes de un compuesto.
+disponibles_cache = TTLCache(
+    "disponibles_compuestos", config.disponibles_cache_size, config.disponibles_cache_ttl
+)
+# Listas de precios vigentes por (tipo de precio, fecha); se vacía al modificar precios
+precios_cache = TTLCache(
+    "precios_vigentes", config.precios_cache_size, config.precios_cache_ttl
+)
+
 
 class ElementoInventarioQuery(BaseQuery[ElementoInventario]):
     """Clase de consulta para la entidad ElementoInventario."""
 
+    filter_fields = (
+        "id",
+        "bodega_inventario_id",
+        "grupo_inventario_id",
+        "estado_elemento_id",
+        "usuario_id",
+        "created_at",
+    )
+    sort_fields = ("id", "created_at")
+
     def __init__(self):
         super().__init__(ElementoInventario)
 
@@ -25,18 +82,120 @@ class ElementoInventarioQuery(BaseQuery[ElementoInventario]):
 class ElementoCompuestoInventarioQuery(BaseQuery[ElementoCompuestoInventario]):
     """Clase de consulta para la entidad ElementoCompuestoInventario."""
 
+    filter_fields = (
+        "id",
+        "bodega_inventario_id",
+        "grupo_inventario_id",
+        "estado_elemento_id",
+        "usuario_id",
+        "created_at",
+    )
+    sort_fields = ("id", "created_at")
+
     def __init__(self):
         super().__init__(ElementoCompuestoInventario)
 
+    def _invalidar(self) -> None:
+        """Altas y bajas de compuestos cambian el listado de unidades armables."""
+        super()._invalidar()
+        disponibles_cache.clear()
+
+    async def get_disponibles(
+        self,
+        session: AsyncSession,
+        ids: Sequence[int] | None = None,
+        bodega_inventario_id: int | None = None,
+    ) -> dict[int, int]:
+        """
+        Calcula cuántas unidades de cada compuesto se pueden armar.
+
+        Para cada compuesto es el mínimo, sobre sus componentes, de
+        `saldo del componente // cantidad requerida`; los saldos negativos
+        cuentan como cero y un compuesto sin componentes tiene 0 disponibles.
+        Todos los compuestos se resuelven con una sola consulta agregada sobre
+        los saldos. Si se da `bodega_inventario_id` solo cuenta el saldo de esa
+        bodega; si no, el de todas. Devuelve `{id: disponibles}` solo para los
+        compuestos que existen.
+        """
+        compuesto = self.model
+        componente = ElementosPorElementoCompuestoInventario
+        saldo = SaldoInventario
+        stock = (
+            select(
+                saldo.elemento_inventario_id,
+                func.sum(saldo.cantidad).label("cantidad"),
+            )
+            .where(saldo.elemento_inventario_id.is_not(None))  # type: ignore
+            .group_by(saldo.elemento_inventario_id)
+        )
+        if bodega_inventario_id is not None:
+            stock = stock.where(saldo.bodega_inventario_id == bodega_inventario_id)
+        stock = stock.subquery("stock")
+        armables = func.greatest(func.coalesce(stock.c.cantidad, 0), 0) / (
+            componente.cantidad
+        )
+        stmt = (
+            select(compuesto.id, func.coalesce(func.min(armables), 0))
+            .outerjoin(
+                componente,
+                componente.elemento_compuesto_inventario_id == compuesto.id,  # type: ignore
+            )
+            .outerjoin(
+                stock, stock.c.elemento_inventario_id == componente.elemento_inventario_id
+            )
+            .group_by(compuesto.id)
+        )
+        if ids is not None:
+            stmt = stmt.where(compuesto.id.in_(ids))  # type: ignore
+        result = await session.execute(stmt)
+        return {id: int(disponibles) for id, disponibles in result.tuples().all()}
+
+    async def get_disponible(
+        self,
+        session: AsyncSession,
+        id: int,
+        bodega_inventario_id: int | None = None,
+    ) -> int | None:
+        """Unidades armables de un compuesto, o None si no existe. Usa la caché."""
+        clave = ("uno", id, bodega_inventario_id)
+        disponible = disponibles_cache.get(clave)
+        if disponible is None:
+            resultado = await self.get_disponibles(session, [id], bodega_inventario_id)
+            disponible = resultado.get(id)
+            if disponible is not None:
+                disponibles_cache.set(clave, disponible)
+        return disponible
+
+    async def get_disponibles_todos(
+        self, session: AsyncSession, bodega_inventario_id: int | None = None
+    ) -> dict[int, int]:
+        """Unidades armables de todos los compuestos. Usa la caché."""
+        clave = ("todos", bodega_inventario_id)
+        disponibles = disponibles_cache.get(clave)
+        if disponibles is None:
+            disponibles = await self.get_disponibles(
+                session, bodega_inventario_id=bodega_inventario_id
+            )
+            disponibles_cache.set(clave, disponibles)
+        return disponibles
+
 
 class ElementosPorElementoCompuestoInventarioQuery(
     BaseQuery[ElementosPorElementoCompuestoInventario]
 ):
     """Clase de consulta para la entidad ElementosPorElementoCompuestoInventario."""
 
+    filter_fields = ("elemento_compuesto_inventario_id", "elemento_inventario_id")
+    sort_fields = filter_fields
+
     def __init__(self):
         super().__init__(ElementosPorElementoCompuestoInventario)
 
+    def _invalidar(self) -> None:
+        """Los cambios en la lista de materiales alteran las unidades armables."""
+        super()._invalidar()
+        disponibles_cache.clear()
+
 
 class BodegaInventarioQuery(BaseQuery[BodegaInventario]):
     """Clase de consulta para la entidad BodegaInventario."""
@@ -62,9 +221,53 @@ class UnidadMedidaQuery(BaseQuery[UnidadMedida]):
 class PrecioElementoInventarioQuery(BaseQuery[PrecioElementoInventario]):
     """Clase de consulta para la entidad PrecioElementoInventario."""
 
+    filter_fields = ("id", "elemento_inventario_id", "tipo_precio_id")
+    sort_fields = filter_fields
+
     def __init__(self):
         super().__init__(PrecioElementoInventario)
 
+    def _invalidar(self) -> None:
+        """Cualquier cambio de precios invalida las listas vigentes en caché."""
+        super()._invalidar()
+        precios_cache.clear()
+
+    def vigencia(self):
+        """
+        Rango de vigencia `daterange(fini, ffin, '[]')`.
+
+        Es la misma expresión de la restricción ex_precios_vigencia, de modo que
+        las búsquedas con `@>` usan su índice GiST.
+        """
+        return func.daterange(
+            self.model.fini, self.model.ffin, literal_column("'[]'")
+        )
+
+    async def get_lista_vigente(
+        self, session: AsyncSession, tipo_precio_id: int, fecha: date
+    ) -> dict[int, PrecioElementoInventario]:
+        """
+        Lista de precios de un tipo vigente en una fecha, por elemento.
+
+        La lista completa se carga con una consulta y se guarda en caché, por lo
+        que las búsquedas siguientes de cualquier elemento no van a la base de
+        datos. La restricción de exclusión garantiza un único precio por elemento.
+        """
+        clave = (tipo_precio_id, fecha)
+        lista = precios_cache.get(clave)
+        if lista is None:
+            stmt = select(self.model).where(
+                self.model.tipo_precio_id == tipo_precio_id,
+                self.vigencia().op("@>")(fecha),
+            )
+            result = await session.scalars(stmt)
+            lista = {
+                precio.elemento_inventario_id: self._copia(precio)
+                for precio in result.all()
+            }
+            precios_cache.set(clave, lista)
+        return lista
+
 
 class TipoPrecioElementoInventarioQuery(BaseQuery[TipoPrecioElementoInventario]):
     """Clase de consulta para la entidad TipoPrecioElementoInventario."""
@@ -73,12 +276,859 @@ class TipoPrecioElementoInventarioQuery(BaseQuery[TipoPrecioElementoInventario])
         super().__init__(TipoPrecioElementoInventario)
 
 
+class SaldoInventarioQuery(BaseQuery[SaldoInventario]):
+    """Clase de consulta para el saldo materializado por elemento y bodega."""
+
+    # Columnas que identifican un saldo; deben coincidir con ux_saldos_inventario_clave
+    clave = (
+        "elemento_inventario_id",
+        "elemento_compuesto_inventario_id",
+        "bodega_inventario_id",
+    )
+
+    def __init__(self):
+        super().__init__(SaldoInventario)
+
+    async def get_saldos(
+        self,
+        session: AsyncSession,
+        elemento_inventario_id: int | None = None,
+        elemento_compuesto_inventario_id: int | None = None,
+        bodega_inventario_id: int | None = None,
+    ):
+        """Obtiene los saldos que coinciden con los filtros dados."""
+        stmt = select(self.model).order_by(*self.cursor_columns)
+        filtros = {
+            "elemento_inventario_id": elemento_inventario_id,
+            "elemento_compuesto_inventario_id": elemento_compuesto_inventario_id,
+            "bodega_inventario_id": bodega_inventario_id,
+        }
+        for campo, valor in filtros.items():
+            if valor is not None:
+                stmt = stmt.where(getattr(self.model, campo) == valor)
+        result = await session.execute(stmt)
+        return result.scalars().all()
+
+    async def aplicar_movimientos(
+        self,
+        session: AsyncSession,
+        movimientos: Sequence[MovimientoInventario],
+        signo: int = 1,
+    ):
+        """
+        Suma los movimientos dados a los saldos con una sola sentencia.
+
+        Con `signo=-1` los resta, para revertir movimientos modificados o
+        eliminados. No confirma la transacción: debe ejecutarse en la misma
+        transacción en la que se escriben los movimientos.
+        """
+        if not movimientos:
+            return
+        filas = values(
+            column("elemento_inventario_id", Integer),
+            column("elemento_compuesto_inventario_id", Integer),
+            column("bodega_inventario_id", Integer),
+            column("tipo_movimiento_id", SmallInteger),
+            column("cantidad", Integer),
+            name="movimientos",
+        ).data(
+            [
+                (
+                    m.elemento_inventario_id,
+                    m.elemento_compuesto_inventario_id,
+                    m.bodega_inventario_id,
+                    m.tipo_movimiento_id,
+                    m.cantidad * signo,
+                )
+                for m in movimientos
+            ]
+        )
+        tipo = TipoMovimientoInventario
+        # VALUES no tipa los NULL, por eso las llaves se convierten explícitamente
+        claves = [cast(filas.c[campo], Integer) for campo in self.clave]
+        origen = (
+            select(
+                *claves,
+                func.sum(filas.c.cantidad * tipo.signo),
+                func.now(),
+            )
+            .join(tipo, tipo.id == filas.c.tipo_movimiento_id)  # type: ignore
+            .group_by(*claves)
+        )
+        stmt = insert(self.model).from_select(
+            [*self.clave, "cantidad", "updated_at"], origen
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[text(f"coalesce({campo}, 0)") for campo in self.clave],
+            set_={
+                "cantidad": self.model.cantidad + stmt.excluded.cantidad,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        await session.execute(stmt)
+
+    async def recalcular(self, session: AsyncSession) -> int:
+        """
+        Reconstruye todos los saldos a partir del libro de movimientos.
+
+        Si hay un cierre de periodo parte de su corte de apertura y solo suma
+        los movimientos posteriores, porque los anteriores pueden estar en
+        particiones archivadas (ver `CorteSaldoInventarioQuery.cerrar`).
+        """
+        # Bloquea los saldos para que los movimientos concurrentes esperen a la reconstrucción
+        await session.execute(
+            text(f"LOCK TABLE {self.model.__tablename__} IN EXCLUSIVE MODE")
+        )
+        await session.execute(self.model.__table__.delete())  # type: ignore
+        cierre = await corte_saldo_inventario_query.get_cierre(session)
+        actuales = corte_saldo_inventario_query.saldos_desde(cierre).subquery("saldos")
+        origen = select(*actuales.c, func.now())
+        stmt = insert(self.model).from_select(
+            [*self.clave, "cantidad", "updated_at"], origen
+        )
+        result = await session.execute(stmt.returning(self.model.id))
+        saldos = len(result.all())
+        await session.commit()
+        disponibles_cache.clear()
+        return saldos
+
+
+class CorteSaldoInventarioQuery(BaseQuery[CorteSaldoInventario]):
+    """Clase de consulta para las instantáneas (cortes) de saldos."""
+
+    clave = SaldoInventarioQuery.clave
+
+    def __init__(self):
+        super().__init__(CorteSaldoInventario)
+
+    async def get_corte_anterior(
+        self, session: AsyncSession, fecha: datetime
+    ) -> CorteSaldoInventario | None:
+        """Corte más reciente con fecha menor o igual a la dada."""
+        stmt = (
+            select(self.model)
+            .where(self.model.fecha <= fecha)
+            .order_by(self.model.fecha.desc())  # type: ignore
+            .limit(1)
+        )
+        return (await session.scalars(stmt)).first()
+
+    def _saldos_a(
+        self,
+        fecha: datetime | None,
+        corte: CorteSaldoInventario | CierreInventario | None,
+        filtros: dict[str, int | None] | None = None,
+    ):
+        """
+        SELECT de los saldos por clave con los movimientos anteriores a `fecha`.
+
+        Parte de los saldos del corte (si se da) y solo suma los movimientos
+        entre la fecha del corte y `fecha` (o todos los posteriores si `fecha`
+        es None), de modo que el costo depende del intervalo entre cortes y no
+        de la antigüedad de los datos. También acepta un cierre, que se
+        resuelve a su corte de apertura.
+        """
+        if isinstance(corte, CierreInventario):
+            corte = CorteSaldoInventario(id=corte.corte_id, fecha=corte.fecha)
+        movimiento = MovimientoInventario
+        tipo = TipoMovimientoInventario
+        saldo = SaldoCorteInventario
+        movimientos = (
+            select(
+                *[getattr(movimiento, campo) for campo in self.clave],
+                (movimiento.cantidad * tipo.signo).label("cantidad"),
+            )
+            .join(tipo, tipo.id == movimiento.tipo_movimiento_id)  # type: ignore
+        )
+        if fecha is not None:
+            movimientos = movimientos.where(movimiento.created_at < fecha)
+        partes = []
+        if corte is not None:
+            movimientos = movimientos.where(movimiento.created_at >= corte.fecha)
+            partes.append(
+                select(
+                    *[getattr(saldo, campo) for campo in self.clave], saldo.cantidad
+                ).where(saldo.corte_id == corte.id)
+            )
+        partes.append(movimientos)
+        for campo, valor in (filtros or {}).items():
+            if valor is not None:
+                partes = [
+                    parte.where(parte.selected_columns[campo] == valor)
+                    for parte in partes
+                ]
+        origen = union_all(*partes).subquery("origen")
+        claves = [origen.c[campo] for campo in self.clave]
+        return select(*claves, func.sum(origen.c.cantidad).label("cantidad")).group_by(
+            *claves
+        )
+
+    def saldos_desde(self, cierre: CierreInventario | None):
+        """SELECT de los saldos actuales: la apertura del cierre y los movimientos vivos."""
+        return self._saldos_a(None, cierre)
+
+    async def get_saldos_a(
+        self,
+        session: AsyncSession,
+        fecha: datetime,
+        elemento_inventario_id: int | None = None,
+        elemento_compuesto_inventario_id: int | None = None,
+        bodega_inventario_id: int | None = None,
+    ) -> list[SaldoInventario]:
+        """Saldos con los movimientos anteriores a `fecha`, desde el corte más cercano."""
+        corte = await self.get_corte_anterior(session, fecha)
+        filtros = {
+            "elemento_inventario_id": elemento_inventario_id,
+            "elemento_compuesto_inventario_id": elemento_compuesto_inventario_id,
+            "bodega_inventario_id": bodega_inventario_id,
+        }
+        stmt = self._saldos_a(fecha, corte, filtros)
+        stmt = stmt.order_by(*stmt.selected_columns[: len(self.clave)])
+        result = await session.execute(stmt)
+        return [
+            SaldoInventario(**fila, updated_at=fecha) for fila in result.mappings().all()
+        ]
+
+    async def tomar(
+        self, session: AsyncSession, fecha: datetime
+    ) -> CorteSaldoInventario | None:
+        """
+        Crea el corte de saldos a `fecha` a partir del corte anterior.
+
+        Es idempotente: si ya existe un corte con esa fecha (p. ej. creado por
+        otro worker) no hace nada y devuelve None. `fecha` no puede ser
+        posterior a la hora de la base (ver `ahora`): los movimientos
+        registrados después quedarían fuera del corte sin invalidarlo.
+        """
+        if fecha > await self.ahora(session):
+            raise ValueError("No se puede tomar un corte futuro")
+        anterior = await self.get_corte_anterior(session, fecha)
+        if anterior is not None and anterior.fecha == fecha:
+            return None
+        corte = await self._insertar_corte(session, fecha, anterior)
+        if corte is None:
+            await session.rollback()
+            return None
+        corte = self._copia(corte)
+        await session.commit()
+        return corte
+
+    async def _insertar_corte(
+        self,
+        session: AsyncSession,
+        fecha: datetime,
+        anterior: CorteSaldoInventario | None,
+    ) -> CorteSaldoInventario | None:
+        """Inserta el corte y sus saldos sin confirmar; None si ya existía."""
+        stmt = (
+            insert(self.model)
+            .values(fecha=fecha)
+            .on_conflict_do_nothing(index_elements=["fecha"])
+            .returning(self.model)
+        )
+        corte = (await session.scalars(stmt)).one_or_none()
+        if corte is None:
+            return None
+        saldos = self._saldos_a(fecha, anterior).subquery("saldos")
+        origen = select(
+            literal(corte.id), *[saldos.c[campo] for campo in self.clave], saldos.c.cantidad
+        )
+        await session.execute(
+            insert(SaldoCorteInventario).from_select(
+                ["corte_id", *self.clave, "cantidad"], origen
+            )
+        )
+        return corte
+
+    async def ahora(self, session: AsyncSession) -> datetime:
+        """
+        Hora actual de la base de datos, sin zona.
+
+        Es el reloj del valor por defecto de `created_at` (`now()` en la zona
+        de la sesión), así que los límites de cortes y cierres se toman con él
+        y no con el del proceso, que puede ir adelantado o en otra zona.
+        """
+        return (await session.execute(select(func.localtimestamp()))).scalar_one()
+
+    async def get_cierre(self, session: AsyncSession) -> CierreInventario | None:
+        """Último cierre de periodo, o None si nunca se ha cerrado uno."""
+        stmt = (
+            select(CierreInventario)
+            .order_by(CierreInventario.fecha.desc())  # type: ignore
+            .limit(1)
+        )
+        return (await session.scalars(stmt)).first()
+
+    async def verificar_abierto(
+        self, session: AsyncSession, fechas: Sequence[datetime]
+    ) -> None:
+        """Lanza ClosedPeriodError si alguna fecha cae en un periodo cerrado."""
+        if not fechas:
+            return
+        cierre = await self.get_cierre(session)
+        if cierre is not None and min(fechas) < cierre.fecha:
+            raise ClosedPeriodError(cierre.fecha)
+
+    async def cerrar(
+        self, session: AsyncSession, fecha: datetime
+    ) -> CierreInventario | None:
+        """
+        Cierra el periodo anterior a `fecha` (inicio de mes) antes de archivarlo.
+
+        Toma, o reutiliza, el corte a `fecha` como saldo de apertura: desde
+        entonces los saldos se reconstruyen desde él y no se aceptan movimientos
+        con fecha anterior, así que desvincular las particiones de esos meses
+        no cambia el stock. Devuelve None si el periodo ya estaba cerrado.
+        """
+        if fecha != datetime.combine(inicio_mes(fecha), datetime.min.time()):
+            raise ValueError("El cierre debe ser al inicio de un mes")
+        if fecha > await self.ahora(session):
+            raise ValueError("No se puede cerrar un periodo futuro")
+        # Los movimientos retroactivos concurrentes, que invalidan cortes, esperan
+        # al cierre y después fallan por la llave foránea del corte de apertura
+        await session.execute(
+            text(f"LOCK TABLE {self.model.__tablename__} IN EXCLUSIVE MODE")
+        )
+        ultimo = await self.get_cierre(session)
+        if ultimo is not None and ultimo.fecha >= fecha:
+            await session.rollback()
+            return None
+        stmt = select(self.model).where(self.model.fecha == fecha)
+        corte = (await session.scalars(stmt)).first()
+        if corte is None:
+            anterior = await self.get_corte_anterior(session, fecha)
+            corte = await self._insertar_corte(session, fecha, anterior)
+        cierre = CierreInventario(fecha=fecha, corte_id=corte.id)  # type: ignore
+        session.add(cierre)
+        await session.commit()
+        return cierre
+
+    async def invalidar_desde(self, session: AsyncSession, fecha: datetime) -> None:
+        """
+        Elimina los cortes posteriores a `fecha`.
+
+        Se usa al registrar movimientos con fecha pasada y al modificar o
+        eliminar movimientos, que cambian los saldos de esos cortes. No
+        confirma la transacción.
+        """
+        await session.execute(delete(self.model).where(self.model.fecha > fecha))
+
+
+class ResumenMovimientoQuery(BaseQuery[ResumenMovimientoDia]):
+    """Clase de consulta para los resúmenes diarios y mensuales de movimientos."""
+
+    # Columnas que identifican un resumen dentro de un periodo; deben coincidir
+    # con la llave única de las tablas de resumen
+    clave = (
+        "elemento_inventario_id",
+        "elemento_compuesto_inventario_id",
+        "bodega_inventario_id",
+        "tipo_movimiento_id",
+    )
+    # Tabla de cada granularidad y unidad de date_trunc con la que se agrupa
+    resumenes = ((ResumenMovimientoDia, "day"), (ResumenMovimientoMes, "month"))
+
+    def __init__(self):
+        super().__init__(ResumenMovimientoDia)
+
+    def _desde_movimientos(self, modelo, unidad: str, fuente, signo: int = 1):
+        """
+        INSERT ... SELECT que agrupa los movimientos de `fuente` por periodo.
+
+        `fuente` es cualquier selectable con las columnas de MovimientoInventario
+        usadas por el resumen (la tabla completa o un VALUES con los nuevos).
+        Con `signo=-1` el conteo de movimientos sale negativo (ver
+        `aplicar_movimientos`); la cantidad ya debe venir con el signo aplicado.
+        """
+        # La unidad va como literal para que el SELECT y el GROUP BY coincidan
+        periodo = cast(
+            func.date_trunc(literal_column(f"'{unidad}'"), fuente.c.created_at), DATE
+        )
+        # VALUES no tipa los NULL, por eso las llaves se convierten explícitamente
+        claves = [cast(fuente.c[campo], Integer) for campo in self.clave]
+        conteo = func.count() if signo == 1 else func.count() * signo
+        origen = select(periodo, *claves, func.sum(fuente.c.cantidad), conteo).group_by(
+            periodo, *claves
+        )
+        return insert(modelo).from_select(
+            ["periodo", *self.clave, "cantidad", "movimientos"], origen
+        )
+
+    async def aplicar_movimientos(
+        self,
+        session: AsyncSession,
+        movimientos: Sequence[MovimientoInventario],
+        signo: int = 1,
+    ):
+        """
+        Suma los movimientos dados a los resúmenes diario y mensual.
+
+        Con `signo=-1` los resta, para revertir movimientos modificados o
+        eliminados, y borra los resúmenes que se quedan sin movimientos. No
+        confirma la transacción: debe ejecutarse en la misma transacción en la
+        que se escriben los movimientos.
+        """
+        if not movimientos:
+            return
+        filas = values(
+            column("created_at", DateTime),
+            column("elemento_inventario_id", Integer),
+            column("elemento_compuesto_inventario_id", Integer),
+            column("bodega_inventario_id", Integer),
+            column("tipo_movimiento_id", Integer),
+            column("cantidad", Integer),
+            name="movimientos",
+        ).data(
+            [
+                (
+                    m.created_at,
+                    m.elemento_inventario_id,
+                    m.elemento_compuesto_inventario_id,
+                    m.bodega_inventario_id,
+                    m.tipo_movimiento_id,
+                    m.cantidad * signo,
+                )
+                for m in movimientos
+            ]
+        )
+        for modelo, unidad in self.resumenes:
+            stmt = self._desde_movimientos(modelo, unidad, filas, signo)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[
+                    modelo.periodo,
+                    text("coalesce(elemento_inventario_id, 0)"),
+                    text("coalesce(elemento_compuesto_inventario_id, 0)"),
+                    text("coalesce(bodega_inventario_id, 0)"),
+                    modelo.tipo_movimiento_id,
+                ],
+                set_={
+                    "cantidad": modelo.cantidad + stmt.excluded.cantidad,
+                    "movimientos": modelo.movimientos + stmt.excluded.movimientos,
+                },
+            )
+            await session.execute(stmt)
+            if signo < 0:
+                fechas = [m.created_at for m in movimientos]
+                periodos = {
+                    inicio_mes(fecha) if unidad == "month" else fecha.date()
+                    for fecha in fechas
+                }
+                await session.execute(
+                    delete(modelo).where(
+                        modelo.periodo.in_(periodos),  # type: ignore
+                        modelo.movimientos <= 0,
+                    )
+                )
+
+    async def recalcular(self, session: AsyncSession) -> dict[str, int]:
+        """
+        Reconstruye los resúmenes a partir del libro de movimientos.
+
+        Los periodos anteriores al último cierre se conservan: sus movimientos
+        pueden estar archivados y ya no pueden cambiar.
+        """
+        cierre = await corte_saldo_inventario_query.get_cierre(session)
+        tabla = MovimientoInventario.__table__  # type: ignore
+        fuente = tabla
+        if cierre is not None:
+            fuente = (
+                select(tabla).where(tabla.c.created_at >= cierre.fecha).subquery()
+            )
+        totales = {}
+        for modelo, unidad in self.resumenes:
+            # Bloquea el resumen para que los movimientos concurrentes esperen
+            await session.execute(
+                text(f"LOCK TABLE {modelo.__tablename__} IN EXCLUSIVE MODE")
+            )
+            borrar = delete(modelo)
+            if cierre is not None:
+                # Los cierres son a inicio de mes: coinciden con ambos periodos
+                borrar = borrar.where(modelo.periodo >= cierre.fecha.date())
+            await session.execute(borrar)
+            stmt = self._desde_movimientos(modelo, unidad, fuente)
+            result = await session.execute(stmt.returning(modelo.id))
+            totales[modelo.__tablename__] = len(result.all())
+        await session.commit()
+        return totales
+
+    async def get_resumen(
+        self,
+        session: AsyncSession,
+        granularidad: str = "dia",
+        desde: date | None = None,
+        hasta: date | None = None,
+        elemento_inventario_id: int | None = None,
+        elemento_compuesto_inventario_id: int | None = None,
+        bodega_inventario_id: int | None = None,
+        tipo_movimiento_id: int | None = None,
+    ):
+        """
+        Obtiene los movimientos acumulados por periodo desde los resúmenes.
+
+        `granularidad` es "dia", "semana" o "mes"; las semanas (lunes a domingo)
+        se agregan desde el resumen diario. `desde` (inclusivo) y `hasta`
+        (exclusivo) se comparan con el día o el inicio del mes de cada fila.
+        """
+        modelo = ResumenMovimientoMes if granularidad == "mes" else ResumenMovimientoDia
+        periodo = modelo.periodo
+        if granularidad == "semana":
+            periodo = cast(
+                func.date_trunc(literal_column("'week'"), modelo.periodo), DATE
+            )
+        claves = [getattr(modelo, campo) for campo in self.clave]
+        stmt = (
+            select(
+                periodo.label("periodo"),
+                *claves,
+                func.sum(modelo.cantidad).label("cantidad"),
+                func.sum(modelo.movimientos).label("movimientos"),
+            )
+            .group_by(periodo, *claves)
+            .order_by(periodo, *claves)
+        )
+        if desde is not None:
+            stmt = stmt.where(modelo.periodo >= desde)
+        if hasta is not None:
+            stmt = stmt.where(modelo.periodo < hasta)
+        filtros = {
+            "elemento_inventario_id": elemento_inventario_id,
+            "elemento_compuesto_inventario_id": elemento_compuesto_inventario_id,
+            "bodega_inventario_id": bodega_inventario_id,
+            "tipo_movimiento_id": tipo_movimiento_id,
+        }
+        for campo, valor in filtros.items():
+            if valor is not None:
+                stmt = stmt.where(getattr(modelo, campo) == valor)
+        result = await session.execute(stmt)
+        return result.mappings().all()
+
+
 class MovimientoInventarioQuery(BaseQuery[MovimientoInventario]):
     """Clase de consulta para la entidad MovimientoInventario."""
 
+    # El libro de movimientos se recorre en orden cronológico
+    cursor_fields = ("created_at", "id")
+    filter_fields = (
+        "id",
+        "elemento_inventario_id",
+        "elemento_compuesto_inventario_id",
+        "bodega_inventario_id",
+        "tipo_movimiento_id",
+        "usuario_id",
+        "created_at",
+    )
+    sort_fields = ("created_at", "id")
+
     def __init__(self):
         super().__init__(MovimientoInventario)
 
+    def _invalidar(self) -> None:
+        """Los movimientos cambian los saldos y con ellos las unidades armables."""
+        super()._invalidar()
+        disponibles_cache.clear()
+
+    async def stream(
+        self,
+        session: AsyncSession,
+        desde: datetime | None = None,
+        hasta: datetime | None = None,
+        elemento_inventario_id: int | None = None,
+        elemento_compuesto_inventario_id: int | None = None,
+        bodega_inventario_id: int | None = None,
+        tamano_lote: int = 1000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Recorre los movimientos en orden cronológico con un cursor del servidor.
+
+        Entrega lotes de `tamano_lote` filas de Core con todas las columnas, sin
+        crear objetos del ORM; la memoria usada no depende del total de filas
+        exportadas.
+        """
+        stmt = select(*self.columnas_lectura(None)).order_by(*self.cursor_columns)
+        if desde is not None:
+            stmt = stmt.where(self.model.created_at >= desde)
+        if hasta is not None:
+            stmt = stmt.where(self.model.created_at < hasta)
+        filtros = {
+            "elemento_inventario_id": elemento_inventario_id,
+            "elemento_compuesto_inventario_id": elemento_compuesto_inventario_id,
+            "bodega_inventario_id": bodega_inventario_id,
+        }
+        for campo, valor in filtros.items():
+            if valor is not None:
+                stmt = stmt.where(getattr(self.model, campo) == valor)
+        conn = await session.connection()
+        result = await conn.stream(stmt.execution_options(yield_per=tamano_lote))
+        async for lote in result.partitions():
+            yield lote
+
+    @staticmethod
+    def fechas_de(objs: Sequence[SQLModel]) -> list[datetime]:
+        """
+        Fechas `created_at` enviadas en los objetos, normalizadas en ellos.
+
+        Los modelos de tabla no validan la entrada, así que pueden llegar como
+        texto y con zona horaria (p. ej. "...Z"). La columna no tiene zona: las
+        fechas con zona se pasan a la hora local de `config.local_timezone`,
+        la misma de `now()` en la base, y se guardan sin zona en el objeto antes
+        de compararlas con cierres o de crear particiones.
+        """
+        zona = ZoneInfo(config.local_timezone)
+        fechas = []
+        for obj in objs:
+            fecha = getattr(obj, "created_at", None)
+            if fecha is None:
+                continue
+            if isinstance(fecha, str):
+                fecha = datetime.fromisoformat(fecha)
+            if fecha.tzinfo is not None:
+                fecha = fecha.astimezone(zona).replace(tzinfo=None)
+            if fecha is not obj.created_at:  # type: ignore
+                obj.created_at = fecha  # type: ignore
+            fechas.append(fecha)
+        return fechas
+
+    async def _bloquear(
+        self, session: AsyncSession, ids: Sequence[int]
+    ) -> list[MovimientoInventario]:
+        """
+        Lee y bloquea (FOR UPDATE) los movimientos dados.
+
+        Devuelve copias con los valores anteriores al cambio; los bloqueos se
+        toman en orden de ID para que dos cambios concurrentes no se bloqueen
+        mutuamente.
+        """
+        stmt = (
+            select(self.model)
+            .where(self._filtro_ids(ids))
+            .order_by(self.model.id)
+            .with_for_update()
+        )
+        return [self._copia(m) for m in (await session.scalars(stmt)).all()]
+
+    async def _actualizar(
+        self, session: AsyncSession, objs: Sequence[SQLModel]
+    ) -> list[MovimientoInventario | None]:
+        """
+        Actualiza los movimientos por ID sin confirmar la transacción.
+
+        La llave de la tabla particionada incluye `created_at`, que también se
+        puede modificar, así que no sirve el UPDATE por llave primaria del ORM:
+        se emite un UPDATE de Core por ID (executemany) por cada combinación de
+        campos enviados.
+        """
+        tabla = self.model.__table__  # type: ignore
+        grupos: dict[tuple[str, ...], list[dict]] = {}
+        for obj in objs:
+            # Los campos enviados y distintos de None, como en BaseQuery.update
+            datos = {
+                campo: valor
+                for campo in obj.model_fields_set
+                if campo in tabla.c
+                and campo != "id"
+                and (valor := getattr(obj, campo)) is not None
+            }
+            if datos:
+                fila = {f"v_{campo}": valor for campo, valor in datos.items()}
+                grupos.setdefault(tuple(sorted(datos)), []).append(
+                    {**fila, "v_id": self.id_de(obj)}
+                )
+        for campos, filas in grupos.items():
+            stmt = (
+                update(tabla)
+                .where(tabla.c.id == bindparam("v_id"))
+                .values({campo: bindparam(f"v_{campo}") for campo in campos})
+            )
+            await session.execute(stmt, filas)
+        ids = [self.id_de(obj) for obj in objs]
+        stmt = (
+            select(self.model)
+            .where(self._filtro_ids(ids))
+            .execution_options(populate_existing=True)
+        )
+        actualizados = {m.id: m for m in (await session.scalars(stmt)).all()}
+        return [actualizados.get(id) for id in ids]
+
+    @staticmethod
+    def _afecta_saldos(
+        anterior: MovimientoInventario, nuevo: MovimientoInventario
+    ) -> bool:
+        """Indica si el cambio de un movimiento altera los saldos de algún corte."""
+        return any(
+            getattr(anterior, campo) != getattr(nuevo, campo)
+            for campo in (
+                *SaldoInventarioQuery.clave,
+                "tipo_movimiento_id",
+                "cantidad",
+                "created_at",
+            )
+        )
+
+    async def _actualizar_movimientos(
+        self, session: AsyncSession, objs: Sequence[SQLModel]
+    ) -> list[MovimientoInventario | None]:
+        """
+        Actualiza movimientos y traslada el cambio a saldos y resúmenes, sin confirmar.
+
+        Resta cada movimiento con sus valores anteriores y lo suma con los
+        nuevos, de modo que cambiar la cantidad, el tipo, el elemento, la
+        bodega o la fecha deja saldos y resúmenes iguales a los del libro, e
+        invalida los cortes que ya incluían el movimiento. Lanza
+        ClosedPeriodError si la fecha anterior o la nueva es de un periodo cerrado.
+        """
+        fechas = self.fechas_de(objs)
+        await corte_saldo_inventario_query.verificar_abierto(session, fechas)
+        # Antes de bloquear filas: crear una partición bloquea la tabla completa
+        await asegurar_particiones(session.bind, fechas)  # type: ignore
+        anteriores = await self._bloquear(session, [self.id_de(obj) for obj in objs])
+        await corte_saldo_inventario_query.verificar_abierto(
+            session, [m.created_at for m in anteriores]
+        )
+        actualizados = await self._actualizar(session, objs)
+        nuevos = [m for m in actualizados if m is not None]
+        await saldo_inventario_query.aplicar_movimientos(session, anteriores, signo=-1)
+        await saldo_inventario_query.aplicar_movimientos(session, nuevos)
+        await resumen_movimiento_query.aplicar_movimientos(
+            session, anteriores, signo=-1
+        )
+        await resumen_movimiento_query.aplicar_movimientos(session, nuevos)
+        # Los cortes posteriores a la fecha anterior o a la nueva ya incluyen el
+        # movimiento con otros valores; los que solo cambian el nombre no afectan
+        por_id = {m.id: m for m in nuevos}
+        fechas = [
+            fecha
+            for anterior in anteriores
+            if self._afecta_saldos(anterior, por_id[anterior.id])
+            for fecha in (anterior.created_at, por_id[anterior.id].created_at)
+        ]
+        if fechas:
+            await corte_saldo_inventario_query.invalidar_desde(session, min(fechas))
+        return actualizados
+
+    async def _eliminar_movimientos(
+        self, session: AsyncSession, ids: Sequence[int]
+    ) -> list[MovimientoInventario]:
+        """
+        Elimina movimientos y los resta de saldos y resúmenes, sin confirmar.
+
+        Invalida los cortes posteriores al movimiento más antiguo eliminado.
+        Lanza ClosedPeriodError si alguno es de un periodo cerrado.
+        """
+        stmt = delete(self.model).where(self._filtro_ids(ids)).returning(self.model)
+        eliminados = [self._copia(m) for m in (await session.scalars(stmt)).all()]
+        # Sin confirmar: si alguno es de un periodo cerrado la transacción se revierte
+        await corte_saldo_inventario_query.verificar_abierto(
+            session, [m.created_at for m in eliminados]
+        )
+        await saldo_inventario_query.aplicar_movimientos(
+            session, eliminados, signo=-1
+        )
+        await resumen_movimiento_query.aplicar_movimientos(
+            session, eliminados, signo=-1
+        )
+        if eliminados:
+            await corte_saldo_inventario_query.invalidar_desde(
+                session, min(m.created_at for m in eliminados)
+            )
+        return eliminados
+
+    async def update(
+        self, session: AsyncSession, id: int, obj: SQLModel
+    ) -> MovimientoInventario | None:
+        """Actualiza un movimiento; ver `_actualizar_movimientos`."""
+        datos = {campo: getattr(obj, campo) for campo in obj.model_fields_set}
+        datos["id"] = id
+        (actualizado,) = await self._actualizar_movimientos(
+            session, [self.model(**datos)]
+        )
+        if actualizado is None:
+            return None
+        await session.commit()
+        self._invalidar()
+        return actualizado
+
+    async def delete(
+        self, session: AsyncSession, id: int
+    ) -> MovimientoInventario | None:
+        """Elimina un movimiento; ver `_eliminar_movimientos`."""
+        eliminados = await self._eliminar_movimientos(session, [id])
+        if not eliminados:
+            return None
+        await session.commit()
+        self._invalidar()
+        return eliminados[0]
+
+    async def update_many(
+        self, session: AsyncSession, objs: Sequence[SQLModel]
+    ) -> list[MovimientoInventario | None]:
+        """Actualiza movimientos en lote; ver `_actualizar_movimientos`."""
+        if not objs:
+            return []
+        actualizados = await self._actualizar_movimientos(session, objs)
+        await session.commit()
+        self._invalidar()
+        return actualizados
+
+    async def delete_many(self, session: AsyncSession, ids: Sequence[int]) -> list[bool]:
+        """Elimina movimientos en lote; ver `_eliminar_movimientos`."""
+        if not ids:
+            return []
+        eliminados = {m.id for m in await self._eliminar_movimientos(session, ids)}
+        await session.commit()
+        self._invalidar()
+        return [id in eliminados for id in ids]
+
+    async def asignar_bodegas(
+        self, session: AsyncSession, movimientos: Sequence[MovimientoInventario]
+    ):
+        """Completa la bodega de los movimientos que no la traen con la de su elemento."""
+        pendientes = [m for m in movimientos if m.bodega_inventario_id is None]
+        for modelo, campo in (
+            (ElementoInventario, "elemento_inventario_id"),
+            (ElementoCompuestoInventario, "elemento_compuesto_inventario_id"),
+        ):
+            ids = {getattr(m, campo) for m in pendientes if getattr(m, campo)}
+            if not ids:
+                continue
+            stmt = select(modelo.id, modelo.bodega_inventario_id).where(
+                modelo.id.in_(ids)  # type: ignore
+            )
+            bodegas = dict((await session.execute(stmt)).tuples().all())
+            for m in pendientes:
+                if m.bodega_inventario_id is None and getattr(m, campo) in bodegas:
+                    m.bodega_inventario_id = bodegas[getattr(m, campo)]
+
+    async def create_many(
+        self, session: AsyncSession, objs: Sequence[SQLModel]
+    ) -> list[MovimientoInventario]:
+        """
+        Registra movimientos y actualiza saldos y resúmenes en la misma transacción.
+
+        `create` delega en este método, por lo que también aplica a altas individuales.
+        """
+        # Solo las fechas enviadas pueden caer en un periodo cerrado
+        await corte_saldo_inventario_query.verificar_abierto(
+            session,
+            self.fechas_de([obj for obj in objs if "created_at" in obj.model_fields_set]),
+        )
+        # Las fechas enviadas pueden caer en meses sin partición (cargas históricas)
+        await asegurar_particiones(session.bind, self.fechas_de(objs))  # type: ignore
+        await self.asignar_bodegas(session, objs)  # type: ignore
+        movimientos = await self._insertar(session, objs)
+        await saldo_inventario_query.aplicar_movimientos(session, movimientos)
+        await resumen_movimiento_query.aplicar_movimientos(session, movimientos)
+        # Los movimientos con fecha explícita pueden caer antes de cortes ya tomados
+        explicitas = [
+            movimiento.created_at
+            for obj, movimiento in zip(objs, movimientos)
+            if "created_at" in obj.model_fields_set
+        ]
+        if explicitas:
+            await corte_saldo_inventario_query.invalidar_desde(session, min(explicitas))
+        await session.commit()
+        self._invalidar()
+        return movimientos
+
 
 class TipoMovimientoInventarioQuery(BaseQuery[TipoMovimientoInventario]):
     """Clase de consulta para la entidad TipoMovimientoInventario."""
@@ -86,6 +1136,59 @@ class TipoMovimientoInventarioQuery(BaseQuery[TipoMovimientoInventario]):
     def __init__(self):
         super().__init__(TipoMovimientoInventario)
 
+    async def verificar_signos(
+        self, session: AsyncSession, signos: dict[int, int]
+    ) -> None:
+        """
+        Lanza SignInUseError si se cambia el signo de un tipo con movimientos.
+
+        Saldos, resúmenes y cortes aplican el signo vigente al registrar cada
+        movimiento; cambiarlo después los dejaría distintos del libro. Bloquea
+        los tipos antes de buscar sus movimientos, así que los movimientos que
+        se estén registrando con el signo anterior terminan antes de la búsqueda.
+        """
+        if not signos:
+            return
+        stmt = (
+            select(self.model.id, self.model.signo)
+            .where(self.model.id.in_(signos))  # type: ignore
+            .with_for_update()
+        )
+        actuales = dict((await session.execute(stmt)).tuples().all())
+        cambiados = [id for id, signo in actuales.items() if signo != signos[id]]
+        if not cambiados:
+            return
+        movimiento = MovimientoInventario
+        stmt = (
+            select(movimiento.tipo_movimiento_id)
+            .where(movimiento.tipo_movimiento_id.in_(cambiados))  # type: ignore
+            .limit(1)
+        )
+        en_uso = (await session.scalars(stmt)).first()
+        if en_uso is not None:
+            raise SignInUseError(en_uso)
+
+    @staticmethod
+    def _signos(objs: dict) -> dict[int, int]:
+        """Signos enviados, por ID de tipo."""
+        return {
+            id: obj.signo
+            for id, obj in objs.items()
+            if "signo" in obj.model_fields_set and obj.signo is not None
+        }
+
+    async def update(self, session: AsyncSession, id: int, obj: SQLModel):
+        """Actualiza un tipo; ver `verificar_signos`."""
+        await self.verificar_signos(session, self._signos({id: obj}))
+        return await super().update(session, id, obj)
+
+    async def update_many(self, session: AsyncSession, objs: Sequence[SQLModel]):
+        """Actualiza tipos en lote; ver `verificar_signos`."""
+        await self.verificar_signos(
+            session, self._signos({self.id_de(obj): obj for obj in objs})
+        )
+        return await super().update_many(session, objs)
+
 
 class EstadoElementoInventarioQuery(BaseQuery[EstadoElementoInventario]):
     """Clase de consulta para la entidad EstadoElementoInventario."""
@@ -109,3 +1212,6 @@ elementos_por_elemento_compuesto_inventario_query = (
 precio_elemento_inventario_query = PrecioElementoInventarioQuery()
 tipo_precio_elemento_inventario_query = TipoPrecioElementoInventarioQuery()
 movimiento_inventario_query = MovimientoInventarioQuery()
+saldo_inventario_query = SaldoInventarioQuery()
+resumen_movimiento_query = ResumenMovimientoQuery()
+corte_saldo_inventario_query = CorteSaldoInventarioQuery()
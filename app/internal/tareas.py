@@ -0,0 +1,53 @@
+# app/internal/tareas.py
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from app.internal.query.inventario import corte_saldo_inventario_query
+from app.models.database import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# Espera tras el límite de cada intervalo antes de tomar el corte, para que las
+# transacciones con movimientos anteriores al límite alcancen a confirmarse
+MARGEN_CORTE = timedelta(minutes=5)
+
+
+def ultimo_limite(ahora: datetime, intervalo: timedelta) -> datetime:
+    """Último límite de intervalo anterior a `ahora`, contando desde la medianoche."""
+    medianoche = datetime.combine(ahora.date(), datetime.min.time())
+    return medianoche + ((ahora - medianoche) // intervalo) * intervalo
+
+
+async def ahora_base() -> datetime:
+    """Hora actual de la base de datos, el mismo reloj de `created_at`."""
+    async with AsyncSessionLocal() as session:
+        return await corte_saldo_inventario_query.ahora(session)
+
+
+async def tomar_corte(fecha: datetime):
+    """Toma el corte de saldos a `fecha` en una sesión propia."""
+    async with AsyncSessionLocal() as session:
+        return await corte_saldo_inventario_query.tomar(session, fecha)
+
+
+async def programar_cortes(intervalo_horas: float):
+    """
+    Toma un corte de saldos en cada límite de intervalo (desde la medianoche).
+
+    Cada worker ejecuta su propia copia de la tarea; `tomar` es idempotente,
+    por lo que solo uno de ellos crea cada corte. Los límites se calculan con
+    el reloj de la base, el mismo de `created_at`.
+    """
+    intervalo = timedelta(hours=intervalo_horas)
+    while True:
+        try:
+            ahora = await ahora_base()
+            limite = ultimo_limite(ahora - MARGEN_CORTE, intervalo)
+            await tomar_corte(limite)
+        except Exception:
+            logger.exception("No se pudo tomar el corte de saldos")
+            await asyncio.sleep(MARGEN_CORTE.total_seconds())
+            continue
+        siguiente = limite + intervalo + MARGEN_CORTE
+        await asyncio.sleep(max((siguiente - ahora).total_seconds(), 1))
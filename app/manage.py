@@ -0,0 +1,160 @@
+# app/manage.py
+"""
+Comandos de mantenimiento de la base de datos.
+
+Uso:
+    python -m app.manage migrar [--tipos-salida ID ...]
+    python -m app.manage esquema
+    python -m app.manage particiones [--meses N]
+    python -m app.manage archivar --antes AAAA-MM-DD
+    python -m app.manage corte [--fecha AAAA-MM-DDTHH:MM]
+"""
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta
+
+from app.config import config
+from app.internal.query.inventario import corte_saldo_inventario_query
+from app.internal.tareas import ahora_base, tomar_corte, ultimo_limite
+from app.models import usuario  # noqa: F401  # registra UsuarioDB para las relaciones
+from app.models.database import AsyncSessionLocal, async_engine, create_db_and_tables
+from app.models.esquema import VERSION_ESQUEMA, leer_version
+from app.models.particiones import (
+    crear_particiones_siguientes,
+    desvincular_particiones,
+    inicio_mes,
+)
+
+
+async def migrar(tipos_salida: list[int] | None):
+    """Aplica las migraciones pendientes, crea lo que falte y registra la versión."""
+    async with async_engine.connect() as conn:
+        anterior = await leer_version(conn)
+    aplicadas = await create_db_and_tables(tipos_salida)
+    print(
+        f"Esquema migrado de la versión {anterior} a la {VERSION_ESQUEMA} "
+        f"(pasos aplicados: {', '.join(map(str, aplicadas)) or 'ninguno'})"
+    )
+
+
+async def esquema():
+    """Muestra la versión del esquema aplicada y la que espera el código."""
+    async with async_engine.connect() as conn:
+        version = await leer_version(conn)
+    al_dia = version is not None and version >= VERSION_ESQUEMA
+    print(
+        f"Versión aplicada: {version}; esperada: {VERSION_ESQUEMA} "
+        f"({'al día' if al_dia else 'pendiente de migrar'})"
+    )
+
+
+async def particiones(meses: int):
+    """Crea las particiones de movimientos del mes actual y los siguientes."""
+    async with async_engine.begin() as conn:
+        creadas = await crear_particiones_siguientes(conn, meses)
+    print(f"Particiones creadas: {', '.join(creadas) or 'ninguna'}")
+
+
+async def archivar(antes: date):
+    """
+    Cierra el periodo anterior al mes de la fecha dada y desvincula sus particiones.
+
+    El cierre guarda los saldos de esos meses como apertura antes de desvincularlos.
+    """
+    fecha = datetime.combine(inicio_mes(antes), datetime.min.time())
+    async with AsyncSessionLocal() as session:
+        cierre = await corte_saldo_inventario_query.cerrar(session, fecha)
+    print(f"Cierre a {fecha}: {'creado' if cierre else 'ya existía'}")
+    desvinculadas = await desvincular_particiones(async_engine, antes)
+    print(f"Particiones desvinculadas: {', '.join(desvinculadas) or 'ninguna'}")
+
+
+async def corte(fecha: datetime | None):
+    """Toma un corte de saldos; por defecto al último límite de intervalo."""
+    if fecha is None:
+        fecha = ultimo_limite(
+            await ahora_base(), timedelta(hours=config.cortes_intervalo_horas or 24)
+        )
+    creado = await tomar_corte(fecha)
+    print(f"Corte a {fecha}: {'creado' if creado else 'ya existía'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m app.manage", description="Mantenimiento de la base de datos."
+    )
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    comando = comandos.add_parser(
+        "migrar",
+        help=(
+            "Aplica los pasos de migración pendientes según la versión registrada, "
+            "crea las tablas, índices, particiones y triggers que falten y "
+            "registra la versión del esquema. Ejecútelo antes de cada despliegue."
+        ),
+    )
+    comando.add_argument(
+        "--tipos-salida",
+        type=int,
+        nargs="*",
+        help=(
+            "IDs de los tipos de movimiento de salida (signo -1) al migrar una base "
+            "con el esquema original, que no registra el signo. Requerido si hay "
+            "movimientos; sin IDs, todos los tipos son entradas."
+        ),
+    )
+    comandos.add_parser(
+        "esquema", help="Muestra la versión del esquema aplicada y la esperada."
+    )
+
+    comando = comandos.add_parser(
+        "particiones", help="Crea por adelantado las particiones mensuales."
+    )
+    comando.add_argument(
+        "--meses",
+        type=int,
+        default=config.particiones_meses_adelante,
+        help="Meses a crear después del actual.",
+    )
+
+    comando = comandos.add_parser(
+        "archivar",
+        help=(
+            "Cierra el periodo anterior al mes de la fecha dada (sus saldos quedan "
+            "como apertura y no admite más movimientos), desvincula sin bloquear "
+            "la tabla sus particiones y las renombra con el prefijo archivo_."
+        ),
+    )
+    comando.add_argument("--antes", type=date.fromisoformat, required=True)
+
+    comando = comandos.add_parser(
+        "corte", help="Toma un corte (instantánea) de los saldos de inventario."
+    )
+    comando.add_argument(
+        "--fecha",
+        type=datetime.fromisoformat,
+        help="Instante del corte; por defecto el último límite de intervalo.",
+    )
+
+    args = parser.parse_args()
+
+    async def ejecutar():
+        try:
+            if args.comando == "migrar":
+                await migrar(args.tipos_salida)
+            elif args.comando == "esquema":
+                await esquema()
+            elif args.comando == "particiones":
+                await particiones(args.meses)
+            elif args.comando == "archivar":
+                await archivar(args.antes)
+            elif args.comando == "corte":
+                await corte(args.fecha)
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(ejecutar())
+
+
+if __name__ == "__main__":
+    main()
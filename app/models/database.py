@@ -5,7 +5,7 @@ from fastapi import Depends
 from typing import Annotated
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Sequence
 
 from sqlalchemy import URL
 from sqlalchemy.ext.asyncio import (
@@ -16,6 +16,9 @@ from sqlmodel import SQLModel
 
 
 from app.config import config
+from app.internal.gen.exceptions import SchemaOutdatedError
+from app.internal.gen.metrics import metricas
+from app.internal.gen.pool import MeasuredAsyncQueuePool, pool_metrics
 
 SQLModel.metadata.schema = (
     "public"  # Asegúrate de que todas las tablas se creen en el esquema correcto
@@ -30,7 +33,18 @@ url = URL.create(
     query={"options": "-csearch_path=public"},
 )
 
-async_engine = create_async_engine(url)
+async_engine = create_async_engine(
+    url,
+    poolclass=MeasuredAsyncQueuePool,
+    pool_size=config.db_pool_size,
+    max_overflow=config.db_max_overflow,
+    pool_timeout=config.db_pool_timeout,
+    pool_recycle=config.db_pool_recycle,
+    pool_pre_ping=config.db_pool_pre_ping,
+    connect_args={"prepare_threshold": config.db_prepare_threshold},
+)
+pool_metrics.registrar(async_engine.sync_engine)
+metricas.registrar_engine(async_engine.sync_engine)
 
 
 AsyncSessionLocal = async_sessionmaker(
@@ -48,7 +62,46 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
 AsyncSessionDep = Annotated[AsyncSession, Depends(get_async_session)]
 
 
-async def create_db_and_tables():
-    """Crea las tablas de la base de datos si no existen."""
+async def create_db_and_tables(tipos_salida: Sequence[int] | None = None) -> list[int]:
+    """
+    Crea lo que falte del esquema, aplica las migraciones pendientes y registra
+    su versión. Devuelve las versiones aplicadas (ver `migrar_esquema`).
+
+    `tipos_salida` son los tipos de movimiento de salida de una base con el
+    esquema original, que no registra el signo (ver `asignar_signos`).
+
+    Ejecuta `create_all`, que consulta el catálogo tabla por tabla: no se llama
+    en el arranque sino con `python -m app.manage migrar` (ver `verificar_esquema`).
+    """
+    # Importación diferida: particiones depende de los modelos de inventario
+    from app.models.esquema import VERSION_ESQUEMA, leer_version, registrar_version
+    from app.models.migraciones import migrar_esquema
+    from app.models.particiones import crear_particiones_siguientes
+    from app.models.versiones import instalar_versiones
+
+    async with async_engine.connect() as conn:
+        anterior = await leer_version(conn)
     async with async_engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
+        aplicadas = await migrar_esquema(conn, anterior, tipos_salida=tipos_salida)
+        await crear_particiones_siguientes(conn, config.particiones_meses_adelante)
+        await instalar_versiones(conn)
+        await registrar_version(conn, VERSION_ESQUEMA)
+    return aplicadas
+
+
+async def verificar_esquema() -> int | None:
+    """
+    Comprueba, con una sola consulta, que el esquema de la base esté al día.
+
+    Devuelve la versión aplicada. Lanza SchemaOutdatedError si la base no tiene
+    esquema o tiene una versión anterior a la del código. Una versión posterior
+    se acepta: durante un despliegue los workers viejos conviven con el esquema
+    ya migrado.
+    """
+    from app.models.esquema import VERSION_ESQUEMA, leer_version
+
+    async with async_engine.connect() as conn:
+        version = await leer_version(conn)
+    if version is None or version < VERSION_ESQUEMA:
+        raise SchemaOutdatedError(version, VERSION_ESQUEMA)
+    return version
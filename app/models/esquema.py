@@ -0,0 +1,57 @@
+# app/models/esquema.py
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import Field, SQLModel
+
+# Versión del esquema que espera este código. Súbala en cada cambio de tablas,
+# índices, particiones o triggers, agregue el paso que la aplica a las bases
+# existentes en MIGRACIONES (app/models/migraciones.py) y aplíquela con
+# `python -m app.manage migrar`.
+VERSION_ESQUEMA = 1
+
+
+class VersionEsquema(SQLModel, table=True):
+    """
+    Versión del esquema aplicada a la base de datos (una sola fila).
+
+    Permite que el arranque compruebe el esquema con una sola consulta en vez
+    de ejecutar `create_all`, que consulta el catálogo tabla por tabla.
+    """
+
+    __tablename__ = "version_esquema"  # type: ignore
+
+    id: int = Field(default=1, primary_key=True)
+    version: int
+    aplicada: datetime = Field(default_factory=datetime.now)
+
+
+async def leer_version(conn: AsyncConnection) -> int | None:
+    """
+    Devuelve la versión aplicada, o None si la base aún no tiene esquema.
+
+    Si la tabla no existe la transacción de `conn` queda abortada: úsese una
+    conexión propia.
+    """
+    try:
+        result = await conn.execute(
+            select(VersionEsquema.version).where(VersionEsquema.id == 1)
+        )
+    except ProgrammingError:
+        # La tabla de versión no existe: base vacía o anterior a este control
+        return None
+    return result.scalar()
+
+
+async def registrar_version(conn: AsyncConnection, version: int) -> None:
+    """Guarda la versión aplicada; no confirma la transacción."""
+    stmt = insert(VersionEsquema).values(id=1, version=version, aplicada=datetime.now())
+    await conn.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[VersionEsquema.id],
+            set_={"version": stmt.excluded.version, "aplicada": stmt.excluded.aplicada},
+        )
+    )
@@ -1,7 +1,11 @@
 # app/models/inventario.py
-from datetime import datetime
+from datetime import date, datetime
+from sqlalchemy import CheckConstraint, Index, func, literal_column, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlmodel import Field, Relationship, SQLModel, SMALLINT, DATE, TEXT
 
+from app.models.versiones import versionar
+
 
 class BodegaInventario(SQLModel, table=True):
     __tablename__ = "bodegas_inventario"  # type: ignore
@@ -16,6 +20,9 @@ class BodegaInventario(SQLModel, table=True):
     elementos_compuestos_inventario: list["ElementoCompuestoInventario"] = Relationship(
         back_populates="bodega_inventario"
     )
+    movimientos_inventario: list["MovimientoInventario"] = Relationship(
+        back_populates="bodega_inventario"
+    )
 
 
 class GrupoInventario(SQLModel, table=True):
@@ -100,11 +107,16 @@ class EstadoElementoInventario(SQLModel, table=True):
 
 class ElementoInventario(SQLModel, table=True):
     __tablename__ = "elementos_inventario"  # type: ignore
-    id: int = Field(primary_key=True)
+    # Opcional: si no se envía lo asigna la base de datos
+    id: int | None = Field(default=None, primary_key=True)
     nombre: str = Field(max_length=120)
-    bodega_inventario_id: int | None = Field(foreign_key="bodegas_inventario.id")
+    bodega_inventario_id: int | None = Field(
+        foreign_key="bodegas_inventario.id", index=True
+    )
     # Añadida clave foránea
-    grupo_inventario_id: int | None = Field(foreign_key="grupos_inventario.id")
+    grupo_inventario_id: int | None = Field(
+        foreign_key="grupos_inventario.id", index=True
+    )
     cantidad: int | None = None
     unidad_medida_cantidad_id: int | None = Field(
         foreign_key="unidades_medida.id", default=None
@@ -118,10 +130,16 @@ class ElementoInventario(SQLModel, table=True):
         foreign_key="unidades_medida.id", default=None
     )
     descripcion: str | None = Field(sa_type=TEXT, max_length=250, default=None)
-    estado_elemento_id: int = Field(foreign_key="estados_elemento_inventario.id")
-    created_at: datetime = Field(default=datetime.now)
+    estado_elemento_id: int = Field(
+        foreign_key="estados_elemento_inventario.id", index=True
+    )
+    created_at: datetime = Field(
+        default_factory=datetime.now,
+        index=True,
+        sa_column_kwargs={"server_default": func.now()},
+    )
     # Añadida clave foránea
-    usuario_id: int | None = Field(foreign_key="usuarios.id", default=None)
+    usuario_id: int | None = Field(foreign_key="usuarios.id", index=True, default=None)
 
     # Relationships
     precios: list["PrecioElementoInventario"] = Relationship(
@@ -168,12 +186,15 @@ class ElementoInventario(SQLModel, table=True):
 class ElementoCompuestoInventario(SQLModel, table=True):
     # Nombre de tabla corregido para evitar conflictos
     __tablename__ = "elementos_compuestos_inventario"  # type: ignore
-    id: int = Field(primary_key=True)
+    # Opcional: si no se envía lo asigna la base de datos
+    id: int | None = Field(default=None, primary_key=True)
     nombre: str = Field(max_length=120)
-    bodega_inventario_id: int | None = Field(foreign_key="bodegas_inventario.id")
+    bodega_inventario_id: int | None = Field(
+        foreign_key="bodegas_inventario.id", index=True
+    )
     # Añadida clave foránea
     grupo_inventario_id: int | None = Field(
-        foreign_key="grupos_inventario.id", default=None
+        foreign_key="grupos_inventario.id", index=True, default=None
     )
     cantidad: int | None = None
     unidad_medida_cantidad_id: int | None = Field(
@@ -189,10 +210,16 @@ class ElementoCompuestoInventario(SQLModel, table=True):
     )
     descripcion: str | None = Field(sa_type=TEXT, max_length=250, default=None)
     # Corregido tipo a int y añadida clave foránea
-    estado_elemento_id: int = Field(foreign_key="estados_elemento_inventario.id")
-    created_at: datetime = Field(default=datetime.now)
+    estado_elemento_id: int = Field(
+        foreign_key="estados_elemento_inventario.id", index=True
+    )
+    created_at: datetime = Field(
+        default_factory=datetime.now,
+        index=True,
+        sa_column_kwargs={"server_default": func.now()},
+    )
     # Añadida clave foránea
-    usuario_id: int | None = Field(foreign_key="usuarios.id", default=None)
+    usuario_id: int | None = Field(foreign_key="usuarios.id", index=True, default=None)
 
     # Relationships
     elementos_inventario: list["ElementosPorElementoCompuestoInventario"] = (
@@ -238,13 +265,18 @@ class ElementoCompuestoInventario(SQLModel, table=True):
 
 class ElementosPorElementoCompuestoInventario(SQLModel, table=True):
     __tablename__ = "elementos_inventario_por_elemento_compuesto"  # type: ignore
+    __table_args__ = (
+        CheckConstraint("cantidad > 0", name="ck_elementos_por_compuesto_cantidad"),
+    )
     # Añadidos primary_key para la tabla de enlace
     elemento_compuesto_inventario_id: int = Field(
         foreign_key="elementos_compuestos_inventario.id", primary_key=True
     )
     elemento_inventario_id: int = Field(
-        foreign_key="elementos_inventario.id", primary_key=True
+        foreign_key="elementos_inventario.id", index=True, primary_key=True
     )
+    # Unidades del elemento necesarias para armar una unidad del compuesto
+    cantidad: int = Field(default=1, sa_column_kwargs={"server_default": text("1")})
 
     # Relationships
     elemento_inventario: "ElementoInventario" = Relationship(  # Usar cadena
@@ -270,13 +302,38 @@ class TipoPrecioElementoInventario(SQLModel, table=True):
 
 class PrecioElementoInventario(SQLModel, table=True):
     __tablename__ = "precios_elemento_inventario"  # type: ignore
-    id: int = Field(primary_key=True)
+    __table_args__ = (
+        CheckConstraint("ffin IS NULL OR ffin >= fini", name="ck_precios_vigencia"),
+        # Un elemento no puede tener dos precios del mismo tipo vigentes el mismo día.
+        # El índice GiST de la restricción también resuelve la búsqueda del precio
+        # vigente (ver PrecioElementoInventarioQuery.vigencia). Compara enteros con
+        # "=" dentro de un índice GiST: requiere btree_gist (ver migraciones.py).
+        ExcludeConstraint(
+            ("elemento_inventario_id", "="),
+            ("tipo_precio_id", "="),
+            (
+                func.daterange(
+                    literal_column("fini"), literal_column("ffin"), literal_column("'[]'")
+                ),
+                "&&",
+            ),
+            name="ex_precios_vigencia",
+            using="gist",
+        ),
+    )
+    # Opcional: si no se envía lo asigna la base de datos
+    id: int | None = Field(default=None, primary_key=True)
     # Añadida clave foránea
-    elemento_inventario_id: int = Field(foreign_key="elementos_inventario.id")
+    elemento_inventario_id: int = Field(
+        foreign_key="elementos_inventario.id", index=True
+    )
     precio: float
-    tipo_precio_id: int = Field(foreign_key="tipos_precio_elemento_inventario.id")
-    fini: datetime = Field(sa_type=DATE)
-    ffin: datetime | None = Field(sa_type=DATE, default=None)
+    tipo_precio_id: int = Field(
+        foreign_key="tipos_precio_elemento_inventario.id", index=True
+    )
+    # Vigencia del precio, ambos extremos inclusivos; ffin nulo = sin fecha de fin
+    fini: date = Field(sa_type=DATE)
+    ffin: date | None = Field(sa_type=DATE, default=None)
 
     # Relationships
     # Corregida la relación para que apunte a ElementoInventario
@@ -286,21 +343,43 @@ class PrecioElementoInventario(SQLModel, table=True):
 
 class MovimientoInventario(SQLModel, table=True):
     __tablename__ = "movimientos_inventario"  # type: ignore
-    id: int = Field(primary_key=True)
+    __table_args__ = (
+        # Soporta el orden y la paginación por cursor (created_at, id)
+        Index("ix_movimientos_inventario_created_at_id", "created_at", "id"),
+        # Particionada por mes de created_at (ver app/models/particiones.py)
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    # La llave primaria de la tabla incluye created_at, como exige el
+    # particionamiento; para el ORM y la API el identificador sigue siendo id
+    __mapper_args__ = {"primary_key": ["id"]}
+    # Opcional: si no se envía lo asigna la base de datos
+    id: int | None = Field(
+        default=None, primary_key=True, sa_column_kwargs={"autoincrement": True}
+    )
     nombre: str = Field(max_length=120)
     cantidad: int
     elemento_inventario_id: int | None = Field(
-        foreign_key="elementos_inventario.id", default=None
+        foreign_key="elementos_inventario.id", index=True, default=None
     )
     # Añadida clave foránea
     elemento_compuesto_inventario_id: int | None = Field(
-        foreign_key="elementos_compuestos_inventario.id", default=None
+        foreign_key="elementos_compuestos_inventario.id", index=True, default=None
+    )
+    # Bodega afectada; si no se envía se toma la bodega del elemento
+    bodega_inventario_id: int | None = Field(
+        foreign_key="bodegas_inventario.id", index=True, default=None
     )
     # Añadido campo y clave foránea para el tipo de movimiento
-    tipo_movimiento_id: int = Field(foreign_key="tipos_movimiento_inventario.id")
-    created_at: datetime = Field(default=datetime.now)
+    tipo_movimiento_id: int = Field(
+        foreign_key="tipos_movimiento_inventario.id", index=True
+    )
+    created_at: datetime = Field(
+        default_factory=datetime.now,
+        primary_key=True,
+        sa_column_kwargs={"server_default": func.now()},
+    )
     # Añadida clave foránea
-    usuario_id: int | None = Field(foreign_key="usuarios.id", default=None)
+    usuario_id: int | None = Field(foreign_key="usuarios.id", index=True, default=None)
 
     # Relationships
     elemento_inventario: "ElementoInventario" = Relationship(  # Usar cadena
@@ -314,15 +393,154 @@ class MovimientoInventario(SQLModel, table=True):
     tipo_movimiento: "TipoMovimientoInventario" = Relationship(  # Usar cadena
         back_populates="movimientos_inventario"
     )
+    bodega_inventario: "BodegaInventario" = Relationship(  # Usar cadena
+        back_populates="movimientos_inventario"
+    )
     usuario: "UsuarioDB" = Relationship(back_populates="movimientos_inventario")  # type: ignore  # noqa: F821
 
 
 class TipoMovimientoInventario(SQLModel, table=True):
     __tablename__ = "tipos_movimiento_inventario"  # type: ignore
+    __table_args__ = (
+        CheckConstraint("signo IN (-1, 1)", name="ck_tipos_movimiento_signo"),
+    )
     id: int = Field(sa_type=SMALLINT, primary_key=True)
     nombre: str = Field(max_length=50)
+    # 1 para entradas, -1 para salidas; se aplica a la cantidad del movimiento
+    signo: int = Field(sa_type=SMALLINT, default=1)
 
     # Relationships
     movimientos_inventario: list["MovimientoInventario"] = Relationship(
         back_populates="tipo_movimiento"
     )
+
+
+class SaldoInventario(SQLModel, table=True):
+    # Saldo materializado por elemento (o elemento compuesto) y bodega.
+    # Se actualiza en la misma transacción en que se registra cada movimiento.
+    __tablename__ = "saldos_inventario"  # type: ignore
+    __table_args__ = (
+        # Llave única de la combinación; coalesce permite incluir las columnas nulas
+        Index(
+            "ux_saldos_inventario_clave",
+            text("coalesce(elemento_inventario_id, 0)"),
+            text("coalesce(elemento_compuesto_inventario_id, 0)"),
+            text("coalesce(bodega_inventario_id, 0)"),
+            unique=True,
+        ),
+    )
+    id: int | None = Field(default=None, primary_key=True)
+    elemento_inventario_id: int | None = Field(
+        foreign_key="elementos_inventario.id", default=None
+    )
+    elemento_compuesto_inventario_id: int | None = Field(
+        foreign_key="elementos_compuestos_inventario.id", default=None
+    )
+    bodega_inventario_id: int | None = Field(
+        foreign_key="bodegas_inventario.id", default=None
+    )
+    cantidad: int = 0
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+class CorteSaldoInventario(SQLModel, table=True):
+    # Instantánea de los saldos: incluye los movimientos con created_at < fecha
+    __tablename__ = "cortes_saldo_inventario"  # type: ignore
+    id: int | None = Field(default=None, primary_key=True)
+    fecha: datetime = Field(unique=True)
+    created_at: datetime = Field(
+        default_factory=datetime.now, sa_column_kwargs={"server_default": func.now()}
+    )
+
+
+class SaldoCorteInventario(SQLModel, table=True):
+    # Saldo por elemento (o elemento compuesto) y bodega en un corte
+    __tablename__ = "saldos_corte_inventario"  # type: ignore
+    id: int | None = Field(default=None, primary_key=True)
+    corte_id: int = Field(
+        foreign_key="cortes_saldo_inventario.id", ondelete="CASCADE", index=True
+    )
+    elemento_inventario_id: int | None = Field(
+        foreign_key="elementos_inventario.id", default=None
+    )
+    elemento_compuesto_inventario_id: int | None = Field(
+        foreign_key="elementos_compuestos_inventario.id", default=None
+    )
+    bodega_inventario_id: int | None = Field(
+        foreign_key="bodegas_inventario.id", default=None
+    )
+    cantidad: int = 0
+
+
+class CierreInventario(SQLModel, table=True):
+    # Cierre de periodo: los movimientos anteriores a `fecha` (inicio de mes) se
+    # pueden archivar; sus saldos quedan en el corte de apertura `corte_id`
+    __tablename__ = "cierres_inventario"  # type: ignore
+    id: int | None = Field(default=None, primary_key=True)
+    fecha: datetime = Field(unique=True)
+    # RESTRICT: invalidar cortes nunca puede borrar un saldo de apertura
+    corte_id: int = Field(foreign_key="cortes_saldo_inventario.id", ondelete="RESTRICT")
+    created_at: datetime = Field(
+        default_factory=datetime.now, sa_column_kwargs={"server_default": func.now()}
+    )
+
+
+class ResumenMovimientoBase(SQLModel):
+    # Acumulado de movimientos por periodo, elemento, bodega y tipo de movimiento
+    periodo: date = Field(sa_type=DATE)
+    elemento_inventario_id: int | None = Field(
+        foreign_key="elementos_inventario.id", default=None
+    )
+    elemento_compuesto_inventario_id: int | None = Field(
+        foreign_key="elementos_compuestos_inventario.id", default=None
+    )
+    bodega_inventario_id: int | None = Field(
+        foreign_key="bodegas_inventario.id", default=None
+    )
+    tipo_movimiento_id: int = Field(foreign_key="tipos_movimiento_inventario.id")
+    # Suma de las cantidades (sin signo) y número de movimientos del periodo
+    cantidad: int = 0
+    movimientos: int = 0
+
+
+def _clave_resumen(nombre: str) -> Index:
+    """Llave única de un resumen; coalesce permite incluir las columnas nulas."""
+    return Index(
+        nombre,
+        "periodo",
+        text("coalesce(elemento_inventario_id, 0)"),
+        text("coalesce(elemento_compuesto_inventario_id, 0)"),
+        text("coalesce(bodega_inventario_id, 0)"),
+        "tipo_movimiento_id",
+        unique=True,
+    )
+
+
+class ResumenMovimientoDia(ResumenMovimientoBase, table=True):
+    # Resumen diario; periodo es el día. Se actualiza junto con cada movimiento.
+    __tablename__ = "resumenes_movimiento_dia"  # type: ignore
+    __table_args__ = (_clave_resumen("ux_resumenes_movimiento_dia_clave"),)
+    id: int | None = Field(default=None, primary_key=True)
+
+
+class ResumenMovimientoMes(ResumenMovimientoBase, table=True):
+    # Resumen mensual; periodo es el primer día del mes
+    __tablename__ = "resumenes_movimiento_mes"  # type: ignore
+    __table_args__ = (_clave_resumen("ux_resumenes_movimiento_mes_clave"),)
+    id: int | None = Field(default=None, primary_key=True)
+
+
+# Tablas con contador de versión para los ETags de la API. Solo las de pocas
+# escrituras: los movimientos y sus derivados cambian con cada transacción.
+versionar(
+    BodegaInventario,
+    GrupoInventario,
+    UnidadMedida,
+    EstadoElementoInventario,
+    TipoMovimientoInventario,
+    TipoPrecioElementoInventario,
+    ElementoInventario,
+    ElementoCompuestoInventario,
+    ElementosPorElementoCompuestoInventario,
+    PrecioElementoInventario,
+)
@@ -0,0 +1,239 @@
+# app/models/migraciones.py
+from typing import Any, Awaitable, Callable, Sequence
+
+from sqlalchemy import CheckConstraint, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import AddConstraint, CreateIndex
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.gen.exceptions import (
+    MissingExtensionError,
+    MovementSignRequiredError,
+    SchemaMismatchError,
+)
+from app.models.particiones import TABLA, particionar_tabla
+
+# Extensiones que requiere el esquema: btree_gist para la restricción de
+# exclusión ex_precios_vigencia, que compara enteros con "=" en un índice GiST
+EXTENSIONES = ["btree_gist"]
+
+
+async def requerir_extensiones(conn: AsyncConnection) -> list[str]:
+    """
+    Instala las extensiones que falten. Devuelve las que instaló.
+
+    CREATE EXTENSION requiere privilegios que el rol de la aplicación puede no
+    tener; en ese caso lanza MissingExtensionError antes de tocar el esquema,
+    para que un superusuario la instale y se vuelva a migrar.
+    """
+    result = await conn.execute(
+        text("SELECT extname FROM pg_extension WHERE extname = ANY(:nombres)"),
+        {"nombres": EXTENSIONES},
+    )
+    instaladas = set(result.scalars().all())
+    creadas = []
+    for extension in EXTENSIONES:
+        if extension in instaladas:
+            continue
+        try:
+            async with conn.begin_nested():
+                await conn.execute(text(f"CREATE EXTENSION IF NOT EXISTS {extension}"))
+        except DBAPIError as e:
+            raise MissingExtensionError(extension) from e
+        creadas.append(extension)
+    return creadas
+
+
+async def hay_esquema(conn: AsyncConnection) -> bool:
+    """Indica si la base ya tiene alguna de las tablas de los modelos."""
+    result = await conn.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_tables "
+            "WHERE schemaname = 'public' AND tablename = ANY(:tablas))"
+        ),
+        {"tablas": [tabla.name for tabla in SQLModel.metadata.sorted_tables]},
+    )
+    return bool(result.scalar())
+
+
+async def crear_restricciones(conn: AsyncConnection) -> list[str]:
+    """
+    Crea las restricciones CHECK y de exclusión de los modelos que falten.
+
+    `create_all` solo las crea junto con tablas nuevas. Si los datos existentes
+    no las cumplen, la migración falla y no se registra la versión.
+    """
+    result = await conn.execute(text("SELECT conname FROM pg_constraint"))
+    existentes = set(result.scalars().all())
+    creadas = []
+    for tabla in SQLModel.metadata.sorted_tables:
+        for restriccion in tabla.constraints:
+            if not isinstance(restriccion, (CheckConstraint, ExcludeConstraint)):
+                continue
+            if restriccion.name is None or restriccion.name in existentes:
+                continue
+            await conn.execute(AddConstraint(restriccion))
+            creadas.append(str(restriccion.name))
+    return creadas
+
+
+async def crear_indices(conn: AsyncConnection) -> None:
+    """Crea los índices de los modelos que falten, como los de llaves foráneas."""
+    for tabla in SQLModel.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            await conn.execute(CreateIndex(indice, if_not_exists=True))
+
+
+async def asignar_signos(
+    conn: AsyncConnection, tipos_salida: Sequence[int] | None
+) -> None:
+    """
+    Agrega el signo de los tipos de movimiento: -1 para `tipos_salida`, 1 el resto.
+
+    El esquema original no distingue entradas de salidas y los saldos se
+    reconstruyen con el signo, así que si hay movimientos y no se indican los
+    tipos de salida lanza MovementSignRequiredError en vez de suponerlos.
+    """
+    result = await conn.execute(
+        text(
+            "SELECT 1 FROM information_schema.columns WHERE table_schema = 'public' "
+            "AND table_name = 'tipos_movimiento_inventario' AND column_name = 'signo'"
+        )
+    )
+    if result.scalar() is not None:
+        return
+    if tipos_salida is None:
+        result = await conn.execute(
+            text(f"SELECT DISTINCT tipo_movimiento_id FROM {TABLA} ORDER BY 1")
+        )
+        usados = list(result.scalars().all())
+        if usados:
+            raise MovementSignRequiredError(usados)
+    await conn.execute(
+        text(
+            "ALTER TABLE tipos_movimiento_inventario "
+            "ADD COLUMN signo SMALLINT NOT NULL DEFAULT 1"
+        )
+    )
+    await conn.execute(
+        text("UPDATE tipos_movimiento_inventario SET signo = -1 WHERE id = ANY(:ids)"),
+        {"ids": list(tipos_salida or ())},
+    )
+    await conn.execute(
+        text("ALTER TABLE tipos_movimiento_inventario ALTER COLUMN signo DROP DEFAULT")
+    )
+
+
+async def version_1(
+    conn: AsyncConnection, tipos_salida: Sequence[int] | None = None
+) -> None:
+    """
+    Del esquema original a la versión 1.
+
+    Particiona los movimientos y agrega el signo de los tipos de movimiento
+    (ver `asignar_signos`), la cantidad de los elementos por compuesto, la
+    bodega de los movimientos, los índices de las llaves foráneas y las
+    restricciones. Los saldos y resúmenes, tablas nuevas, se reconstruyen con
+    los movimientos existentes.
+    """
+    await particionar_tabla(conn)
+    await asignar_signos(conn, tipos_salida)
+    for sentencia in (
+        "ALTER TABLE elementos_inventario_por_elemento_compuesto "
+        "ADD COLUMN IF NOT EXISTS cantidad INTEGER NOT NULL DEFAULT 1",
+        f"ALTER TABLE {TABLA} ADD COLUMN IF NOT EXISTS "
+        "bodega_inventario_id INTEGER REFERENCES bodegas_inventario (id)",
+        "ALTER TABLE elementos_inventario ALTER COLUMN created_at SET DEFAULT now()",
+        "ALTER TABLE elementos_compuestos_inventario "
+        "ALTER COLUMN created_at SET DEFAULT now()",
+        f"ALTER TABLE {TABLA} ALTER COLUMN created_at SET DEFAULT now()",
+        # Los movimientos sin bodega toman la de su elemento, como hace la API
+        f"UPDATE {TABLA} m SET bodega_inventario_id = e.bodega_inventario_id "
+        "FROM elementos_inventario e "
+        "WHERE m.bodega_inventario_id IS NULL AND m.elemento_inventario_id = e.id",
+        f"UPDATE {TABLA} m SET bodega_inventario_id = e.bodega_inventario_id "
+        "FROM elementos_compuestos_inventario e "
+        "WHERE m.bodega_inventario_id IS NULL "
+        "AND m.elemento_compuesto_inventario_id = e.id",
+    ):
+        await conn.execute(text(sentencia))
+    await crear_restricciones(conn)
+    await crear_indices(conn)
+
+    # Importación diferida: las consultas dependen de los modelos
+    from app.internal.query.inventario import (
+        resumen_movimiento_query,
+        saldo_inventario_query,
+    )
+
+    # La sesión se une a la transacción de `conn`: sus commit no la confirman
+    async with AsyncSession(bind=conn) as session:
+        await saldo_inventario_query.recalcular(session)
+        await resumen_movimiento_query.recalcular(session)
+
+
+# Pasos de migración por versión de destino. Cada paso lleva la base desde la
+# versión anterior, debe ser idempotente y no confirma la transacción; recibe
+# la conexión y las opciones de `migrar` que use. Al subir VERSION_ESQUEMA
+# agregue aquí el paso que la aplica a las bases existentes.
+MIGRACIONES: dict[int, Callable[..., Awaitable[None]]] = {
+    1: version_1,
+}
+
+
+async def verificar_columnas(conn: AsyncConnection) -> None:
+    """
+    Comprueba que la base tenga todas las columnas de los modelos y que los
+    movimientos estén particionados. Lanza SchemaMismatchError si no.
+    """
+    result = await conn.execute(
+        text(
+            "SELECT table_name, column_name FROM information_schema.columns "
+            "WHERE table_schema = 'public'"
+        )
+    )
+    existentes = set(result.tuples().all())
+    faltantes = [
+        f"{tabla.name}.{columna.name}"
+        for tabla in SQLModel.metadata.sorted_tables
+        for columna in tabla.columns
+        if (tabla.name, columna.name) not in existentes
+    ]
+    result = await conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:tabla)"),
+        {"tabla": TABLA},
+    )
+    if result.scalar() != "p":
+        faltantes.append(f"{TABLA} (particionamiento)")
+    if faltantes:
+        raise SchemaMismatchError(faltantes)
+
+
+async def migrar_esquema(
+    conn: AsyncConnection, anterior: int | None, **opciones: Any
+) -> list[int]:
+    """
+    Lleva el esquema desde la versión `anterior` hasta la actual.
+
+    Instala las extensiones requeridas, crea las tablas que falten y, si la
+    base ya tenía esquema, aplica en orden los pasos posteriores a su versión;
+    una base con tablas pero sin versión tiene el esquema original. Los pasos
+    reciben las `opciones` (p. ej. `tipos_salida`). Antes de que se registre la
+    versión comprueba las columnas, de modo que una base a medio migrar no
+    quede como al día. No confirma la transacción. Devuelve las versiones
+    aplicadas.
+    """
+    await requerir_extensiones(conn)
+    nueva = anterior is None and not await hay_esquema(conn)
+    await conn.run_sync(SQLModel.metadata.create_all)
+    aplicadas = []
+    if not nueva:
+        for version in sorted(MIGRACIONES):
+            if anterior is None or version > anterior:
+                await MIGRACIONES[version](conn, **opciones)
+                aplicadas.append(version)
+    await verificar_columnas(conn)
+    return aplicadas
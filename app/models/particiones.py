@@ -0,0 +1,234 @@
+# app/models/particiones.py
+import re
+from datetime import date
+from typing import Iterable
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.models.inventario import CierreInventario, MovimientoInventario
+
+# Tabla particionada por mes de created_at (RANGE). No tiene partición por
+# defecto: así las particiones viejas se pueden desvincular con CONCURRENTLY.
+TABLA = MovimientoInventario.__tablename__
+PREFIJO_ARCHIVO = "archivo_"
+_NOMBRE = re.compile(rf"^{TABLA}_(\d{{4}})_(\d{{2}})$")
+
+# Meses con partición confirmada en este proceso, para no consultar el catálogo
+# en cada inserción. None mientras no se sepa si la tabla está particionada.
+_meses: set[date] = set()
+_particionada: bool | None = None
+
+
+def inicio_mes(fecha: date) -> date:
+    """Primer día del mes de la fecha dada."""
+    return date(fecha.year, fecha.month, 1)
+
+
+def sumar_meses(mes: date, meses: int) -> date:
+    """Primer día del mes que está `meses` meses después de `mes`."""
+    indice = mes.year * 12 + mes.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def nombre_particion(mes: date) -> str:
+    """Nombre de la partición de un mes, p. ej. movimientos_inventario_2025_07."""
+    return f"{TABLA}_{mes:%Y_%m}"
+
+
+async def es_particionada(conn: AsyncConnection) -> bool:
+    """
+    Indica si la tabla de movimientos está particionada.
+
+    Las bases creadas antes del particionamiento conservan la tabla normal; en
+    ese caso la gestión de particiones no hace nada.
+    """
+    global _particionada
+    if _particionada is None:
+        result = await conn.execute(
+            text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:tabla)"),
+            {"tabla": TABLA},
+        )
+        _particionada = result.scalar() == "p"
+    return _particionada
+
+
+async def get_particiones(conn: AsyncConnection) -> dict[date, str]:
+    """Particiones vinculadas a la tabla de movimientos, por mes."""
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:tabla)"
+        ),
+        {"tabla": TABLA},
+    )
+    particiones = {}
+    for (nombre,) in result.all():
+        coincidencia = _NOMBRE.match(nombre)
+        if coincidencia:
+            anio, mes = (int(valor) for valor in coincidencia.groups())
+            particiones[date(anio, mes, 1)] = nombre
+    return particiones
+
+
+async def crear_particiones(conn: AsyncConnection, meses: Iterable[date]) -> list[str]:
+    """
+    Crea las particiones que falten para los meses dados.
+
+    No confirma la transacción. Devuelve los nombres de las particiones creadas.
+    """
+    if not await es_particionada(conn):
+        return []
+    pendientes = {inicio_mes(mes) for mes in meses} - _meses
+    if not pendientes:
+        return []
+    existentes = await get_particiones(conn)
+    _meses.update(existentes)
+    creadas = []
+    for mes in sorted(pendientes - existentes.keys()):
+        nombre = nombre_particion(mes)
+        await conn.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {nombre} PARTITION OF {TABLA} "
+                f"FOR VALUES FROM ('{mes}') TO ('{sumar_meses(mes, 1)}')"
+            )
+        )
+        creadas.append(nombre)
+    return creadas
+
+
+async def crear_particiones_siguientes(
+    conn: AsyncConnection, meses_adelante: int, hoy: date | None = None
+) -> list[str]:
+    """Crea las particiones del mes actual y de los `meses_adelante` siguientes."""
+    actual = inicio_mes(hoy or date.today())
+    return await crear_particiones(
+        conn, (sumar_meses(actual, i) for i in range(meses_adelante + 1))
+    )
+
+
+async def asegurar_particiones(engine: AsyncEngine, fechas: Iterable[date]) -> None:
+    """
+    Garantiza que existan las particiones de las fechas dadas.
+
+    Pensado para inserciones con fechas pasadas o futuras. Las particiones se
+    crean en una transacción propia, confirmada antes de la inserción, para
+    que la caché de meses del proceso nunca registre una partición revertida.
+    """
+    if _particionada is False:
+        return
+    meses = {inicio_mes(fecha) for fecha in fechas}
+    if meses <= _meses:
+        return
+    async with engine.begin() as conn:
+        await crear_particiones(conn, meses)
+    _meses.update(meses)
+
+
+async def desvincular_particiones(engine: AsyncEngine, antes: date) -> list[str]:
+    """
+    Desvincula las particiones de los meses anteriores a `antes`.
+
+    Usa `DETACH PARTITION ... CONCURRENTLY`, que no bloquea las lecturas ni las
+    escrituras sobre el resto de la tabla, y renombra cada partición con el
+    prefijo `archivo_` para que pueda exportarse o eliminarse aparte.
+
+    Solo desvincula meses ya cerrados (ver `CorteSaldoInventarioQuery.cerrar`):
+    sus saldos quedan en el corte de apertura del cierre, del que parten la
+    reconstrucción de saldos y la de resúmenes, y no admiten más movimientos.
+    """
+    # CONCURRENTLY no se puede ejecutar dentro de un bloque de transacción
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        if not await es_particionada(conn):
+            return []
+        result = await conn.execute(select(func.max(CierreInventario.fecha)))
+        cierre = result.scalar()
+        if cierre is None:
+            return []
+        limite = min(inicio_mes(antes), cierre.date())
+        desvinculadas = []
+        for mes, nombre in sorted((await get_particiones(conn)).items()):
+            if mes >= limite:
+                break
+            await conn.execute(
+                text(f"ALTER TABLE {TABLA} DETACH PARTITION {nombre} CONCURRENTLY")
+            )
+            await conn.execute(
+                text(f"ALTER TABLE {nombre} RENAME TO {PREFIJO_ARCHIVO}{nombre}")
+            )
+            _meses.discard(mes)
+            desvinculadas.append(f"{PREFIJO_ARCHIVO}{nombre}")
+    return desvinculadas
+
+
+async def particionar_tabla(conn: AsyncConnection) -> bool:
+    """
+    Convierte en particionada la tabla de movimientos de una base anterior.
+
+    Renombra la tabla con su llave primaria y su secuencia, crea la tabla
+    particionada con las particiones de los meses que tienen movimientos,
+    copia las filas, deja la secuencia después del mayor ID y borra la tabla
+    anterior. No confirma la transacción. Devuelve False si la tabla no existe
+    o ya está particionada.
+    """
+    global _particionada
+    result = await conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:tabla)"),
+        {"tabla": TABLA},
+    )
+    if result.scalar() != "r":
+        return False
+    anterior = f"{TABLA}_anterior"
+    await conn.execute(text(f"ALTER TABLE {TABLA} RENAME TO {anterior}"))
+    # Los nombres de la llave primaria y de la secuencia los necesita la tabla nueva
+    result = await conn.execute(select(func.pg_get_serial_sequence(anterior, "id")))
+    secuencia = result.scalar()
+    if secuencia is not None:
+        await conn.execute(
+            text(f"ALTER SEQUENCE {secuencia} RENAME TO {anterior}_id_seq")
+        )
+    result = await conn.execute(
+        text(
+            "SELECT c.relname FROM pg_index i "
+            "JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE i.indrelid = to_regclass(:tabla)"
+        ),
+        {"tabla": anterior},
+    )
+    for (indice,) in result.all():
+        await conn.execute(text(f"ALTER INDEX {indice} RENAME TO {indice}_anterior"))
+
+    await conn.run_sync(MovimientoInventario.__table__.create)  # type: ignore
+    _particionada = True
+    _meses.clear()
+    result = await conn.execute(
+        text(f"SELECT DISTINCT date_trunc('month', created_at)::date FROM {anterior}")
+    )
+    await crear_particiones(conn, result.scalars().all())
+
+    result = await conn.execute(
+        text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = :tabla"
+        ),
+        {"tabla": anterior},
+    )
+    existentes = set(result.scalars().all())
+    columnas = ", ".join(
+        c.name
+        for c in MovimientoInventario.__table__.columns  # type: ignore
+        if c.name in existentes
+    )
+    await conn.execute(
+        text(f"INSERT INTO {TABLA} ({columnas}) SELECT {columnas} FROM {anterior}")
+    )
+    await conn.execute(
+        text(
+            f"SELECT setval(pg_get_serial_sequence('{TABLA}', 'id'), "
+            f"coalesce(max(id), 0) + 1, false) FROM {TABLA}"
+        )
+    )
+    await conn.execute(text(f"DROP TABLE {anterior}"))
+    return True
@@ -0,0 +1,81 @@
+# app/models/versiones.py
+from sqlalchemy import BIGINT, Table, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import Field, SQLModel
+
+# Clave de Table.info que marca las tablas con contador de versión
+VERSIONADA = "versionada"
+FUNCION = "incrementar_version_tabla"
+
+
+class VersionTabla(SQLModel, table=True):
+    """
+    Contador de cambios por tabla, para ETags y validación de cachés.
+
+    Lo incrementa un trigger por sentencia en la misma transacción del cambio,
+    así que también cuenta los cambios hechos por otros workers, por SQL
+    directo o por cargas con COPY.
+    """
+
+    __tablename__ = "versiones_tabla"  # type: ignore
+
+    tabla: str = Field(primary_key=True, max_length=63)
+    version: int = Field(default=0, sa_type=BIGINT)
+
+
+def versionar(*modelos: type[SQLModel]) -> None:
+    """
+    Marca las tablas de los modelos para llevar su contador de versión.
+
+    Solo para tablas de pocas escrituras: todas las transacciones que escriben
+    en la tabla actualizan la misma fila del contador y se esperan entre sí.
+    """
+    for modelo in modelos:
+        modelo.__table__.info[VERSIONADA] = True  # type: ignore
+
+
+def es_versionada(tabla: Table) -> bool:
+    return bool(tabla.info.get(VERSIONADA))
+
+
+def nombre_trigger(tabla: Table) -> str:
+    return f"trg_version_{tabla.name}"
+
+
+async def instalar_versiones(conn: AsyncConnection) -> list[str]:
+    """
+    Crea la función y los triggers que faltan en las tablas versionadas.
+
+    Es idempotente: solo crea los triggers que no existen, para no bloquear
+    las tablas en cada arranque. Devuelve los nombres de los triggers creados.
+    """
+    contador = VersionTabla.__table__.fullname  # type: ignore
+    await conn.execute(
+        text(
+            f"CREATE OR REPLACE FUNCTION {FUNCION}() RETURNS trigger "
+            "LANGUAGE plpgsql AS $$ BEGIN "
+            f"INSERT INTO {contador} (tabla, version) VALUES (TG_TABLE_NAME, 1) "
+            f"ON CONFLICT (tabla) DO UPDATE SET version = {contador}.version + 1; "
+            "RETURN NULL; END $$"
+        )
+    )
+    tablas = [t for t in SQLModel.metadata.sorted_tables if es_versionada(t)]
+    result = await conn.execute(
+        text("SELECT tgname FROM pg_trigger WHERE tgname = ANY(:nombres)"),
+        {"nombres": [nombre_trigger(t) for t in tablas]},
+    )
+    existentes = set(result.scalars().all())
+    creados = []
+    for tabla in tablas:
+        nombre = nombre_trigger(tabla)
+        if nombre in existentes:
+            continue
+        await conn.execute(
+            text(
+                f"CREATE TRIGGER {nombre} "
+                f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {tabla.fullname} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION {FUNCION}()"
+            )
+        )
+        creados.append(nombre)
+    return creados
@@ -0,0 +1,52 @@
+# app/routers/admin.py
+from fastapi import APIRouter, Depends
+
+from app.internal.gen.cache import caches
+from app.internal.gen.executor import ejecutores
+from app.internal.gen.pool import pool_metrics
+
+# Seguridad
+from .auth import validar_access_token
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    responses={404: {"description": "No encontrado"}},
+    dependencies=[Depends(validar_access_token)],
+)
+
+
+@router.get(
+    "/cache",
+    summary="Métricas de las cachés en memoria",
+    description="Tamaño, aciertos, fallos y expulsiones de cada caché del proceso.",
+)
+async def get_cache_stats():
+    """Obtiene las métricas de las cachés del proceso."""
+    return [cache.stats() for cache in caches.values()]
+
+
+@router.get(
+    "/ejecutores",
+    summary="Métricas de los pools de hilos",
+    description=(
+        "Profundidad de cola, tareas rechazadas y latencias de los pools que "
+        "ejecutan trabajo bloqueante (p. ej. bcrypt)."
+    ),
+)
+async def get_executor_stats():
+    """Obtiene las métricas de los pools de hilos del proceso."""
+    return [ejecutor.stats() for ejecutor in ejecutores.values()]
+
+
+@router.get(
+    "/pool",
+    summary="Métricas del pool de conexiones",
+    description=(
+        "Conexiones en uso y libres, desborde, tiempo de espera por conexión y "
+        "timeouts de checkout del pool de la base de datos."
+    ),
+)
+async def get_pool_stats():
+    """Obtiene las métricas del pool de conexiones."""
+    return pool_metrics.stats()
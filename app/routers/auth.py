@@ -10,6 +10,9 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from passlib.context import CryptContext
 from pydantic import BaseModel
 from app.config import config
+from app.internal.gen.cache import TTLCache
+from app.internal.gen.exceptions import PoolSaturatedError
+from app.internal.gen.executor import BoundedExecutor
 
 # Models
 from app.models.usuario import UsuarioDB
@@ -39,17 +42,42 @@ class TokenData(BaseModel):
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+# bcrypt es costoso a propósito: se ejecuta fuera del event loop con concurrencia acotada
+hash_executor = BoundedExecutor(
+    "bcrypt", config.hash_pool_size, config.hash_queue_limit
+)
+
+# Tokens ya validados (token -> id de usuario), vigentes como máximo hasta su expiración
+tokens_cache = TTLCache("auth_tokens", config.auth_cache_size, config.auth_cache_ttl)
+# Usuarios autenticados (id de usuario -> UsuarioDB)
+principales_cache = TTLCache(
+    "auth_principales", config.auth_cache_size, config.auth_cache_ttl
+)
+
 
+def invalidar_principal(user_id: int):
+    """Descarta el usuario en caché para que se vuelva a leer de la base de datos."""
+    principales_cache.invalidate(user_id)
 
-def verificar_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+
+async def verificar_password(plain_password, hashed_password):
+    return await hash_executor.run(pwd_context.verify, plain_password, hashed_password)
+
+
+def servicio_saturado_exception():
+    """Respuesta cuando el pool de bcrypt no admite más trabajo."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servicio saturado, intente de nuevo",
+        headers={"Retry-After": "1"},
+    )
 
 
 async def autenticar_usuario(
     username: str, password: str, session: AsyncSessionDep
 ) -> UsuarioDB | None:
     usuario = await usuario_query.get_by_username(session, username)
-    if usuario and verificar_password(password, usuario.password):
+    if usuario and await verificar_password(password, usuario.password):
         return usuario
     return None
 
@@ -74,16 +102,26 @@ async def validar_access_token(
         detail="Invalid credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, config.secret_key, algorithms=[config.algorithm])
-        user_id = payload.get("sub")
-        if user_id is None:
+    user_id = tokens_cache.get(token)
+    if user_id is None:
+        try:
+            payload = jwt.decode(
+                token, config.secret_key, algorithms=[config.algorithm]
+            )
+            user_id = int(payload["sub"])
+        except (InvalidTokenError, KeyError, TypeError, ValueError):
             raise credentials_exception
-    except InvalidTokenError:
-        raise credentials_exception
-    user = await usuario_query.get(session, user_id)
+        restante = payload.get("exp", 0) - datetime.now(timezone.utc).timestamp()
+        tokens_cache.set(token, user_id, ttl=restante)
+
+    user = principales_cache.get(user_id)
     if user is None:
-        raise credentials_exception
+        user = await usuario_query.get(session, user_id)
+        if user is None:
+            raise credentials_exception
+        # Copia desligada de la sesión para poder reutilizarla entre peticiones
+        user = UsuarioDB(**user.model_dump())
+        principales_cache.set(user_id, user)
     return user
 
 
@@ -91,13 +129,19 @@ async def validar_access_token(
 async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()], session: AsyncSessionDep
 ) -> Token:
-    usuario = await autenticar_usuario(form_data.username, form_data.password, session)
+    try:
+        usuario = await autenticar_usuario(
+            form_data.username, form_data.password, session
+        )
+    except PoolSaturatedError:
+        raise servicio_saturado_exception()
     if not usuario:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario o contraseña incorrectos",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    data = {"sub": usuario.id, "name": usuario.username}
+    # El estándar JWT exige que "sub" sea una cadena
+    data = {"sub": str(usuario.id), "name": usuario.username}
     token = crear_access_token(data)
     return Token(access_token=token, token_type="bearer")
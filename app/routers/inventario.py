@@ -1,12 +1,33 @@
 # app/routers/inventario.py
-from typing import TypeVar
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+from datetime import date, datetime
+from typing import Any, Literal, TypeVar
+from zoneinfo import ZoneInfo
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, create_model
+from sqlalchemy import inspect
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import SQLModel
 
+from app.config import config
+
 # Modelos
-from app.models.database import AsyncSessionDep
+from app.models.database import AsyncSessionDep, AsyncSessionLocal
 
 
+from app.models.versiones import es_versionada
 from app.models.inventario import (
     BodegaInventario,
     GrupoInventario,
@@ -19,10 +40,23 @@ from app.models.inventario import (
     MovimientoInventario,
     TipoMovimientoInventario,
     EstadoElementoInventario,
+    SaldoInventario,
+    ResumenMovimientoBase,
 )
 
 # Base de datos (Repositorio)
+from app.internal.gen.etag import calcular_etag, coincide_etag
+from app.internal.gen.serializacion import RespuestaJSON, codificar, serializador_de
+from app.internal.gen.exceptions import (
+    ClosedPeriodError,
+    InvalidCursorError,
+    InvalidExpandError,
+    InvalidFilterError,
+    InvalidSortError,
+    SignInUseError,
+)
 from app.internal.query.base import BaseQuery
+from app.internal.query.filtros import OPERADORES
 from app.internal.query.inventario import (
     BodegaInventarioQuery,
     GrupoInventarioQuery,
@@ -35,6 +69,12 @@ from app.internal.query.inventario import (
     MovimientoInventarioQuery,
     TipoMovimientoInventarioQuery,
     EstadoElementoInventarioQuery,
+    elemento_compuesto_inventario_query,
+    movimiento_inventario_query,
+    corte_saldo_inventario_query,
+    precio_elemento_inventario_query,
+    resumen_movimiento_query,
+    saldo_inventario_query,
 )
 from .auth import validar_access_token
 
@@ -50,11 +90,138 @@ ModelType = TypeVar("ModelType", bound=SQLModel)
 QueryType = TypeVar("QueryType", bound=BaseQuery)
 
 
+class DisponibleCompuesto(BaseModel):
+    """Unidades de un elemento compuesto que se pueden armar con el stock actual."""
+
+    elemento_compuesto_inventario_id: int
+    bodega_inventario_id: int | None = None
+    disponible: int
+
+
+class ResultadoLote(BaseModel):
+    """Resultado de una fila dentro de una operación masiva."""
+
+    indice: int
+    id: Any = None
+    status_code: int
+    detail: str | None = None
+
+
+def validar_tamano_lote(items: list):
+    """Rechaza lotes vacíos o que superan el máximo configurado."""
+    if not items:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El lote está vacío",
+        )
+    if len(items) > config.bulk_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"El lote supera el máximo de {config.bulk_max_items} elementos",
+        )
+
+
+# Parámetros propios de las rutas de lista; el resto se interpreta como filtros
+PARAMETROS_LISTA = {"skip", "limit", "after", "expand", "order_by"}
+
+
+def parse_expand(expand: list[str] | None) -> list[str]:
+    """Admite `expand` repetido o separado por comas (expand=a,b)."""
+    nombres = (nombre.strip() for item in expand or [] for nombre in item.split(","))
+    return [nombre for nombre in nombres if nombre]
+
+
+def serializar_expandido(obj: SQLModel, expand: list[str]) -> dict:
+    """Serializa un objeto junto con las relaciones ya cargadas por `expand`."""
+    datos = obj.model_dump(exclude_none=True)
+    for nombre in expand:
+        valor = getattr(obj, nombre)
+        if isinstance(valor, list):
+            datos[nombre] = [item.model_dump(exclude_none=True) for item in valor]
+        else:
+            datos[nombre] = valor.model_dump(exclude_none=True) if valor else None
+    return datos
+
+
+def expand_invalido_exception(query: BaseQuery, error: InvalidExpandError):
+    """Respuesta para relaciones desconocidas en `expand`."""
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=(
+            f"{error}. Relaciones disponibles: "
+            f"{', '.join(query.relaciones_expandibles)}"
+        ),
+    )
+
+
+def periodo_cerrado_exception(error: ClosedPeriodError):
+    """Respuesta para movimientos con fecha en un periodo cerrado."""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=(
+            f"{error}. Registre la corrección como un movimiento con fecha "
+            "posterior al cierre"
+        ),
+    )
+
+
+def signo_en_uso_exception(error: SignInUseError):
+    """Respuesta para cambios de signo de tipos de movimiento ya usados."""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"{error}. Cree un tipo de movimiento nuevo con el signo deseado",
+    )
+
+
+def fecha_local() -> date:
+    """Fecha actual en la zona horaria configurada."""
+    return datetime.now(ZoneInfo(config.local_timezone)).date()
+
+
+async def ejecutar_lote(session: AsyncSessionDep, operacion):
+    """
+    Ejecuta una operación masiva y convierte los conflictos en 409.
+
+    Son conflictos los errores de integridad, los movimientos en periodos
+    cerrados y los cambios de signo de tipos de movimiento ya usados.
+    """
+    try:
+        return await operacion
+    except ClosedPeriodError as e:
+        await session.rollback()
+        raise periodo_cerrado_exception(e)
+    except SignInUseError as e:
+        await session.rollback()
+        raise signo_en_uso_exception(e)
+    except IntegrityError as e:
+        await session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"El lote no se aplicó: {e.orig}",
+        )
+
+
+def etag_de(request: Request, version: str | None) -> str | None:
+    """ETag fuerte de una lectura: la versión de los datos y la URL pedida."""
+    if version is None:
+        return None
+    return calcular_etag(
+        version, request.url.path, sorted(request.query_params.multi_items())
+    )
+
+
+def encabezados_etag(etag: str | None, cache_control: str) -> dict[str, str]:
+    """Encabezados de validación de caché; vacíos si la lectura no tiene ETag."""
+    return {"ETag": etag, "Cache-Control": cache_control} if etag else {}
+
+
 def create_crud_routes(
     model: type[ModelType],
     query_class: type[BaseQuery[ModelType]],
     name: str,
     id_type: type = int,  # Tipo de dato para el ID (int o str)
+    cache: bool = False,
+    fast_json: bool | None = None,
 ):
     """
     Crea rutas CRUD genéricas para un modelo dado.
@@ -64,14 +231,45 @@ def create_crud_routes(
         query_class (type[BaseQuery[ModelType]]): La clase de consulta correspondiente al modelo.
         name (str): El nombre singular del recurso (ej. "bodega_inventario").
         id_type (type): El tipo de dato del ID (int o str), por defecto int.
+        cache (bool): Si es True, las lecturas se sirven desde una caché en memoria
+            que se invalida en cada escritura. Solo para tablas de catálogo.
+        fast_json (bool | None): Si es True, las lecturas se serializan con un
+            serializador precompilado y orjson en lugar de validar cada fila contra
+            el response_model. Por defecto, según `config.fast_json_responses`.
+
+    Si la tabla está versionada (ver `versionar`), las lecturas llevan ETag y
+    responden 304 cuando `If-None-Match` coincide, sin consultar ni serializar
+    los datos.
     """
+    if cache:
+        query_class.habilitar_cache(config.catalog_cache_size, config.catalog_cache_ttl)
+    # Los catálogos se pueden reutilizar un rato; el resto se revalida siempre
+    cache_control = (
+        f"private, max-age={config.catalog_max_age}" if cache else "private, no-cache"
+    )
+    if fast_json is None:
+        fast_json = config.fast_json_responses
+    serializador = serializador_de(model) if fast_json else None
+    # Con llave compuesta, cada ID del borrado en lote es un objeto con las
+    # columnas de la llave, p. ej. {"elemento_compuesto_inventario_id": 1, ...}
+    columnas_llave = [columna.key for columna in inspect(model).primary_key]
+    tipo_llave = id_type
+    if len(columnas_llave) > 1:
+        tipo_llave = create_model(
+            f"Llave{model.__name__}",
+            **{c: (model.model_fields[c].annotation, ...) for c in columnas_llave},
+        )
+    descripcion_etag = (
+        " Responde 304 si `If-None-Match` coincide con el `ETag` de la respuesta."
+        if es_versionada(model.__table__)  # type: ignore
+        else ""
+    )
 
     # POST - Crear un nuevo recurso
     @router.post(
         f"/{name}",
         response_model=model,
         status_code=status.HTTP_201_CREATED,
-        response_model_exclude_unset=True,
         response_model_exclude_none=True,
         summary=f"Crear un nuevo {name.replace('_', ' ')}",
         description=f"Crea un nuevo {name.replace('_', ' ')} con los datos proporcionados.",
@@ -82,8 +280,100 @@ def create_crud_routes(
     ):
         """Crea un nuevo recurso."""
         query = query_class()  # type: ignore
-        await query.create(session, resource)
-        return resource
+        try:
+            return await query.create(session, resource)
+        except ClosedPeriodError as e:
+            raise periodo_cerrado_exception(e)
+
+    # POST - Crear recursos en lote
+    @router.post(
+        f"/{name}s/bulk",
+        response_model=list[ResultadoLote],
+        response_model_exclude_none=True,
+        status_code=status.HTTP_201_CREATED,
+        summary=f"Crear {name.replace('_', ' ')}s en lote",
+        description=(
+            f"Crea varios {name.replace('_', ' ')}s en una sola transacción. "
+            "Si alguna fila falla no se crea ninguna."
+        ),
+    )
+    async def create_resources(
+        resources: list[model],  # type: ignore
+        session: AsyncSessionDep,
+    ):
+        """Crea recursos en lote."""
+        validar_tamano_lote(resources)
+        query = query_class()  # type: ignore
+        creados = await ejecutar_lote(session, query.create_many(session, resources))
+        return [
+            ResultadoLote(
+                indice=i, id=query.id_de(creado), status_code=status.HTTP_201_CREATED
+            )
+            for i, creado in enumerate(creados)
+        ]
+
+    # PUT - Actualizar recursos en lote
+    @router.put(
+        f"/{name}s/bulk",
+        response_model=list[ResultadoLote],
+        response_model_exclude_none=True,
+        summary=f"Actualizar {name.replace('_', ' ')}s en lote",
+        description=(
+            f"Actualiza varios {name.replace('_', ' ')}s identificados por su ID "
+            "en una sola transacción."
+        ),
+    )
+    async def update_resources(
+        resources: list[model],  # type: ignore
+        session: AsyncSessionDep,
+    ):
+        """Actualiza recursos en lote."""
+        validar_tamano_lote(resources)
+        query = query_class()  # type: ignore
+        actualizados = await ejecutar_lote(
+            session, query.update_many(session, resources)
+        )
+        return [
+            ResultadoLote(
+                indice=i,
+                id=query.id_de(resource),
+                status_code=status.HTTP_200_OK
+                if actualizado is not None
+                else status.HTTP_404_NOT_FOUND,
+                detail=None if actualizado is not None else f"{model.__name__} no encontrado",
+            )
+            for i, (resource, actualizado) in enumerate(zip(resources, actualizados))
+        ]
+
+    # DELETE - Eliminar recursos en lote
+    @router.delete(
+        f"/{name}s/bulk",
+        response_model=list[ResultadoLote],
+        response_model_exclude_none=True,
+        summary=f"Eliminar {name.replace('_', ' ')}s en lote",
+        description=f"Elimina varios {name.replace('_', ' ')}s por ID en una sola transacción.",
+    )
+    async def delete_resources(
+        session: AsyncSessionDep,
+        ids: list[tipo_llave] = Body(),  # type: ignore
+    ):
+        """Elimina recursos en lote."""
+        validar_tamano_lote(ids)
+        query = query_class()  # type: ignore
+        if len(columnas_llave) > 1:
+            ids = [[getattr(llave, c) for c in columnas_llave] for llave in ids]
+        eliminados = await ejecutar_lote(session, query.delete_many(session, ids))
+        return [
+            ResultadoLote(
+                indice=i,
+                id=id,
+                status_code=status.HTTP_200_OK
+                if eliminado
+                else status.HTTP_404_NOT_FOUND,
+                detail=None if eliminado else f"{model.__name__} no encontrado",
+            )
+            for i, (id, eliminado) in enumerate(zip(ids, eliminados))
+        ]
 
     # GET - Obtener lista de recursos
     @router.get(
@@ -91,43 +381,170 @@ def create_crud_routes(
         response_model=list[model],
         response_model_exclude_none=True,
         summary=f"Obtener lista de {name.replace('_', ' ')}s",
-        description=f"Obtiene una lista paginada de {name.replace('_', ' ')}s.",
+        description=(
+            f"Obtiene una lista paginada de {name.replace('_', ' ')}s. "
+            "Para paginar por cursor envíe en `after` el valor del encabezado "
+            "`X-Next-Cursor` de la respuesta anterior. Use `expand` para incluir "
+            "relaciones (p. ej. `expand=precios,bodega_inventario`)."
+            + (
+                " Filtros: `campo=valor` o `campo__op=valor` con op en "
+                f"{', '.join(OPERADORES)}, sobre {', '.join(query_class.filter_fields)}."
+                if query_class.filter_fields
+                else ""
+            )
+            + (
+                " Orden: `order_by=campo,-campo` sobre "
+                f"{', '.join(query_class.sort_fields)}."
+                if query_class.sort_fields
+                else ""
+            )
+            + descripcion_etag
+        ),
     )
     async def get_resources(
         session: AsyncSessionDep,
+        request: Request,
+        response: Response,
         skip: int = 0,
         limit: int = 100,
+        after: str | None = None,
+        expand: list[str] | None = Query(None),
+        order_by: str | None = None,
     ):
         """Obtiene una lista de recursos."""
         query = query_class()  # type: ignore
-        resources = await query.get_list(session=session, skip=skip, limit=limit)
+        relaciones = parse_expand(expand)
+        try:
+            filtros = query.parse_filtros(
+                (clave, valor)
+                for clave, valor in request.query_params.multi_items()
+                if clave not in PARAMETROS_LISTA
+            )
+            orden = query.parse_orden(order_by)
+            # La versión se lee antes que los datos (ver BaseQuery.get_version)
+            version = await query.get_version(session, relaciones)
+            etag = etag_de(request, version)
+            if etag and coincide_etag(request.headers.get("if-none-match"), etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers=encabezados_etag(etag, cache_control),
+                )
+            if serializador is not None and not relaciones:
+                # Sin ORM: filas de Core que van directo al serializador
+                resources = await query.get_filas(
+                    session=session,
+                    skip=skip,
+                    limit=limit,
+                    after=after,
+                    filtros=filtros,
+                    orden=orden,
+                    version=version,
+                )
+            else:
+                resources = await query.get_list(
+                    session=session,
+                    skip=skip,
+                    limit=limit,
+                    after=after,
+                    expand=relaciones,
+                    filtros=filtros,
+                    orden=orden,
+                    version=version,
+                )
+        except InvalidCursorError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor inválido",
+            )
+        except InvalidExpandError as e:
+            raise expand_invalido_exception(query, e)
+        except InvalidFilterError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f"{e}. Campos filtrables: "
+                    f"{', '.join(query.filter_fields) or 'ninguno'}"
+                ),
+            )
+        except InvalidSortError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    f"{e}. Campos ordenables: "
+                    f"{', '.join(query.sort_fields) or 'ninguno'}"
+                ),
+            )
+        next_cursor = query.siguiente_cursor(resources, limit, orden)
+        headers = encabezados_etag(etag, cache_control)
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = next_cursor
+        if relaciones:
+            # Las relaciones no forman parte del response_model del recurso
+            return JSONResponse(
+                jsonable_encoder(
+                    [serializar_expandido(r, relaciones) for r in resources]
+                ),
+                headers=headers,
+            )
+        if serializador is not None:
+            return RespuestaJSON(serializador.filas(resources), headers=headers)
+        response.headers.update(headers)
         return resources
 
     # GET - Obtener un recurso por ID
     @router.get(
-        f"/{name}/{{{name}_id}}",
+        f"/{name}/{{resource_id}}",
         response_model=model,
         summary=f"Obtener un {name.replace('_', ' ')} por ID",
-        description=f"Obtiene los detalles de un {name.replace('_', ' ')} específico mediante su ID.",
+        description=(
+            f"Obtiene los detalles de un {name.replace('_', ' ')} específico mediante "
+            "su ID. Use `expand` para incluir relaciones."
+            + descripcion_etag
+        ),
         response_model_exclude_none=True,
     )
     async def get_resource(
         session: AsyncSessionDep,
+        request: Request,
+        response: Response,
         resource_id: id_type,  # Usa el tipo de ID dinámicamente # type: ignore
+        expand: list[str] | None = Query(None),
     ):
         """Obtiene un recurso por ID."""
         query = query_class()  # type: ignore
-        db_resource = await query.get(session, resource_id)
+        relaciones = parse_expand(expand)
+        try:
+            version = await query.get_version(session, relaciones)
+            etag = etag_de(request, version)
+            if etag and coincide_etag(request.headers.get("if-none-match"), etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers=encabezados_etag(etag, cache_control),
+                )
+            db_resource = await query.get(
+                session, resource_id, expand=relaciones, version=version
+            )
+        except InvalidExpandError as e:
+            raise expand_invalido_exception(query, e)
         if db_resource is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"{model.__name__} con ID {resource_id} no encontrado",
             )
+        headers = encabezados_etag(etag, cache_control)
+        if relaciones:
+            return JSONResponse(
+                jsonable_encoder(serializar_expandido(db_resource, relaciones)),
+                headers=headers,
+            )
+        if serializador is not None:
+            return RespuestaJSON(serializador.uno(db_resource), headers=headers)
+        response.headers.update(headers)
         return db_resource
 
     # PUT - Actualizar un recurso
     @router.put(
-        f"/{name}/{{{name}_id}}",
+        f"/{name}/{{resource_id}}",
         response_model=model,
         summary=f"Actualizar un {name.replace('_', ' ')}",
     )
@@ -138,7 +555,13 @@ def create_crud_routes(
     ):
         """Actualiza un recurso."""
         query = query_class()  # type: ignore
-        updated_resource = await query.update(session, resource_id, resource)
+        try:
+            updated_resource = await query.update(session, resource_id, resource)
+        except ClosedPeriodError as e:
+            raise periodo_cerrado_exception(e)
+        except SignInUseError as e:
+            await session.rollback()
+            raise signo_en_uso_exception(e)
         if updated_resource is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -148,7 +571,7 @@ def create_crud_routes(
 
     # DELETE - Eliminar un recurso
     @router.delete(
-        f"/{name}/{{{name}_id}}",
+        f"/{name}/{{resource_id}}",
         response_model=model,
         summary=f"Eliminar un {name.replace('_', ' ')}",
     )
@@ -158,7 +581,10 @@ def create_crud_routes(
     ):
         """Elimina un recurso."""
         query = query_class()  # type: ignore
-        deleted_resource = await query.delete(session, resource_id)
+        try:
+            deleted_resource = await query.delete(session, resource_id)
+        except ClosedPeriodError as e:
+            raise periodo_cerrado_exception(e)
         if deleted_resource is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -167,9 +593,78 @@ def create_crud_routes(
         return deleted_resource
 
 
+# GET - Exportar el libro de movimientos
+# Se declara antes de las rutas genéricas para que tenga prioridad sobre ellas
+@router.get(
+    "/movimiento_inventarios/export",
+    summary="Exportar movimientos de inventario",
+    description=(
+        "Exporta los movimientos en orden cronológico como NDJSON o CSV. Las filas "
+        "se leen con un cursor del servidor y se envían a medida que llegan, de modo "
+        "que el consumo de memoria no depende del tamaño del rango exportado. "
+        "`desde` es inclusivo y `hasta` exclusivo."
+    ),
+)
+async def exportar_movimientos(
+    formato: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    desde: datetime | None = None,
+    hasta: datetime | None = None,
+    elemento_inventario_id: int | None = None,
+    elemento_compuesto_inventario_id: int | None = None,
+    bodega_inventario_id: int | None = None,
+):
+    """Exporta los movimientos de inventario."""
+    columnas = [c.key for c in movimiento_inventario_query.columnas_lectura(None)]
+
+    async def contenido():
+        # La sesión se abre aquí y no con la dependencia, porque debe seguir
+        # abierta mientras se envía la respuesta
+        async with AsyncSessionLocal() as session:
+            if formato == "csv":
+                yield ",".join(columnas) + "\n"
+            async for lote in movimiento_inventario_query.stream(
+                session,
+                desde=desde,
+                hasta=hasta,
+                elemento_inventario_id=elemento_inventario_id,
+                elemento_compuesto_inventario_id=elemento_compuesto_inventario_id,
+                bodega_inventario_id=bodega_inventario_id,
+            ):
+                if formato == "csv":
+                    buffer = io.StringIO()
+                    writer = csv.writer(buffer, lineterminator="\n")
+                    for fila in lote:
+                        writer.writerow(
+                            [
+                                valor.isoformat()
+                                if isinstance(valor, datetime)
+                                else valor
+                                for valor in fila
+                            ]
+                        )
+                    yield buffer.getvalue()
+                else:
+                    yield b"".join(codificar(fila._asdict()) + b"\n" for fila in lote)
+
+    media_type = "text/csv" if formato == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        contenido(),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="movimientos_inventario.{formato}"'
+            )
+        },
+    )
+
+
 # Llamadas a la función genérica para cada modelo de inventario
-create_crud_routes(BodegaInventario, BodegaInventarioQuery, "bodega_inventario")
-create_crud_routes(GrupoInventario, GrupoInventarioQuery, "grupo_inventario")
+create_crud_routes(
+    BodegaInventario, BodegaInventarioQuery, "bodega_inventario", cache=True
+)
+create_crud_routes(
+    GrupoInventario, GrupoInventarioQuery, "grupo_inventario", cache=True
+)
 create_crud_routes(ElementoInventario, ElementoInventarioQuery, "elemento_inventario")
 create_crud_routes(
     ElementoCompuestoInventario,
@@ -190,6 +685,7 @@ create_crud_routes(
     TipoPrecioElementoInventario,
     TipoPrecioElementoInventarioQuery,
     "tipo_precio_elemento_inventario",
+    cache=True,
 )
 create_crud_routes(
     MovimientoInventario, MovimientoInventarioQuery, "movimiento_inventario"
@@ -199,10 +695,227 @@ create_crud_routes(
     TipoMovimientoInventarioQuery,
     "tipo_movimiento_inventario",
     id_type=int,
+    cache=True,
 )  # Asegúrate de que el tipo de ID sea correcto
 create_crud_routes(
     EstadoElementoInventario,
     EstadoElementoInventarioQuery,
     "estado_elemento_inventario",
+    cache=True,
+)
+create_crud_routes(UnidadMedida, UnidadMedidaQuery, "unidad_medida", cache=True)
+
+
+# GET - Saldos de inventario
+@router.get(
+    "/stock",
+    response_model=list[SaldoInventario],
+    summary="Obtener saldos de inventario",
+    description=(
+        "Obtiene el saldo actual por elemento (o elemento compuesto) y bodega "
+        "desde la tabla de saldos materializada. Con `fecha` obtiene el saldo con "
+        "los movimientos anteriores a ese instante (para el cierre del 31 de marzo "
+        "use `fecha=AAAA-04-01`), partiendo del corte de saldos más cercano y "
+        "sumando solo los movimientos posteriores a él."
+    ),
+)
+async def get_stock(
+    session: AsyncSessionDep,
+    elemento_inventario_id: int | None = None,
+    elemento_compuesto_inventario_id: int | None = None,
+    bodega_inventario_id: int | None = None,
+    fecha: datetime | None = None,
+):
+    """Obtiene los saldos de inventario."""
+    if fecha is not None:
+        return await corte_saldo_inventario_query.get_saldos_a(
+            session,
+            fecha,
+            elemento_inventario_id=elemento_inventario_id,
+            elemento_compuesto_inventario_id=elemento_compuesto_inventario_id,
+            bodega_inventario_id=bodega_inventario_id,
+        )
+    return await saldo_inventario_query.get_saldos(
+        session,
+        elemento_inventario_id=elemento_inventario_id,
+        elemento_compuesto_inventario_id=elemento_compuesto_inventario_id,
+        bodega_inventario_id=bodega_inventario_id,
+    )
+
+
+# POST - Reconstruir saldos
+@router.post(
+    "/stock/recalcular",
+    summary="Recalcular saldos de inventario",
+    description=(
+        "Reconstruye la tabla de saldos a partir del libro de movimientos y, si hay "
+        "un cierre de periodo, de su saldo de apertura."
+    ),
+)
+async def recalcular_stock(session: AsyncSessionDep):
+    """Reconstruye los saldos de inventario."""
+    saldos = await saldo_inventario_query.recalcular(session)
+    return {"saldos": saldos}
+
+
+# GET - Unidades armables de todos los elementos compuestos
+@router.get(
+    "/elemento_compuesto_inventarios/disponible",
+    response_model=list[DisponibleCompuesto],
+    summary="Obtener unidades disponibles de los elementos compuestos",
+    description=(
+        "Calcula, con una sola consulta sobre los saldos, cuántas unidades de cada "
+        "elemento compuesto se pueden armar con el stock de sus componentes. Si se "
+        "indica `bodega_inventario_id` solo cuenta el stock de esa bodega."
+    ),
+)
+async def get_disponibles_compuestos(
+    session: AsyncSessionDep, bodega_inventario_id: int | None = None
+):
+    """Obtiene las unidades armables de todos los elementos compuestos."""
+    disponibles = await elemento_compuesto_inventario_query.get_disponibles_todos(
+        session, bodega_inventario_id=bodega_inventario_id
+    )
+    return [
+        DisponibleCompuesto(
+            elemento_compuesto_inventario_id=id,
+            bodega_inventario_id=bodega_inventario_id,
+            disponible=disponible,
+        )
+        for id, disponible in sorted(disponibles.items())
+    ]
+
+
+# GET - Unidades armables de un elemento compuesto
+@router.get(
+    "/elemento_compuesto_inventario/{resource_id}/disponible",
+    response_model=DisponibleCompuesto,
+    summary="Obtener unidades disponibles de un elemento compuesto",
+    description=(
+        "Calcula cuántas unidades del elemento compuesto se pueden armar: el mínimo, "
+        "entre sus componentes, del stock dividido por la cantidad requerida."
+    ),
+)
+async def get_disponible_compuesto(
+    resource_id: int, session: AsyncSessionDep, bodega_inventario_id: int | None = None
+):
+    """Obtiene las unidades armables de un elemento compuesto."""
+    disponible = await elemento_compuesto_inventario_query.get_disponible(
+        session, resource_id, bodega_inventario_id=bodega_inventario_id
+    )
+    if disponible is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="ElementoCompuestoInventario no encontrado",
+        )
+    return DisponibleCompuesto(
+        elemento_compuesto_inventario_id=resource_id,
+        bodega_inventario_id=bodega_inventario_id,
+        disponible=disponible,
+    )
+
+
+# GET - Precio vigente de un elemento
+@router.get(
+    "/precio_vigente",
+    response_model=PrecioElementoInventario,
+    summary="Obtener el precio vigente de un elemento",
+    description=(
+        "Devuelve el precio del tipo indicado vigente en `fecha` (por defecto hoy) "
+        "para un elemento. Se resuelve desde la lista de precios en caché."
+    ),
+)
+async def get_precio_vigente(
+    session: AsyncSessionDep,
+    elemento_inventario_id: int,
+    tipo_precio_id: int,
+    fecha: date | None = None,
+):
+    """Obtiene el precio vigente de un elemento."""
+    lista = await precio_elemento_inventario_query.get_lista_vigente(
+        session, tipo_precio_id, fecha or fecha_local()
+    )
+    precio = lista.get(elemento_inventario_id)
+    if precio is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No hay un precio vigente para el elemento en la fecha indicada",
+        )
+    return precio
+
+
+# GET - Precios vigentes de varios elementos
+@router.get(
+    "/precios_vigentes",
+    response_model=list[PrecioElementoInventario],
+    summary="Obtener los precios vigentes de varios elementos",
+    description=(
+        "Devuelve los precios del tipo indicado vigentes en `fecha` (por defecto hoy) "
+        "para los elementos dados en `elemento_inventario_id` (repetible), o la "
+        "lista completa si no se indica ninguno. Los elementos sin precio vigente "
+        "se omiten."
+    ),
+)
+async def get_precios_vigentes(
+    session: AsyncSessionDep,
+    tipo_precio_id: int,
+    elemento_inventario_id: list[int] | None = Query(None),
+    fecha: date | None = None,
+):
+    """Obtiene los precios vigentes de varios elementos."""
+    lista = await precio_elemento_inventario_query.get_lista_vigente(
+        session, tipo_precio_id, fecha or fecha_local()
+    )
+    if elemento_inventario_id is None:
+        return [lista[id] for id in sorted(lista)]
+    return [lista[id] for id in elemento_inventario_id if id in lista]
+
+
+# GET - Reporte de movimientos por periodo
+@router.get(
+    "/reportes/movimientos",
+    response_model=list[ResumenMovimientoBase],
+    summary="Obtener movimientos acumulados por periodo",
+    description=(
+        "Suma las cantidades y cuenta los movimientos por periodo, elemento, bodega "
+        "y tipo de movimiento. Se responde desde los resúmenes diario y mensual, "
+        "que se actualizan con cada movimiento, por lo que el costo no depende del "
+        "tamaño del libro. `desde` es inclusivo y `hasta` exclusivo; ambos se "
+        "comparan con el día (o el inicio del mes) de cada resumen."
+    ),
+)
+async def get_reporte_movimientos(
+    session: AsyncSessionDep,
+    granularidad: Literal["dia", "semana", "mes"] = "dia",
+    desde: date | None = None,
+    hasta: date | None = None,
+    elemento_inventario_id: int | None = None,
+    elemento_compuesto_inventario_id: int | None = None,
+    bodega_inventario_id: int | None = None,
+    tipo_movimiento_id: int | None = None,
+):
+    """Obtiene el reporte de movimientos por periodo."""
+    return await resumen_movimiento_query.get_resumen(
+        session,
+        granularidad=granularidad,
+        desde=desde,
+        hasta=hasta,
+        elemento_inventario_id=elemento_inventario_id,
+        elemento_compuesto_inventario_id=elemento_compuesto_inventario_id,
+        bodega_inventario_id=bodega_inventario_id,
+        tipo_movimiento_id=tipo_movimiento_id,
+    )
+
+
+# POST - Reconstruir resúmenes de movimientos
+@router.post(
+    "/reportes/movimientos/recalcular",
+    summary="Recalcular resúmenes de movimientos",
+    description=(
+        "Reconstruye los resúmenes diario y mensual a partir del libro de "
+        "movimientos, p. ej. tras cargas hechas directamente en la base de datos."
+    ),
 )
-create_crud_routes(UnidadMedida, UnidadMedidaQuery, "unidad_medida")
+async def recalcular_reporte_movimientos(session: AsyncSessionDep):
+    """Reconstruye los resúmenes de movimientos."""
+    return await resumen_movimiento_query.recalcular(session)
@@ -11,7 +11,14 @@ from app.models.usuario import UsuarioBase, UsuarioCreate
 from app.internal.query.usuario import usuario_query
 
 # Seguridad
-from app.routers.auth import pwd_context, validar_access_token
+from app.internal.gen.exceptions import PoolSaturatedError
+from app.routers.auth import (
+    hash_executor,
+    invalidar_principal,
+    pwd_context,
+    servicio_saturado_exception,
+    validar_access_token,
+)
 
 router = APIRouter(
     prefix="/usuarios",
@@ -20,8 +27,8 @@ router = APIRouter(
 )
 
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+async def get_password_hash(password):
+    return await hash_executor.run(pwd_context.hash, password)
 
 
 def verificar_complejidad_password(usuario: UsuarioCreate):
@@ -62,7 +69,6 @@ def verificar_complejidad_password(usuario: UsuarioCreate):
     "/",
     response_model=UsuarioBase,
     response_model_exclude_none=True,
-    response_model_exclude_unset=True,
     status_code=status.HTTP_201_CREATED,
     summary="Crear un nuevo usuario",
     description="Crea un nuevo usuario en la base de datos.",
@@ -72,7 +78,10 @@ async def crear_usuario(
     session: AsyncSessionDep,
 ):
     # hash password
-    usuario.password = get_password_hash(usuario.password)
+    try:
+        usuario.password = await get_password_hash(usuario.password)
+    except PoolSaturatedError:
+        raise servicio_saturado_exception()
 
     usuario_creado = await usuario_query.create(session, usuario)
     return usuario_creado
@@ -116,13 +125,15 @@ async def get(
     "/{usuario_id}",
     response_model=UsuarioBase,
     summary="Actualizar un usuario",
+    dependencies=[Depends(validar_access_token)],
 )
 async def actualizar(
     session: AsyncSessionDep,
-    usuario_id: Annotated[int, Depends(validar_access_token)],
+    usuario_id: int,
     usuario: UsuarioBase,
 ):
     usuario_actualizado = await usuario_query.update(session, usuario_id, usuario)
+    invalidar_principal(usuario_id)
     if usuario_actualizado is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -135,12 +146,14 @@ async def actualizar(
     "/{usuario_id}",
     response_model=UsuarioBase,
     summary="Eliminar un usuario",
+    dependencies=[Depends(validar_access_token)],
 )
 async def eliminar(
     session: AsyncSessionDep,
-    usuario_id: Annotated[int, Depends(validar_access_token)],
+    usuario_id: int,
 ):
     usuario_eliminado = await usuario_query.delete(session, usuario_id)
+    invalidar_principal(usuario_id)
     if usuario_eliminado is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
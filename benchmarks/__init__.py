@@ -0,0 +1,11 @@
+# benchmarks/__init__.py
+"""
+Pruebas de rendimiento reproducibles.
+
+- `python -m benchmarks.carga`: prueba de carga de la API en el mismo proceso.
+- `python -m benchmarks.micro`: micro-benchmarks de `BaseQuery` y de la serialización.
+- `python -m benchmarks.comparar`: compara dos resultados guardados.
+
+Usan la base de datos configurada (DB_HOST, DB_NAME, ...) y crean registros en
+ella, por lo que deben ejecutarse contra una base dedicada.
+"""
@@ -0,0 +1,131 @@
+# benchmarks/carga.py
+"""
+Prueba de carga de la API en el mismo proceso.
+
+Varios clientes concurrentes llaman a la aplicación ASGI (sin servidor HTTP ni
+red de por medio) y se mide el rendimiento y la latencia p50/p95/p99 de cada
+operación. La base de datos es la configurada por las variables de entorno.
+
+Uso:
+    python -m benchmarks.carga [--concurrencia 10] [--peticiones 500] [--reiniciar]
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+from benchmarks.comun import (
+    USUARIO,
+    cliente_api,
+    crear_elementos,
+    elemento,
+    guardar,
+    imprimir,
+    resumir,
+)
+
+OPERACIONES = ("login", "obtener", "listar", "crear", "actualizar")
+
+Peticion = Callable[[int], Awaitable[httpx.Response]]
+
+
+async def ejecutar(peticion: Peticion, total: int, concurrencia: int) -> dict:
+    """Ejecuta `total` peticiones repartidas entre `concurrencia` clientes."""
+    latencias: list[float] = []
+    errores = 0
+    # Iterador compartido: cada cliente toma el siguiente índice libre
+    indices = iter(range(total))
+
+    async def cliente():
+        nonlocal errores
+        for i in indices:
+            inicio = time.perf_counter()
+            try:
+                response = await peticion(i)
+                fallo = response.status_code >= 400
+            except httpx.HTTPError:
+                fallo = True
+            latencias.append(time.perf_counter() - inicio)
+            errores += fallo
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concurrencia)))
+    return resumir(latencias, time.perf_counter() - inicio, errores)
+
+
+def peticiones(client: httpx.AsyncClient, ids: list[int], filas: int) -> dict:
+    """Función que emite la petición número `i` de cada operación."""
+    return {
+        "login": lambda i: client.post("/auth/login", data=USUARIO),
+        "obtener": lambda i: client.get(
+            f"/inventario/elemento_inventario/{ids[i % len(ids)]}"
+        ),
+        "listar": lambda i: client.get(
+            "/inventario/elemento_inventarios",
+            params={"limit": 50, "bodega_inventario_id": i % 2 + 1},
+        ),
+        "crear": lambda i: client.post(
+            "/inventario/elemento_inventario", json=elemento(filas + i)
+        ),
+        "actualizar": lambda i: client.put(
+            f"/inventario/elemento_inventario/{ids[i % len(ids)]}",
+            json=elemento(i),
+        ),
+    }
+
+
+async def medir(args: argparse.Namespace) -> dict[str, dict]:
+    """Prepara los datos y mide cada operación por separado."""
+    async with cliente_api(args.reiniciar) as client:
+        ids = await crear_elementos(client, args.filas)
+        funciones = peticiones(client, ids, args.filas)
+        resultados = {}
+        for operacion in args.operaciones:
+            total = args.peticiones_login if operacion == "login" else args.peticiones
+            if args.calentamiento:
+                await ejecutar(
+                    funciones[operacion], args.calentamiento, args.concurrencia
+                )
+            resultados[operacion] = await ejecutar(
+                funciones[operacion], total, args.concurrencia
+            )
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.carga", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument("--concurrencia", type=int, default=10)
+    parser.add_argument("--peticiones", type=int, default=500)
+    parser.add_argument(
+        "--peticiones-login",
+        type=int,
+        default=50,
+        help="El login calcula un hash bcrypt, por eso se mide con menos peticiones.",
+    )
+    parser.add_argument("--filas", type=int, default=1000, help="Elementos a crear.")
+    parser.add_argument("--calentamiento", type=int, default=20)
+    parser.add_argument(
+        "--operaciones", nargs="+", choices=OPERACIONES, default=list(OPERACIONES)
+    )
+    parser.add_argument(
+        "--reiniciar",
+        action="store_true",
+        help="Borra y recrea todas las tablas antes de empezar (¡elimina los datos!).",
+    )
+    parser.add_argument("--salida", type=Path, help="Archivo JSON de resultados.")
+    args = parser.parse_args()
+
+    resultados = asyncio.run(medir(args))
+    imprimir(resultados)
+    parametros = {k: v for k, v in vars(args).items() if k != "salida"}
+    salida = guardar("carga", resultados, parametros, args.salida)
+    print(f"Resultados guardados en {salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/comparar.py
+"""
+Compara dos archivos de resultados (p. ej. de dos commits).
+
+Termina con código 1 si alguna operación empeora más que el umbral, para poder
+usarlo como control en integración continua.
+
+Uso:
+    python -m benchmarks.comparar base.json nuevo.json [--metrica p95_ms] [--umbral 0.1]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Métricas en las que un valor mayor es mejor; en el resto (latencias) es peor
+MAYOR_ES_MEJOR = {"por_segundo"}
+
+
+def comparar(base: dict, nuevo: dict, metrica: str, umbral: float) -> list[str]:
+    """Imprime la variación de la métrica y devuelve las operaciones que empeoran."""
+    regresiones = []
+    print(f"base:  {base['commit']} ({base['fecha']})")
+    print(f"nuevo: {nuevo['commit']} ({nuevo['fecha']})")
+    print(f"{'operación':32}{'base':>12}{'nuevo':>12}{'cambio':>10}")
+    for operacion, resumen in nuevo["resultados"].items():
+        anterior = base["resultados"].get(operacion)
+        if anterior is None or not anterior[metrica]:
+            print(f"{operacion:32}{'-':>12}{resumen[metrica]:>12}{'nueva':>10}")
+            continue
+        cambio = resumen[metrica] / anterior[metrica] - 1
+        empeora = -cambio if metrica in MAYOR_ES_MEJOR else cambio
+        marca = "  REGRESIÓN" if empeora > umbral else ""
+        print(
+            f"{operacion:32}{anterior[metrica]:>12}{resumen[metrica]:>12}"
+            f"{cambio:>+10.1%}{marca}"
+        )
+        if marca:
+            regresiones.append(operacion)
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.comparar", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument("base", type=Path)
+    parser.add_argument("nuevo", type=Path)
+    parser.add_argument("--metrica", default="p95_ms")
+    parser.add_argument(
+        "--umbral", type=float, default=0.1, help="Empeoramiento tolerado (0.1 = 10%%)."
+    )
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text())
+    nuevo = json.loads(args.nuevo.read_text())
+    regresiones = comparar(base, nuevo, args.metrica, args.umbral)
+    if regresiones:
+        print(f"Regresiones: {', '.join(regresiones)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# benchmarks/comun.py
+import json
+import platform
+import subprocess
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Sequence
+
+import httpx
+from sqlmodel import SQLModel
+
+from app.main import app
+from app.models.database import async_engine, create_db_and_tables
+
+DIRECTORIO_RESULTADOS = Path(__file__).parent / "resultados"
+
+# Usuario con el que se autentican las pruebas; se crea si no existe
+USUARIO = {"username": "benchmark", "password": "Benchm@rk123"}
+
+# Catálogos mínimos para crear elementos y movimientos
+CATALOGOS = (
+    ("estado_elemento_inventario", {"id": 1, "nombre": "Activo"}),
+    ("tipo_movimiento_inventario", {"id": 1, "nombre": "Entrada", "signo": 1}),
+    ("grupo_inventario", {"id": 1, "nombre": "General"}),
+    ("unidad_medida", {"id": 1, "nombre": "UND", "tipo_unidad_medida": "cantidad"}),
+    ("bodega_inventario", {"id": 1, "nombre": "Principal", "ubicacion": "Local"}),
+    ("bodega_inventario", {"id": 2, "nombre": "Secundaria", "ubicacion": "Local"}),
+    ("tipo_precio_elemento_inventario", {"id": 1, "nombre": "Retail"}),
+)
+
+
+def elemento(i: int) -> dict[str, Any]:
+    """Datos deterministas del elemento de inventario número `i`."""
+    return {
+        "nombre": f"Elemento de prueba {i}",
+        "bodega_inventario_id": i % 2 + 1,
+        "grupo_inventario_id": 1,
+        "unidad_medida_cantidad_id": 1,
+        "cantidad": i % 500,
+        "estado_elemento_id": 1,
+    }
+
+
+def percentil(ordenados: Sequence[float], p: float) -> float:
+    """Percentil `p` (0-100) de valores ordenados, con interpolación lineal."""
+    if not ordenados:
+        return 0.0
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    fraccion = posicion - inferior
+    return ordenados[inferior] * (1 - fraccion) + ordenados[superior] * fraccion
+
+
+def resumir(latencias: Sequence[float], segundos: float, errores: int = 0) -> dict:
+    """Rendimiento y percentiles (en milisegundos) de una serie de mediciones."""
+    ordenadas = sorted(latencias)
+    ms = [1000 * valor for valor in ordenadas]
+    return {
+        "muestras": len(ordenadas),
+        "errores": errores,
+        "segundos": round(segundos, 4),
+        "por_segundo": round(len(ordenadas) / segundos, 2) if segundos else 0.0,
+        "media_ms": round(sum(ms) / len(ms), 4) if ms else 0.0,
+        "p50_ms": round(percentil(ms, 50), 4),
+        "p95_ms": round(percentil(ms, 95), 4),
+        "p99_ms": round(percentil(ms, 99), 4),
+        "max_ms": round(ms[-1], 4) if ms else 0.0,
+    }
+
+
+def _git(*argumentos: str) -> str | None:
+    try:
+        return subprocess.run(
+            ["git", *argumentos],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def metadatos(parametros: dict[str, Any]) -> dict[str, Any]:
+    """Datos del entorno necesarios para comparar resultados entre commits."""
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "cambios_locales": bool(_git("status", "--porcelain")),
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": parametros,
+    }
+
+
+def guardar(
+    nombre: str,
+    resultados: dict[str, dict],
+    parametros: dict[str, Any],
+    salida: Path | None = None,
+) -> Path:
+    """Guarda los resultados en JSON; por defecto en benchmarks/resultados/."""
+    datos = {**metadatos(parametros), "resultados": resultados}
+    if salida is None:
+        commit = (datos["commit"] or "sin_commit")[:8]
+        fecha = datetime.now().strftime("%Y%m%d_%H%M%S")
+        salida = DIRECTORIO_RESULTADOS / f"{nombre}_{fecha}_{commit}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(datos, indent=2, ensure_ascii=False) + "\n")
+    return salida
+
+
+def imprimir(resultados: dict[str, dict]) -> None:
+    """Imprime los resultados como tabla."""
+    columnas = ("muestras", "errores", "por_segundo", "p50_ms", "p95_ms", "p99_ms")
+    ancho = max((len(nombre) for nombre in resultados), default=10) + 2
+    print("operación".ljust(ancho) + "".join(c.rjust(13) for c in columnas))
+    for nombre, resumen in resultados.items():
+        print(
+            nombre.ljust(ancho) + "".join(str(resumen[c]).rjust(13) for c in columnas)
+        )
+
+
+async def reiniciar_base() -> None:
+    """Elimina y vuelve a crear todas las tablas. Borra todos los datos."""
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+    await create_db_and_tables()
+
+
+async def autenticar(client: httpx.AsyncClient) -> None:
+    """Inicia sesión con el usuario de pruebas y guarda el token en el cliente."""
+    response = await client.post("/auth/login", data=USUARIO)
+    if response.status_code == 401:
+        # Primera ejecución contra esta base: el usuario aún no existe
+        (await client.post("/usuarios/", json=USUARIO)).raise_for_status()
+        response = await client.post("/auth/login", data=USUARIO)
+    response.raise_for_status()
+    client.headers["Authorization"] = f"Bearer {response.json()['access_token']}"
+
+
+async def preparar_catalogos(client: httpx.AsyncClient) -> None:
+    """Crea los registros de catálogo que falten."""
+    for nombre, datos in CATALOGOS:
+        response = await client.get(f"/inventario/{nombre}/{datos['id']}")
+        if response.status_code == 404:
+            response = await client.post(f"/inventario/{nombre}", json=datos)
+        response.raise_for_status()
+
+
+async def crear_elementos(
+    client: httpx.AsyncClient, cantidad: int, lote: int = 1000
+) -> list[int]:
+    """Crea `cantidad` elementos por el endpoint de lote y devuelve sus IDs."""
+    ids: list[int] = []
+    for inicio in range(0, cantidad, lote):
+        response = await client.post(
+            "/inventario/elemento_inventarios/bulk",
+            json=[elemento(i) for i in range(inicio, min(inicio + lote, cantidad))],
+        )
+        response.raise_for_status()
+        ids += [resultado["id"] for resultado in response.json()]
+    return ids
+
+
+@asynccontextmanager
+async def cliente_api(reiniciar: bool = False):
+    """
+    Cliente HTTP autenticado que llama a la aplicación ASGI en el mismo proceso.
+
+    Con `reiniciar` se borran todos los datos de la base antes de empezar.
+    """
+    try:
+        if reiniciar:
+            await reiniciar_base()
+        else:
+            await create_db_and_tables()
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transporte, base_url="http://benchmark", timeout=None
+        ) as client:
+            await autenticar(client)
+            await preparar_catalogos(client)
+            yield client
+    finally:
+        await async_engine.dispose()
@@ -0,0 +1,218 @@
+# benchmarks/micro.py
+"""
+Micro-benchmarks de las operaciones de `BaseQuery` y de la serialización.
+
+Cada operación se repite en serie, con una sesión nueva por repetición (como
+en una petición), sin pasar por el enrutamiento ni la validación de FastAPI.
+
+Uso:
+    python -m benchmarks.micro [--repeticiones 200] [--reiniciar]
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import TypeAdapter
+
+from app.internal.gen.serializacion import serializador_de
+from app.internal.query.inventario import (
+    bodega_inventario_query,
+    elemento_inventario_query,
+    movimiento_inventario_query,
+)
+from app.models.database import AsyncSessionLocal
+from app.models.inventario import ElementoInventario, MovimientoInventario
+from benchmarks.comun import (
+    cliente_api,
+    crear_elementos,
+    elemento,
+    guardar,
+    imprimir,
+    resumir,
+)
+
+# Tamaños de las listas serializadas
+TAMANOS_LISTA = (100, 1000, 10000)
+
+
+async def repetir(operacion: Callable[[int], Awaitable], repeticiones: int) -> dict:
+    """Ejecuta `operacion(i)` `repeticiones` veces en serie y mide cada una."""
+    latencias: list[float] = []
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        antes = time.perf_counter()
+        await operacion(i)
+        latencias.append(time.perf_counter() - antes)
+    return resumir(latencias, time.perf_counter() - inicio)
+
+
+def movimiento(i: int, ids: list[int]) -> MovimientoInventario:
+    return MovimientoInventario(
+        nombre=f"Movimiento de prueba {i}",
+        cantidad=1,
+        elemento_inventario_id=ids[i % len(ids)],
+        bodega_inventario_id=1,
+        tipo_movimiento_id=1,
+    )
+
+
+def operaciones_consulta(ids: list[int], filas: int) -> dict:
+    """Operaciones de `BaseQuery`, cada una en su propia sesión."""
+
+    async def get(i):
+        async with AsyncSessionLocal() as session:
+            await elemento_inventario_query.get(session, ids[i % len(ids)])
+
+    async def get_catalogo(i):
+        # Catálogo con caché de lectura
+        async with AsyncSessionLocal() as session:
+            await bodega_inventario_query.get(session, 1)
+
+    async def get_list(i):
+        async with AsyncSessionLocal() as session:
+            await elemento_inventario_query.get_list(session, limit=100)
+
+    async def get_filas(i):
+        # Lectura sin ORM: filas de Core
+        async with AsyncSessionLocal() as session:
+            await elemento_inventario_query.get_filas(session, limit=100)
+
+    async def get_list_filtrada(i):
+        async with AsyncSessionLocal() as session:
+            filtros = elemento_inventario_query.parse_filtros(
+                [("bodega_inventario_id", "1")]
+            )
+            await elemento_inventario_query.get_list(
+                session, limit=100, filtros=filtros
+            )
+
+    async def create(i):
+        async with AsyncSessionLocal() as session:
+            await elemento_inventario_query.create(
+                session, ElementoInventario(**elemento(filas + i))
+            )
+
+    async def update(i):
+        async with AsyncSessionLocal() as session:
+            await elemento_inventario_query.update(
+                session, ids[i % len(ids)], ElementoInventario(**elemento(i))
+            )
+
+    async def movimiento_create(i):
+        # Ida y vuelta completa: partición, saldo, resúmenes y commit
+        async with AsyncSessionLocal() as session:
+            await movimiento_inventario_query.create(session, movimiento(i, ids))
+
+    async def movimiento_create_many_100(i):
+        async with AsyncSessionLocal() as session:
+            await movimiento_inventario_query.create_many(
+                session, [movimiento(100 * i + j, ids) for j in range(100)]
+            )
+
+    return {
+        "get": get,
+        "get_catalogo": get_catalogo,
+        "get_list_100": get_list,
+        "get_filas_100": get_filas,
+        "get_list_100_filtrada": get_list_filtrada,
+        "create": create,
+        "update": update,
+        "movimiento_create": movimiento_create,
+        "movimiento_create_many_100": movimiento_create_many_100,
+    }
+
+
+async def operaciones_serializacion() -> dict:
+    """Serialización de listas de elementos ya cargadas de la base."""
+    adaptador = TypeAdapter(list[ElementoInventario])
+    campo_respuesta = create_model_field(
+        name="respuesta", type_=list[ElementoInventario], mode="serialization"
+    )
+    serializador = serializador_de(ElementoInventario)
+    operaciones = {}
+    for tamano in TAMANOS_LISTA:
+        async with AsyncSessionLocal() as session:
+            filas = await elemento_inventario_query.get_list(session, limit=tamano)
+            filas_core = await elemento_inventario_query.get_filas(
+                session, limit=tamano
+            )
+
+        async def response_model(i, filas=filas):
+            # El camino de FastAPI con response_model: valida, convierte y codifica
+            contenido = await serialize_response(
+                field=campo_respuesta, response_content=filas, exclude_none=True
+            )
+            JSONResponse(contenido)
+
+        async def orjson_precompilado(i, filas=filas):
+            # El camino rápido de las rutas CRUD (fast_json)
+            serializador.lista(filas)
+
+        async def orjson_filas(i, filas_core=filas_core):
+            # Filas de Core de get_filas, sin objetos intermedios
+            serializador.filas(filas_core)
+
+        async def encoder(i, filas=filas):
+            # El camino de las respuestas con relaciones expandidas
+            json.dumps(jsonable_encoder(filas), separators=(",", ":")).encode()
+
+        async def pydantic_json(i, filas=filas):
+            adaptador.dump_json(filas, exclude_none=True)
+
+        operaciones[f"serializar_response_model_{tamano}"] = response_model
+        operaciones[f"serializar_orjson_{tamano}"] = orjson_precompilado
+        operaciones[f"serializar_orjson_filas_{tamano}"] = orjson_filas
+        operaciones[f"serializar_jsonable_encoder_{tamano}"] = encoder
+        operaciones[f"serializar_dump_json_{tamano}"] = pydantic_json
+    return operaciones
+
+
+async def medir(args: argparse.Namespace) -> dict[str, dict]:
+    """Prepara los datos y mide cada operación por separado."""
+    async with cliente_api(args.reiniciar) as client:
+        ids = await crear_elementos(client, args.filas)
+        operaciones = {
+            **operaciones_consulta(ids, args.filas),
+            **await operaciones_serializacion(),
+        }
+        resultados = {}
+        for nombre, operacion in operaciones.items():
+            if args.filtro and args.filtro not in nombre:
+                continue
+            await repetir(operacion, args.calentamiento)
+            resultados[nombre] = await repetir(operacion, args.repeticiones)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.micro", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--calentamiento", type=int, default=10)
+    parser.add_argument("--filas", type=int, default=max(TAMANOS_LISTA))
+    parser.add_argument("--filtro", help="Mide solo las operaciones que lo contengan.")
+    parser.add_argument(
+        "--reiniciar",
+        action="store_true",
+        help="Borra y recrea todas las tablas antes de empezar (¡elimina los datos!).",
+    )
+    parser.add_argument("--salida", type=Path, help="Archivo JSON de resultados.")
+    args = parser.parse_args()
+
+    resultados = asyncio.run(medir(args))
+    imprimir(resultados)
+    parametros = {k: v for k, v in vars(args).items() if k != "salida"}
+    salida = guardar("micro", resultados, parametros, args.salida)
+    print(f"Resultados guardados en {salida}")
+
+
+if __name__ == "__main__":
+    main()
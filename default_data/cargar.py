@@ -0,0 +1,404 @@
+# default_data/cargar.py
+"""
+Carga directa de datos en la base con COPY, sin pasar por la API.
+
+Pensado para crear bases de staging y de benchmarks: evita la validación del
+token, la de Pydantic y una transacción por registro. Toda la carga ocurre en
+una sola transacción, así que debe hacerse sobre una base vacía: si algún
+registro choca con uno existente no se carga nada.
+
+Uso:
+    python -m default_data.cargar [--archivo default_data/data.json]
+    python -m default_data.cargar --movimientos 1000000 [--elementos 5000] [--dias 365]
+    python -m default_data.cargar --movimientos 100000 --exportar fixture.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from passlib.context import CryptContext
+from pydantic.fields import FieldInfo
+from sqlalchemy import Table, func, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlmodel import SQLModel
+
+from app.internal.query.inventario import (
+    corte_saldo_inventario_query,
+    resumen_movimiento_query,
+    saldo_inventario_query,
+)
+from app.models.database import AsyncSessionLocal, async_engine, create_db_and_tables
+from app.models.inventario import (
+    BodegaInventario,
+    ElementoCompuestoInventario,
+    ElementoInventario,
+    ElementosPorElementoCompuestoInventario,
+    EstadoElementoInventario,
+    GrupoInventario,
+    MovimientoInventario,
+    PrecioElementoInventario,
+    TipoMovimientoInventario,
+    TipoPrecioElementoInventario,
+    UnidadMedida,
+)
+from app.models.particiones import asegurar_particiones, inicio_mes, sumar_meses
+from app.models.usuario import UsuarioDB
+
+DATA_FILE = Path(__file__).parent / "data.json"
+
+# Recurso de data.json -> modelo de la tabla en la que se carga
+MODELOS: dict[str, type[SQLModel]] = {
+    "usuarios": UsuarioDB,
+    "estados_elementos_inventario": EstadoElementoInventario,
+    "tipos_movimientos_inventario": TipoMovimientoInventario,
+    "grupos_inventario": GrupoInventario,
+    "tipos_precios_elementos_inventario": TipoPrecioElementoInventario,
+    "unidades_medida": UnidadMedida,
+    "bodegas_inventario": BodegaInventario,
+    "elementos_inventario": ElementoInventario,
+    "elementos_compuestos_inventario": ElementoCompuestoInventario,
+    "elementos_por_elementos_compuestos_inventario": (
+        ElementosPorElementoCompuestoInventario
+    ),
+    "precios_elementos_inventario": PrecioElementoInventario,
+    "movimientos_inventario": MovimientoInventario,
+}
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def orden_carga() -> list[str]:
+    """Recursos en orden de llaves foráneas: cada tabla tras las que referencia."""
+    tablas = SQLModel.metadata.sorted_tables
+    posicion = {tabla.name: i for i, tabla in enumerate(tablas)}
+    return sorted(MODELOS, key=lambda clave: posicion[MODELOS[clave].__tablename__])
+
+
+def campos_con_defecto(modelo: type[SQLModel]) -> dict[str, FieldInfo]:
+    """Campos del modelo que son columnas y tienen un valor por defecto en Python."""
+    tabla: Table = modelo.__table__  # type: ignore
+    campos = {}
+    for columna in tabla.columns:
+        campo = modelo.model_fields.get(columna.key)
+        if campo is None or campo.is_required():
+            continue
+        if campo.default_factory is not None or campo.default is not None:
+            campos[columna.key] = campo
+    return campos
+
+
+def columnas_copia(
+    modelo: type[SQLModel], claves: frozenset[str], defectos: dict[str, FieldInfo]
+) -> list[str]:
+    """
+    Columnas a copiar para filas con las claves dadas.
+
+    Se copian las columnas que traen las filas y las que tienen un valor por
+    defecto en el modelo, como `created_at`. El resto queda a cargo de la base
+    (secuencias y valores por defecto del servidor).
+    """
+    tabla: Table = modelo.__table__  # type: ignore
+    return [c.key for c in tabla.columns if c.key in claves or c.key in defectos]
+
+
+async def copiar(conn: AsyncConnection, clave: str, filas: Iterable[dict]) -> int:
+    """
+    Copia las filas de un recurso con COPY FROM STDIN. Devuelve cuántas copió.
+
+    Las filas consecutivas con las mismas claves van en un mismo COPY; si una
+    fila trae otras claves (un campo opcional que las anteriores omiten) se abre
+    otro COPY con sus columnas, así ninguna clave se pierde. Las filas se
+    recorren una vez, sin cargarlas en memoria. Los valores por defecto del
+    modelo se calculan fila por fila.
+    """
+    modelo = MODELOS[clave]
+    defectos = campos_con_defecto(modelo)
+    preparador = conn.dialect.identifier_preparer
+    tabla = preparador.format_table(modelo.__table__)  # type: ignore
+    copiadas = 0
+    crudo = await conn.get_raw_connection()
+    async with crudo.driver_connection.cursor() as cursor:
+        for claves, grupo in groupby(filas, key=frozenset):
+            columnas = columnas_copia(modelo, claves, defectos)
+            sql = (
+                f"COPY {tabla} "
+                f"({', '.join(preparador.quote(c) for c in columnas)}) FROM STDIN"
+            )
+            async with cursor.copy(sql) as copia:
+                for fila in grupo:
+                    await copia.write_row(
+                        [
+                            fila[columna]
+                            if columna in fila
+                            else defectos[columna].get_default(
+                                call_default_factory=True
+                            )
+                            for columna in columnas
+                        ]
+                    )
+                    copiadas += 1
+    return copiadas
+
+
+async def completar_bodegas(conn: AsyncConnection) -> None:
+    """Asigna a los movimientos sin bodega la de su elemento, como hace la API."""
+    movimiento = MovimientoInventario
+    for modelo, campo in (
+        (ElementoInventario, "elemento_inventario_id"),
+        (ElementoCompuestoInventario, "elemento_compuesto_inventario_id"),
+    ):
+        await conn.execute(
+            update(movimiento)
+            .where(
+                movimiento.bodega_inventario_id.is_(None),  # type: ignore
+                getattr(movimiento, campo) == modelo.id,
+            )
+            .values(bodega_inventario_id=modelo.bodega_inventario_id)
+        )
+
+
+async def reiniciar_secuencias(conn: AsyncConnection, claves: Iterable[str]) -> None:
+    """Deja las secuencias de las llaves primarias después del mayor ID cargado."""
+    for clave in claves:
+        tabla: Table = MODELOS[clave].__table__  # type: ignore
+        columna = tabla.autoincrement_column
+        if columna is None:
+            continue
+        await conn.execute(
+            select(
+                func.setval(
+                    func.pg_get_serial_sequence(tabla.fullname, columna.name),
+                    func.coalesce(func.max(columna), 0) + 1,
+                    False,
+                )
+            )
+        )
+
+
+def hashear_contrasenas(usuarios: Iterable[dict]) -> list[dict]:
+    """Los usuarios de data.json traen la contraseña en claro."""
+    return [
+        {**usuario, "password": pwd_context.hash(usuario["password"])}
+        for usuario in usuarios
+    ]
+
+
+def meses_de(movimientos: Iterable[dict]) -> set[date]:
+    """Meses de los movimientos, para crear sus particiones antes de copiar."""
+    return {
+        inicio_mes(
+            datetime.fromisoformat(m["created_at"])
+            if isinstance(m["created_at"], str)
+            else m["created_at"]
+        )
+        for m in movimientos
+        if m.get("created_at")
+    }
+
+
+async def cargar(datos: dict[str, Iterable[dict]], meses: Iterable[date]) -> None:
+    """
+    Carga los datos en orden de llaves foráneas y reconstruye los derivados.
+
+    Los saldos y los resúmenes de movimientos se reconstruyen desde el libro de
+    movimientos, y los cortes de saldos se eliminan porque la historia cambió.
+    """
+    inicio = time.perf_counter()
+    await create_db_and_tables()
+    await asegurar_particiones(async_engine, meses)
+
+    claves = [clave for clave in orden_carga() if clave in datos]
+    async with async_engine.begin() as conn:
+        for clave in claves:
+            antes = time.perf_counter()
+            filas = datos[clave]
+            if clave == "usuarios":
+                filas = hashear_contrasenas(filas)
+            copiadas = await copiar(conn, clave, filas)
+            segundos = time.perf_counter() - antes
+            print(
+                f"✅ {clave}: {copiadas} filas en {segundos:.2f}s "
+                f"({copiadas / segundos if segundos else 0:.0f} filas/s)"
+            )
+        await completar_bodegas(conn)
+        await reiniciar_secuencias(conn, claves)
+
+    antes = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        saldos = await saldo_inventario_query.recalcular(session)
+        resumenes = await resumen_movimiento_query.recalcular(session)
+        await corte_saldo_inventario_query.invalidar_desde(session, datetime.min)
+        await session.commit()
+    print(
+        f"✅ Derivados: {saldos} saldos, "
+        f"{', '.join(f'{n} {t}' for t, n in resumenes.items())} "
+        f"en {time.perf_counter() - antes:.2f}s"
+    )
+    print(f"Carga completada en {time.perf_counter() - inicio:.2f}s")
+
+
+def generar(
+    base: dict[str, list[dict]],
+    elementos: int,
+    compuestos: int,
+    movimientos: int,
+    dias: int,
+    semilla: int = 0,
+) -> tuple[dict[str, Iterable[dict]], set[date]]:
+    """
+    Genera un fixture grande y reproducible sobre los catálogos de `base`.
+
+    Los movimientos se generan a medida que se copian, sin tenerlos todos en
+    memoria, repartidos en los últimos `dias` días.
+    """
+    aleatorio = random.Random(semilla)
+    bodegas = [b["id"] for b in base["bodegas_inventario"]]
+    grupos = [g["id"] for g in base["grupos_inventario"]]
+    estados = [e["id"] for e in base["estados_elementos_inventario"]]
+    tipos_movimiento = [t["id"] for t in base["tipos_movimientos_inventario"]]
+    tipos_precio = [t["id"] for t in base["tipos_precios_elementos_inventario"]]
+    unidad = base["unidades_medida"][0]["id"]
+    hasta = datetime.combine(date.today(), datetime.min.time())
+    desde = hasta - timedelta(days=dias)
+
+    lista_elementos = [
+        {
+            "id": i,
+            "nombre": f"Elemento {i}",
+            "bodega_inventario_id": aleatorio.choice(bodegas),
+            "grupo_inventario_id": aleatorio.choice(grupos),
+            "unidad_medida_cantidad_id": unidad,
+            "cantidad": aleatorio.randint(0, 1000),
+            "estado_elemento_id": aleatorio.choice(estados),
+        }
+        for i in range(1, elementos + 1)
+    ]
+    lista_compuestos = [
+        {
+            "id": i,
+            "nombre": f"Compuesto {i}",
+            "bodega_inventario_id": aleatorio.choice(bodegas),
+            "unidad_medida_cantidad_id": unidad,
+            "estado_elemento_id": aleatorio.choice(estados),
+        }
+        for i in range(1, compuestos + 1)
+    ]
+    componentes = [
+        {
+            "elemento_compuesto_inventario_id": compuesto["id"],
+            "elemento_inventario_id": elemento_id,
+            "cantidad": aleatorio.randint(1, 5),
+        }
+        for compuesto in lista_compuestos
+        for elemento_id in aleatorio.sample(range(1, elementos + 1), min(3, elementos))
+    ]
+    precios = [
+        {
+            "elemento_inventario_id": elemento["id"],
+            "tipo_precio_id": tipo,
+            "precio": round(aleatorio.uniform(1, 500), 2),
+            "fini": desde.date(),
+        }
+        for elemento in lista_elementos
+        for tipo in tipos_precio
+    ]
+
+    def lista_movimientos() -> Iterator[dict]:
+        segundos = int((hasta - desde).total_seconds())
+        for i in range(1, movimientos + 1):
+            elemento = lista_elementos[aleatorio.randrange(elementos)]
+            yield {
+                "nombre": f"Movimiento {i}",
+                "cantidad": aleatorio.randint(1, 20),
+                "elemento_inventario_id": elemento["id"],
+                "bodega_inventario_id": elemento["bodega_inventario_id"],
+                "tipo_movimiento_id": aleatorio.choice(tipos_movimiento),
+                "created_at": desde + timedelta(seconds=aleatorio.randrange(segundos)),
+            }
+
+    generados: dict[str, Iterable[dict]] = {
+        "elementos_inventario": lista_elementos,
+        "elementos_compuestos_inventario": lista_compuestos,
+        "elementos_por_elementos_compuestos_inventario": componentes,
+        "precios_elementos_inventario": precios,
+        "movimientos_inventario": lista_movimientos(),
+    }
+    datos = {
+        clave: base[clave]
+        for clave in MODELOS
+        if clave in base and clave not in generados
+    }
+    datos.update(generados)
+    primero = inicio_mes(desde.date())
+    total_meses = (hasta.year - desde.year) * 12 + hasta.month - desde.month + 1
+    return datos, {sumar_meses(primero, i) for i in range(total_meses)}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m default_data.cargar", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument(
+        "--archivo",
+        type=Path,
+        default=DATA_FILE,
+        help="Archivo con los datos; en modo generado, de él se toman los catálogos.",
+    )
+    parser.add_argument(
+        "--movimientos",
+        type=int,
+        help="Genera un fixture con este número de movimientos en lugar de cargar "
+        "los elementos y movimientos del archivo.",
+    )
+    parser.add_argument("--elementos", type=int, default=5000)
+    parser.add_argument("--compuestos", type=int, default=200)
+    parser.add_argument("--dias", type=int, default=365)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument(
+        "--exportar",
+        type=Path,
+        help="Escribe el fixture generado en lugar de cargarlo.",
+    )
+    args = parser.parse_args()
+
+    with open(args.archivo, "r", encoding="utf-8") as f:
+        datos = json.load(f)
+    if args.movimientos is None:
+        meses = meses_de(datos.get("movimientos_inventario", []))
+    else:
+        datos, meses = generar(
+            datos,
+            args.elementos,
+            args.compuestos,
+            args.movimientos,
+            args.dias,
+            args.semilla,
+        )
+    if args.exportar:
+        with open(args.exportar, "w", encoding="utf-8") as f:
+            json.dump(
+                {clave: list(filas) for clave, filas in datos.items()},
+                f,
+                ensure_ascii=False,
+                default=str,
+            )
+        print(f"Fixture escrito en {args.exportar}")
+        return
+
+    async def ejecutar():
+        try:
+            await cargar(datos, meses)
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(ejecutar())
+
+
+if __name__ == "__main__":
+    main()
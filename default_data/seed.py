@@ -1,5 +1,9 @@
+import asyncio
 import httpx
 import json
+import random
+import time
+from contextlib import nullcontext
 from datetime import datetime
 
 # URL base de tu API de FastAPI
@@ -8,39 +12,116 @@ BASE_URL = "http://localhost:8000"  # Asegúrate de que esta URL sea correcta
 # Ruta al archivo de datos
 DATA_FILE = "default_data/data.json"
 
+# Peticiones simultáneas como máximo, compartidas por todas las etapas
+CONCURRENCIA = 8
+# Registros por petición en los endpoints de lote
+TAMANO_LOTE = 500
+# Reintentos ante errores transitorios y espera inicial (se duplica en cada uno)
+REINTENTOS = 3
+ESPERA_BASE = 0.5
+# Estados que indican un error pasajero: vale la pena reintentar
+ESTADOS_TRANSITORIOS = {429, 502, 503, 504}
+
+# Recurso de data.json -> (endpoint de la API, recursos de los que depende).
+# Los usuarios se siembran antes, porque el resto de endpoints exige un token.
+RECURSOS: dict[str, tuple[str, tuple[str, ...]]] = {
+    "estados_elementos_inventario": ("estado_elemento_inventario", ()),
+    "tipos_movimientos_inventario": ("tipo_movimiento_inventario", ()),
+    "grupos_inventario": ("grupo_inventario", ()),
+    "tipos_precios_elementos_inventario": ("tipo_precio_elemento_inventario", ()),
+    "unidades_medida": ("unidad_medida", ()),
+    "bodegas_inventario": ("bodega_inventario", ()),
+    "elementos_inventario": (
+        "elemento_inventario",
+        (
+            "estados_elementos_inventario",
+            "grupos_inventario",
+            "unidades_medida",
+            "bodegas_inventario",
+        ),
+    ),
+    "elementos_compuestos_inventario": (
+        "elemento_compuesto_inventario",
+        (
+            "estados_elementos_inventario",
+            "grupos_inventario",
+            "unidades_medida",
+            "bodegas_inventario",
+        ),
+    ),
+    "elementos_por_elementos_compuestos_inventario": (
+        "elementos_por_elemento_compuesto_inventario",
+        ("elementos_inventario", "elementos_compuestos_inventario"),
+    ),
+    "precios_elementos_inventario": (
+        "precio_elemento_inventario",
+        ("elementos_inventario", "tipos_precios_elementos_inventario"),
+    ),
+    "movimientos_inventario": (
+        "movimiento_inventario",
+        (
+            "elementos_inventario",
+            "elementos_compuestos_inventario",
+            "bodegas_inventario",
+            "tipos_movimientos_inventario",
+        ),
+    ),
+}
+
+# Campos de fecha que se validan antes de enviar cada registro
+CAMPOS_FECHA = ("created_at", "fini", "ffin")
+
 
 async def post_data(
-    client: httpx.AsyncClient, endpoint: str, data: dict, token: str | None = None
+    client: httpx.AsyncClient,
+    endpoint: str,
+    data: dict | list,
+    token: str | None = None,
+    semaforo: asyncio.Semaphore | None = None,
 ):
     """
     Realiza una petición POST a un endpoint específico de la API.
 
+    Los errores transitorios (de red, 429 o 50x de saturación) se reintentan con
+    espera exponencial y aleatoria; la espera no ocupa un cupo del semáforo.
+
     Args:
         client (httpx.AsyncClient): Cliente HTTPX para realizar la petición.
         endpoint (str): El endpoint de la API (ej. "/usuarios/").
-        data (dict): El cuerpo de la petición en formato diccionario.
+        data (dict | list): El cuerpo de la petición (una lista en los endpoints de lote).
         token (str, optional): Token de autorización si es necesario. Defaults to None.
+        semaforo (asyncio.Semaphore, optional): Limita las peticiones simultáneas.
 
     Returns:
-        dict | None: La respuesta JSON de la API si la petición fue exitosa, de lo contrario None.
+        dict | list | None: La respuesta JSON de la API si la petición fue exitosa, de lo contrario None.
     """
     headers = {"Content-Type": "application/json"}
     if token:
         headers["Authorization"] = f"Bearer {token}"
 
-    try:
-        response = await client.post(
-            f"{BASE_URL}{endpoint}", json=data, headers=headers
-        )
-        response.raise_for_status()  # Lanza una excepción para códigos de estado 4xx/5xx
-        print(f"✅ Éxito al crear {endpoint}: {response.status_code}")
-        return response.json()
-    except httpx.HTTPStatusError as e:
-        print(
-            f"❌ Error al crear {endpoint} (Estado: {e.response.status_code}): {e.response.text}"
-        )
-    except httpx.RequestError as e:
-        print(f"❌ Error de red al crear {endpoint}: {e}")
+    for intento in range(REINTENTOS + 1):
+        espera = ESPERA_BASE * 2**intento * (1 + random.random())
+        try:
+            async with semaforo or nullcontext():
+                response = await client.post(endpoint, json=data, headers=headers)
+            if response.status_code in ESTADOS_TRANSITORIOS:
+                motivo = f"Estado {response.status_code}"
+                espera = float(response.headers.get("Retry-After", espera))
+            else:
+                response.raise_for_status()  # Lanza una excepción para códigos de estado 4xx/5xx
+                print(f"✅ Éxito al crear {endpoint}: {response.status_code}")
+                return response.json()
+        except httpx.HTTPStatusError as e:
+            print(
+                f"❌ Error al crear {endpoint} (Estado: {e.response.status_code}): {e.response.text}"
+            )
+            return None
+        except httpx.RequestError as e:
+            motivo = f"Error de red: {e}"
+        if intento < REINTENTOS:
+            print(f"⚠️ {motivo} en {endpoint}; reintento en {espera:.1f}s")
+            await asyncio.sleep(espera)
+    print(f"❌ Error al crear {endpoint} tras {REINTENTOS} reintentos: {motivo}")
     return None
 
 
@@ -62,9 +143,7 @@ async def login_user(client: httpx.AsyncClient, username: str, password: str):
     }  # FastAPI espera form-urlencoded para login
 
     try:
-        response = await client.post(
-            f"{BASE_URL}/auth/login", data=login_data, headers=headers
-        )
+        response = await client.post("/auth/login", data=login_data, headers=headers)
         response.raise_for_status()
         token_info = response.json()
         print(f"✅ Login exitoso para {username}")
@@ -78,9 +157,113 @@ async def login_user(client: httpx.AsyncClient, username: str, password: str):
     return None
 
 
+def etapas(recursos: dict[str, tuple[str, tuple[str, ...]]]) -> list[list[str]]:
+    """
+    Ordena los recursos en etapas según sus dependencias.
+
+    Cada etapa solo depende de las anteriores, así que sus recursos se pueden
+    sembrar a la vez.
+
+    Args:
+        recursos (dict): Recurso -> (endpoint, recursos de los que depende).
+
+    Returns:
+        list[list[str]]: Los recursos de cada etapa, en orden de ejecución.
+    """
+    pendientes = dict(recursos)
+    sembrados: set[str] = set()
+    resultado = []
+    while pendientes:
+        etapa = [
+            clave
+            for clave, (_, dependencias) in pendientes.items()
+            if set(dependencias) <= sembrados
+        ]
+        if not etapa:
+            raise ValueError(f"Dependencias circulares entre: {', '.join(pendientes)}")
+        for clave in etapa:
+            del pendientes[clave]
+        sembrados.update(etapa)
+        resultado.append(etapa)
+    return resultado
+
+
+def normalizar_fechas(item_data: dict, recurso: str) -> dict:
+    """
+    Valida los campos de fecha de un registro.
+
+    Una fecha mal formada se reemplaza por la fecha actual, o por None en `ffin`.
+    """
+    for campo in CAMPOS_FECHA:
+        if isinstance(item_data.get(campo), str):
+            try:
+                datetime.fromisoformat(item_data[campo])
+            except ValueError:
+                print(
+                    f"Advertencia: Formato de fecha incorrecto para {campo} en {recurso}: {item_data[campo]}"
+                )
+                item_data[campo] = (
+                    None if campo == "ffin" else datetime.now().isoformat()
+                )
+    return item_data
+
+
+async def sembrar_recurso(
+    client: httpx.AsyncClient,
+    semaforo: asyncio.Semaphore,
+    endpoint: str,
+    items: list[dict],
+    token: str | None,
+) -> int:
+    """
+    Siembra los registros de un recurso por lotes, en paralelo.
+
+    Los lotes son atómicos: si uno falla, sus registros se envían de uno en uno
+    para que solo se pierdan los que realmente tienen errores.
+
+    Returns:
+        int: El número de registros creados.
+    """
+
+    async def sembrar_lote(lote: list[dict]) -> int:
+        if await post_data(
+            client, f"/inventario/{endpoint}s/bulk", lote, token, semaforo
+        ):
+            return len(lote)
+        creados = await asyncio.gather(
+            *(
+                post_data(client, f"/inventario/{endpoint}", item, token, semaforo)
+                for item in lote
+            )
+        )
+        return sum(creado is not None for creado in creados)
+
+    lotes = [items[i : i + TAMANO_LOTE] for i in range(0, len(items), TAMANO_LOTE)]
+    return sum(await asyncio.gather(*(sembrar_lote(lote) for lote in lotes)))
+
+
+def reportar_etapa(nombre: str, creados: int, total: int, segundos: float) -> dict:
+    """Imprime y devuelve el rendimiento de una etapa."""
+    por_segundo = creados / segundos if segundos else 0.0
+    print(
+        f"⏱️ {nombre}: {creados}/{total} registros en {segundos:.2f}s ({por_segundo:.1f} registros/s)"
+    )
+    return {
+        "etapa": nombre,
+        "creados": creados,
+        "total": total,
+        "segundos": segundos,
+        "por_segundo": por_segundo,
+    }
+
+
 async def seed_data():
     """
     Función principal para cargar y enviar los datos de prueba a la API.
+
+    Los usuarios se crean primero; luego los recursos de inventario se siembran
+    por etapas de dependencias, con un máximo de `CONCURRENCIA` peticiones
+    simultáneas sobre un único cliente HTTP.
     """
     print("Iniciando el proceso de siembra de datos...")
 
@@ -94,188 +277,75 @@ async def seed_data():
         print(f"Error: El archivo {DATA_FILE} no es un JSON válido.")
         return
 
-    async with httpx.AsyncClient() as client:
-        # Diccionario para mapear nombres de usuario a IDs de usuario creados
-        user_ids_map = {}
-        # Token de autenticación (se usará el del admin para la mayoría de las operaciones)
-        auth_token = None
-
-        # 1. Sembrar Estados de Elementos de Inventario
-        print("\n--- Sembrando Estados de Elementos de Inventario ---")
-        for item_data in data_to_seed.get("estados_elementos_inventario", []):
-            await post_data(client, "/inventario/estado_elemento_inventario", item_data)
-
-        # 2. Sembrar Tipos de Movimientos de Inventario
-        print("\n--- Sembrando Tipos de Movimientos de Inventario ---")
-        for item_data in data_to_seed.get("tipos_movimientos_inventario", []):
-            await post_data(client, "/inventario/tipo_movimiento_inventario", item_data)
-
-        # Sembrar grupos de inventario
-        print("\n--- Sembrando Grupos de Inventario ---")
-        for item_data in data_to_seed.get("grupos_inventario", []):
-            await post_data(client, "/inventario/grupo_inventario", item_data)
-
-        # 3. Sembrar Tipos de Precios de Elementos de Inventario
-        print("\n--- Sembrando Tipos de Precios de Elementos de Inventario ---")
-        for item_data in data_to_seed.get("tipos_precios_elementos_inventario", []):
-            await post_data(
-                client, "/inventario/tipo_precio_elemento_inventario", item_data
-            )
-
-        # Sembrar unidades medida
-        print("\n--- Sembrando Unidades de Medida ---")
-        for item_data in data_to_seed.get("unidades_medida", []):
-            await post_data(client, "/inventario/unidad_medida", item_data)
-
-        # Sembrar bodegas inventario
-        print("\n--- Sembrando Bodegas de Inventario ---")
-        for item_data in data_to_seed.get("bodegas_inventario", []):
-            await post_data(client, "/inventario/bodega_inventario", item_data)
-
-        # 4. Sembrar Usuarios
+    semaforo = asyncio.Semaphore(CONCURRENCIA)
+    reportes = []
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        timeout=httpx.Timeout(60.0),
+        limits=httpx.Limits(max_connections=CONCURRENCIA),
+    ) as client:
+        # 1. Sembrar Usuarios: en orden, para que reciban los IDs que usa data.json
         print("\n--- Sembrando Usuarios ---")
-        for user_data in data_to_seed.get("usuarios", []):
-            # Clonar el diccionario para no modificar el original al eliminar la contraseña
-            user_create_data = user_data.copy()
-            password = user_create_data.pop(
-                "password"
-            )  # Eliminar la contraseña del payload de creación si no es esperada por el modelo UsuarioCreate
-            # Si UsuarioCreate espera la contraseña, no hacer pop.
-            # En tu OpenAPI, UsuarioCreate sí espera 'password', así que no la eliminamos.
-            user_create_data["password"] = (
-                password  # Asegurarse de que la contraseña esté presente
+        usuarios = data_to_seed.get("usuarios", [])
+        inicio = time.perf_counter()
+        creados = 0
+        for user_data in usuarios:
+            if await post_data(client, "/usuarios/", user_data, semaforo=semaforo):
+                creados += 1
+        reportes.append(
+            reportar_etapa(
+                "usuarios", creados, len(usuarios), time.perf_counter() - inicio
             )
+        )
 
-            response_json = await post_data(client, "/usuarios/", user_create_data)
-            if response_json and "username" in response_json:
-                # Asumimos que la respuesta incluye el ID del usuario creado
-                # Si el ID no se devuelve, esta parte necesitará ajuste o una consulta GET
-                # Para este ejemplo, asumimos que el ID se devuelve o que podemos usar el ID del JSON si se envió
-                # Sin embargo, el OpenAPI para UsuarioBase no muestra 'id'.
-                # Para propósitos de este script de siembra, vamos a asumir que los IDs de usuario se asignan secuencialmente
-                # o que el `usuario_id` en `elementos_inventario` y `movimientos_inventario` puede ser null.
-                # Si necesitas el ID real, tendrías que hacer una consulta GET después de la creación.
-                # Para simplificar, si tu API devuelve el ID en la respuesta de creación, úsalo.
-                # Si no, y si el `usuario_id` es `Optional`, puedes dejarlo como `null` en el JSON o mapearlo manualmente.
-                # Para este script, mapearemos el username a un ID ficticio o al ID que venga en la respuesta si existe.
-                # Si tu API no devuelve el ID, y el ID es auto-incrementable, deberías obtenerlo de otra forma.
-                # Para este ejemplo, asignaremos IDs basados en el orden de creación para `usuario_id` en otros modelos.
-                # Esto es una simplificación y puede no coincidir con los IDs reales de la DB.
-                # Una mejor práctica sería obtener el ID real de la respuesta o de una consulta.
-                user_ids_map[response_json["username"]] = (
-                    len(user_ids_map) + 1
-                )  # Asignar un ID secuencial temporal
-
-                if user_data["username"] == "admin_user":
-                    auth_token = await login_user(
-                        client, user_data["username"], user_data["password"]
-                    )
-                    if auth_token:
-                        print(
-                            f"Token de admin_user obtenido: {auth_token[:20]}..."
-                        )  # Mostrar solo una parte del token
-                    else:
-                        print(
-                            "No se pudo obtener el token para admin_user. Las siguientes operaciones podrían fallar."
-                        )
-
-        # 5. Sembrar Elementos de Inventario
-        print("\n--- Sembrando Elementos de Inventario ---")
-        for item_data in data_to_seed.get("elementos_inventario", []):
-            # Asegurarse de que el usuario_id sea válido si se usa
-            if (
-                item_data.get("usuario_id")
-                and item_data["usuario_id"] not in user_ids_map.values()
-            ):
-                # Esto es una simplificación. En un escenario real, el usuario_id debería existir.
-                # Aquí asumimos que los IDs en data.json coinciden con los IDs que la DB asignará.
-                # Si no, esto fallará o necesitará lógica para mapear a IDs reales de usuarios creados.
-                pass  # No hacemos nada si el ID no está en nuestro mapa temporal
-
-            # Formatear la fecha si es necesario
-            if "created_at" in item_data and isinstance(item_data["created_at"], str):
-                try:
-                    # Validar y reformatear si es necesario, aunque el JSON ya tiene el formato correcto
-                    datetime.fromisoformat(item_data["created_at"])
-                except ValueError:
-                    print(
-                        f"Advertencia: Formato de fecha incorrecto para created_at en ElementoInventario: {item_data['created_at']}"
-                    )
-                    item_data["created_at"] = (
-                        datetime.now().isoformat()
-                    )  # Usar fecha actual como fallback
-
-            await post_data(
-                client, "/inventario/elemento_inventario", item_data, token=auth_token
+        # Token de autenticación del admin para el resto de operaciones
+        admin = next(
+            (u for u in usuarios if u["username"] == "admin_user"),
+            usuarios[0] if usuarios else None,
+        )
+        auth_token = (
+            await login_user(client, admin["username"], admin["password"])
+            if admin
+            else None
+        )
+        if not auth_token:
+            print(
+                "No se pudo obtener el token de administrador. Las siguientes operaciones podrían fallar."
             )
 
-        # 6. Sembrar Elementos Compuestos de Inventario
-        print("\n--- Sembrando Elementos Compuestos de Inventario ---")
-        for item_data in data_to_seed.get("elementos_compuestos_inventario", []):
-            if "created_at" in item_data and isinstance(item_data["created_at"], str):
-                try:
-                    datetime.fromisoformat(item_data["created_at"])
-                except ValueError:
-                    print(
-                        f"Advertencia: Formato de fecha incorrecto para created_at en ElementoCompuestoInventario: {item_data['created_at']}"
+        # 2. Sembrar los recursos de inventario por etapas de dependencias
+        for numero, etapa in enumerate(etapas(RECURSOS), start=2):
+            nombre = ", ".join(etapa)
+            print(f"\n--- Etapa {numero}: {nombre} ---")
+            items = {
+                clave: [
+                    normalizar_fechas(item_data, clave)
+                    for item_data in data_to_seed.get(clave, [])
+                ]
+                for clave in etapa
+            }
+            inicio = time.perf_counter()
+            creados = await asyncio.gather(
+                *(
+                    sembrar_recurso(
+                        client, semaforo, RECURSOS[clave][0], items[clave], auth_token
                     )
-                    item_data["created_at"] = datetime.now().isoformat()
-
-            await post_data(
-                client,
-                "/inventario/elemento_compuesto_inventario",
-                item_data,
-                token=auth_token,
+                    for clave in etapa
+                    if items[clave]
+                )
             )
-
-        # 7. Sembrar Precios de Elementos de Inventario
-        print("\n--- Sembrando Precios de Elementos de Inventario ---")
-        for item_data in data_to_seed.get("precios_elementos_inventario", []):
-            # Asegurarse de que las fechas estén en el formato correcto
-            if "fini" in item_data and isinstance(item_data["fini"], str):
-                try:
-                    datetime.fromisoformat(item_data["fini"])
-                except ValueError:
-                    print(
-                        f"Advertencia: Formato de fecha incorrecto para fini en PrecioElementoInventario: {item_data['fini']}"
-                    )
-                    item_data["fini"] = datetime.now().isoformat()
-            if "ffin" in item_data and isinstance(item_data["ffin"], str):
-                try:
-                    datetime.fromisoformat(item_data["ffin"])
-                except ValueError:
-                    print(
-                        f"Advertencia: Formato de fecha incorrecto para ffin en PrecioElementoInventario: {item_data['ffin']}"
-                    )
-                    item_data["ffin"] = None  # O dejarlo como None si es opcional
-
-            await post_data(
-                client,
-                "/inventario/precio_elemento_inventario",
-                item_data,
-                token=auth_token,
-            )
-
-        # 8. Sembrar Movimientos de Inventario
-        print("\n--- Sembrando Movimientos de Inventario ---")
-        for item_data in data_to_seed.get("movimientos_inventario", []):
-            if "created_at" in item_data and isinstance(item_data["created_at"], str):
-                try:
-                    datetime.fromisoformat(item_data["created_at"])
-                except ValueError:
-                    print(
-                        f"Advertencia: Formato de fecha incorrecto para created_at en MovimientoInventario: {item_data['created_at']}"
-                    )
-                    item_data["created_at"] = datetime.now().isoformat()
-
-            await post_data(
-                client, "/inventario/movimiento_inventario", item_data, token=auth_token
+            reportes.append(
+                reportar_etapa(
+                    nombre,
+                    sum(creados),
+                    sum(len(lista) for lista in items.values()),
+                    time.perf_counter() - inicio,
+                )
             )
 
     print("\nProceso de siembra de datos completado.")
+    return reportes
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(seed_data())
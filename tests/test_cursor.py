@@ -0,0 +1,61 @@
+# tests/test_cursor.py
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import Column, Date, DateTime, Integer, String
+
+from app.internal.gen.exceptions import InvalidCursorError
+from app.internal.query.cursor import codificar_cursor, decodificar_cursor
+
+ID = Column("id", Integer)
+NOMBRE = Column("nombre", String)
+CREADO = Column("created_at", DateTime)
+FECHA = Column("fecha", Date)
+
+
+def test_ida_y_vuelta_con_tipos():
+    valores = [datetime(2025, 7, 20, 14, 40, 5, 123), 42, "coco", date(2025, 1, 31)]
+    columnas = [CREADO, ID, NOMBRE, FECHA]
+    cursor = codificar_cursor(valores, "created_at,id")
+    assert decodificar_cursor(cursor, columnas, "created_at,id") == valores
+
+
+def test_cursor_opaco_sin_relleno():
+    cursor = codificar_cursor([1], "id")
+    assert "=" not in cursor
+    assert "id" not in cursor
+
+
+def test_valores_nulos():
+    cursor = codificar_cursor([None, 7], "-nombre,id")
+    assert decodificar_cursor(cursor, [NOMBRE, ID], "-nombre,id") == [None, 7]
+
+
+def test_rechaza_otro_orden():
+    cursor = codificar_cursor([3], "id")
+    with pytest.raises(InvalidCursorError):
+        decodificar_cursor(cursor, [ID], "-id")
+
+
+def test_rechaza_otro_numero_de_columnas():
+    cursor = codificar_cursor([3], "id")
+    with pytest.raises(InvalidCursorError):
+        decodificar_cursor(cursor, [ID, NOMBRE], "id")
+
+
+@pytest.mark.parametrize("cursor", ["no-es-base64!", "bm8tanNvbg", "WzEsMl0"])
+def test_rechaza_cursor_corrupto(cursor):
+    # "bm8tanNvbg" es "no-json"; "WzEsMl0" es una lista y no un objeto
+    with pytest.raises(InvalidCursorError):
+        decodificar_cursor(cursor, [ID], "id")
+
+
+def test_rechaza_valor_de_otro_tipo():
+    cursor = codificar_cursor(["abc"], "id")
+    with pytest.raises(InvalidCursorError):
+        decodificar_cursor(cursor, [ID], "id")
+
+
+def test_no_serializa_tipos_desconocidos():
+    with pytest.raises(TypeError):
+        codificar_cursor([object()], "id")
@@ -0,0 +1,31 @@
+# tests/test_etag.py
+import pytest
+
+from app.internal.gen.etag import calcular_etag, coincide_etag
+
+RUTA = "/inventario/bodega_inventarios"
+ETAG = calcular_etag("bodegas_inventario:3", RUTA, [])
+
+
+def test_etag_fuerte_y_determinista():
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+    assert ETAG == calcular_etag("bodegas_inventario:3", RUTA, [])
+
+
+def test_etag_cambia_con_la_version_y_la_url():
+    assert ETAG != calcular_etag("bodegas_inventario:4", RUTA, [])
+    assert ETAG != calcular_etag("bodegas_inventario:3", RUTA, [("limit", "5")])
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [ETAG, f"W/{ETAG}", f'"otro", {ETAG}', f' "otro" ,W/{ETAG} '],
+)
+def test_coincide(if_none_match):
+    assert coincide_etag(if_none_match, ETAG)
+
+
+@pytest.mark.parametrize("if_none_match", [None, "", '"otro"', ETAG.strip('"'), "*"])
+def test_no_coincide(if_none_match):
+    # "*" no coincide: la validación se hace antes de saber si el recurso existe
+    assert not coincide_etag(if_none_match, ETAG)
@@ -0,0 +1,117 @@
+# tests/test_filtros.py
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import Boolean, Column, Date, DateTime, Integer, String
+from sqlalchemy.dialects import postgresql
+
+from app.internal.gen.exceptions import InvalidFilterError, InvalidSortError
+from app.internal.query.filtros import (
+    OPERADORES,
+    Filtro,
+    Orden,
+    parse_filtros,
+    parse_orden,
+)
+
+COLUMNAS = {
+    "id": Column("id", Integer),
+    "nombre": Column("nombre", String),
+    "activo": Column("activo", Boolean),
+    "created_at": Column("created_at", DateTime),
+    "fini": Column("fini", Date),
+}
+PERMITIDOS = tuple(COLUMNAS)
+
+
+def filtros(*params: tuple[str, str]) -> list[Filtro]:
+    return parse_filtros(params, COLUMNAS, PERMITIDOS)
+
+
+def test_sin_operador_es_eq():
+    assert filtros(("id", "5")) == [Filtro("id", "eq", 5)]
+
+
+@pytest.mark.parametrize("operador", ["ne", "gt", "gte", "lt", "lte"])
+def test_operadores_de_comparacion(operador):
+    assert filtros((f"id__{operador}", "5")) == [Filtro("id", operador, 5)]
+
+
+def test_convierte_al_tipo_de_la_columna():
+    assert filtros(
+        ("created_at__gte", "2025-07-01T08:30:00"),
+        ("fini", "2025-07-01"),
+        ("activo", "true"),
+        ("nombre", "007"),
+    ) == [
+        Filtro("created_at", "gte", datetime(2025, 7, 1, 8, 30)),
+        Filtro("fini", "eq", date(2025, 7, 1)),
+        Filtro("activo", "eq", True),
+        Filtro("nombre", "eq", "007"),
+    ]
+
+
+def test_in_separa_por_comas_e_ignora_vacios():
+    assert filtros(("id__in", "1,2,,3")) == [Filtro("id", "in", (1, 2, 3))]
+
+
+@pytest.mark.parametrize(
+    "valor, esperado", [("1", True), ("TRUE", True), ("no", False), ("0", False)]
+)
+def test_isnull_booleano(valor, esperado):
+    assert filtros(("nombre__isnull", valor)) == [Filtro("nombre", "isnull", esperado)]
+
+
+@pytest.mark.parametrize(
+    "parametro, valor",
+    [
+        ("secreto", "1"),  # campo no permitido
+        ("id__like", "1"),  # operador desconocido
+        ("id", "uno"),  # valor que no es entero
+        ("id__in", "1,x"),
+        ("created_at", "ayer"),
+        ("activo", "quizas"),
+        ("nombre__isnull", "tal vez"),
+    ],
+)
+def test_rechaza_parametros_invalidos(parametro, valor):
+    with pytest.raises(InvalidFilterError):
+        filtros((parametro, valor))
+
+
+def test_solo_campos_permitidos():
+    with pytest.raises(InvalidFilterError):
+        parse_filtros([("nombre", "x")], COLUMNAS, ["id"])
+
+
+def sql(expresion) -> str:
+    return str(
+        expresion.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+def test_operadores_generan_sql():
+    columna = COLUMNAS["id"]
+    assert sql(OPERADORES["gte"](columna, 3)) == "id >= 3"
+    assert sql(OPERADORES["in"](columna, (1, 2))) == "id IN (1, 2)"
+    assert sql(OPERADORES["isnull"](columna, True)) == "id IS NULL"
+    assert sql(OPERADORES["isnull"](columna, False)) == "id IS NOT NULL"
+
+
+def test_parse_orden():
+    assert parse_orden("created_at, -id", PERMITIDOS) == [
+        Orden("created_at", False),
+        Orden("id", True),
+    ]
+
+
+@pytest.mark.parametrize("order_by", [None, "", " , "])
+def test_parse_orden_vacio(order_by):
+    assert parse_orden(order_by, PERMITIDOS) == []
+
+
+def test_parse_orden_rechaza_campos_no_permitidos():
+    with pytest.raises(InvalidSortError):
+        parse_orden("id,-secreto", PERMITIDOS)
@@ -0,0 +1,74 @@
+# tests/test_lotes.py
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.config import config
+from app.internal.query.inventario import (
+    ElementosPorElementoCompuestoInventarioQuery,
+    MovimientoInventarioQuery,
+)
+from app.models import usuario  # noqa: F401  # registra UsuarioDB para las relaciones
+from app.models.inventario import MovimientoInventario
+
+
+@pytest.fixture
+def bogota(monkeypatch):
+    monkeypatch.setattr(config, "local_timezone", "America/Bogota")
+
+
+@pytest.mark.parametrize(
+    "enviada, local",
+    [
+        ("2025-03-01T04:30:00Z", datetime(2025, 2, 28, 23, 30)),
+        ("2025-03-01T04:30:00+00:00", datetime(2025, 2, 28, 23, 30)),
+        ("2025-03-01T04:30:00-05:00", datetime(2025, 3, 1, 4, 30)),
+        ("2025-03-01T04:30:00", datetime(2025, 3, 1, 4, 30)),
+        (datetime(2025, 3, 1, 4, 30), datetime(2025, 3, 1, 4, 30)),
+    ],
+)
+def test_fechas_de_normaliza_a_hora_local_sin_zona(bogota, enviada, local):
+    movimiento = MovimientoInventario(nombre="m", cantidad=1, tipo_movimiento_id=1)
+    movimiento.created_at = enviada  # type: ignore
+    assert MovimientoInventarioQuery.fechas_de([movimiento]) == [local]
+    # El objeto queda con la fecha normalizada, la que se inserta o actualiza
+    assert movimiento.created_at == local
+    assert movimiento.created_at.tzinfo is None
+
+
+def test_fechas_de_comparables_entre_si(bogota):
+    movimientos = [
+        MovimientoInventario(nombre="m", cantidad=1, tipo_movimiento_id=1)
+        for _ in range(2)
+    ]
+    movimientos[0].created_at = "2025-03-01T04:30:00Z"  # type: ignore
+    movimientos[1].created_at = datetime(2025, 3, 1)
+    assert min(MovimientoInventarioQuery.fechas_de(movimientos)) == datetime(
+        2025, 2, 28, 23, 30
+    )
+
+
+def test_filtro_ids_llave_compuesta():
+    query = ElementosPorElementoCompuestoInventarioQuery()
+    filtro = query._filtro_ids([[1, 2], [1, 3]])
+    sql = str(
+        filtro.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+    assert sql.endswith("IN ((1, 2), (1, 3))")
+
+
+def test_borrado_en_lote_llave_compuesta_recibe_objetos():
+    from app.main import app
+
+    ruta = "/inventario/elementos_por_elemento_compuesto_inventarios/bulk"
+    esquema = app.openapi()
+    cuerpo = esquema["paths"][ruta]["delete"]["requestBody"]["content"]
+    items = cuerpo["application/json"]["schema"]["items"]
+    llave = esquema["components"]["schemas"][items["$ref"].rsplit("/", 1)[1]]
+    assert set(llave["required"]) == {
+        "elemento_compuesto_inventario_id",
+        "elemento_inventario_id",
+    }